@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+寄存器地址分配模块
+为未指定地址的寄存器自动分配BAR内偏移，使寄存器紧凑排列
+
+寄存器按对齐要求和宽度从大到小依次放入最低的空闲地址（首次适配），
+地址跨度和BAR控制器的译码位数因此最小。基本寄存器、已启用的DMA寄存器、
+中断寄存器和固定地址的设备寄存器占用的区间不会被分配
+
+寄存器配置中的align字段指定额外的对齐要求（字节），
+fixed为true的寄存器在重新分配全部地址时保持原地址
+"""
+
+from register_model import AUTO_ADDRESSES, BASE_REGISTERS, parse_address
+from register_index import RegisterIndex
+
+# 寄存器的默认对齐（字节），与BAR控制器按32位字访问一致
+DEFAULT_ALIGNMENT = 4
+
+# BAR内偏移的上限（32位地址）
+ADDRESS_LIMIT = 1 << 32
+
+# 寄存器配置中的地址字段，按优先级排列
+_ADDRESS_FIELDS = ("addr", "address", "offset")
+
+class AllocationError(ValueError):
+    """地址空间不足或对齐要求无效"""
+
+def register_size(reg):
+    """寄存器配置占用的字节数"""
+    width = int(reg.get("width", reg.get("size", 32)) or 32)
+    return max(1, (width + 7) // 8)
+
+def _address_field(reg):
+    """寄存器配置使用的地址字段，没有地址字段时按配置风格选择"""
+    for field in _ADDRESS_FIELDS:
+        if field in reg:
+            return field
+    # 图形界面编辑器的寄存器使用address/default/bitfields
+    return "address" if ("default" in reg or "bitfields" in reg) else "addr"
+
+def _raw_address(reg):
+    for field in _ADDRESS_FIELDS:
+        if field in reg:
+            return reg[field]
+    return None
+
+def _alignment(reg, size, default):
+    """寄存器的对齐要求：自然对齐（不小于宽度的2的幂）和align字段中的较大者
+
+    Raises:
+        AllocationError: align不是2的幂
+    """
+    align = max(default, 1 << (size - 1).bit_length())
+    requested = reg.get("align")
+    if requested:
+        requested = parse_address(requested) if isinstance(requested, str) else int(requested)
+        if requested <= 0 or requested & (requested - 1):
+            raise AllocationError(f"寄存器{reg.get('name', '')}的对齐要求必须是2的幂: {reg.get('align')}")
+        align = max(align, requested)
+    return align
+
+def format_address(address):
+    """地址的配置文本形式"""
+    return f"0x{address:04X}"
+
+class AllocationResult:
+    """地址分配结果"""
+
+    def __init__(self, assignments, registers, start=0):
+        """初始化分配结果
+
+        Args:
+            assignments: (寄存器序号, 原地址或None, 新地址)列表
+            registers: 分配后的寄存器配置字典列表
+            start: 分配的起始地址
+        """
+        self.assignments = assignments
+        self.registers = registers
+        self.start = start
+        self.end = start
+        for reg in registers:
+            address = parse_address(_raw_address(reg))
+            self.end = max(self.end, address + register_size(reg))
+
+    @property
+    def moved(self):
+        """原有地址发生变化的寄存器数"""
+        return sum(1 for _, old, new in self.assignments if old is not None and old != new)
+
+    @property
+    def decode_bits(self):
+        """覆盖全部寄存器所需的偏移地址位数"""
+        return max(1, (self.end - 1).bit_length())
+
+    @property
+    def bar_size(self):
+        """容纳全部寄存器的最小BAR大小（2的幂，至少4KB）"""
+        return max(4096, 1 << self.decode_bits)
+
+    def summary_lines(self):
+        """分配结果的文本摘要"""
+        return [
+            f"分配了{len(self.assignments)}个寄存器的地址，其中{self.moved}个寄存器的原地址发生变化",
+            f"最高地址: {format_address(self.end - 1) if self.end else '-'}, "
+            f"译码位数: {self.decode_bits}, 最小BAR大小: {self.bar_size} 字节"
+        ]
+
+class AddressAllocator:
+    """寄存器地址分配器"""
+
+    def __init__(self, start=0, alignment=DEFAULT_ALIGNMENT, limit=ADDRESS_LIMIT):
+        """初始化地址分配器
+
+        Args:
+            start: 分配的起始地址
+            alignment: 默认对齐（字节，2的幂）
+            limit: 地址上限（不含）
+        """
+        if alignment <= 0 or alignment & (alignment - 1):
+            raise AllocationError(f"对齐必须是2的幂: {alignment}")
+        self.start = start
+        self.alignment = alignment
+        self.limit = limit
+        self._occupied = []
+
+    def reserve(self, address, size):
+        """将[address, address + size)标记为已占用"""
+        self._occupied.append((address, address + size))
+        return self
+
+    def reserve_registers(self, registers):
+        """将Register序列占用的区间标记为已占用"""
+        for reg in registers:
+            self._occupied.append((reg.address, reg.end_address + 1))
+        return self
+
+    def _free_gaps(self):
+        """按地址排序的空闲区间[(起始, 结束)]"""
+        gaps = []
+        cursor = self.start
+        for low, high in sorted(self._occupied):
+            if low > cursor:
+                gaps.append((cursor, min(low, self.limit)))
+            cursor = max(cursor, high)
+        if cursor < self.limit:
+            gaps.append((cursor, self.limit))
+        return gaps
+
+    def allocate(self, registers, relocate=False):
+        """为寄存器配置分配地址，结果直接写回各寄存器字典
+
+        Args:
+            registers: 寄存器配置字典列表
+            relocate: 为True时重新分配所有未标记fixed的寄存器，
+                      否则只分配没有地址（或地址为auto）的寄存器
+
+        Returns:
+            AllocationResult
+
+        Raises:
+            AllocationError: 地址空间不足或对齐要求无效
+            ValueError: 固定地址无法解析
+        """
+        pending = []
+        for index, reg in enumerate(registers):
+            raw = _raw_address(reg)
+            if raw in AUTO_ADDRESSES or (relocate and not reg.get("fixed")):
+                size = register_size(reg)
+                pending.append((_alignment(reg, size, self.alignment), size, index))
+            else:
+                address = parse_address(raw)
+                self.reserve(address, register_size(reg))
+
+        # 对齐和宽度较大的寄存器先分配，较小的寄存器再填充对齐留下的空隙；
+        # 同类寄存器保持配置中的顺序，地址随序号递增
+        pending.sort(key=lambda item: (-item[0], -item[1], item[2]))
+
+        gaps = self._free_gaps()
+        assignments = []
+        position = 0
+        current = None
+        for align, size, index in pending:
+            # 同一类寄存器放不下的空闲区间，后续同类寄存器也放不下，从上次的位置继续查找
+            if (align, size) != current:
+                current = (align, size)
+                position = 0
+            while position < len(gaps):
+                low, high = gaps[position]
+                address = (low + align - 1) & ~(align - 1)
+                if address + size <= high:
+                    break
+                position += 1
+            else:
+                reg = registers[index]
+                raise AllocationError(f"地址空间不足，无法为寄存器{reg.get('name', index)}分配地址")
+
+            # 拆分空闲区间：对齐留下的空隙保留在前，剩余部分在后
+            remainder = []
+            if address > low:
+                remainder.append((low, address))
+            if address + size < high:
+                remainder.append((address + size, high))
+            gaps[position:position + 1] = remainder
+            if address > low:
+                position += 1
+
+            reg = registers[index]
+            old = _raw_address(reg)
+            try:
+                old = parse_address(old) if old not in AUTO_ADDRESSES else None
+            except ValueError:
+                old = None
+            reg[_address_field(reg)] = format_address(address)
+            assignments.append((index, old, address))
+
+        assignments.sort()
+        return AllocationResult(assignments, registers, self.start)
+
+def allocate_register_addresses(device_config, relocate=False, reserve_base=True, start=0,
+                                alignment=DEFAULT_ALIGNMENT):
+    """为设备配置的key_registers分配地址，结果写回配置
+
+    基本寄存器（reserve_base为True时）、已启用的DMA寄存器和中断寄存器的区间不会被分配
+
+    Args:
+        device_config: 可修改的设备配置
+        relocate: 重新分配所有未标记fixed的设备寄存器
+        reserve_base: 保留基本寄存器占用的地址
+        start: 分配的起始地址
+        alignment: 默认对齐（字节）
+
+    Returns:
+        AllocationResult
+    """
+    index = RegisterIndex()
+    if reserve_base:
+        index.add_config(BASE_REGISTERS, "base")
+    dma_config = device_config.get("dma_config") or {}
+    if dma_config.get("enabled"):
+        index.add_config(dma_config.get("registers", []), "dma")
+    index.add_config((device_config.get("interrupt_config") or {}).get("registers", []), "interrupt")
+
+    allocator = AddressAllocator(start, alignment).reserve_registers(index.registers)
+    registers = device_config.setdefault("key_registers", [])
+    return allocator.allocate(registers, relocate=relocate)
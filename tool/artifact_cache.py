@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产物缓存模块
+基于内容寻址的磁盘缓存，在多次运行、多台机器之间复用已生成的文件
+"""
+
+import os
+import json
+import stat
+import shutil
+import hashlib
+import tempfile
+import threading
+
+from build_info import output_options
+from config_snapshot import canonical_json, snapshot_digest
+
+# 默认缓存目录，可通过环境变量PCIE_SPOOF_CACHE_DIR覆盖
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pcie_spoof")
+
+# 默认缓存容量上限（字节）
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 复制和计算摘要时每次读取的字节数
+_COPY_BLOCK_SIZE = 1 << 20
+
+class ArtifactCache:
+    """按LRU策略淘汰的内容寻址产物缓存
+    
+    缓存键由规范化的设备配置、生成器名称和模板版本计算得到。
+    缓存对象只读保存，索引中记录其SHA-256摘要和文件权限，取出时校验摘要，
+    命中时默认将缓存对象复制到输出目录，输出文件与缓存互不影响。
+    最近访问时间记录在索引项的修改时间上，不会改动缓存对象或已输出的文件
+    """
+    
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, use_hardlinks=False):
+        """初始化缓存
+        
+        Args:
+            cache_dir: 缓存目录，默认使用PCIE_SPOOF_CACHE_DIR环境变量或~/.cache/pcie_spoof
+            max_bytes: 缓存容量上限，超出后按最近最少使用淘汰
+            use_hardlinks: 命中时将只读的缓存对象硬链接到输出目录而不是复制，
+                           输出文件同样是只读的，需要修改时应重新生成而不是原地编辑
+        """
+        self.cache_dir = cache_dir or os.environ.get("PCIE_SPOOF_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        self.index_dir = os.path.join(self.cache_dir, "index")
+        self.max_bytes = max_bytes
+        self.use_hardlinks = use_hardlinks
+        
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+    
+    def make_key(self, device_config, generator_name, template_version, options=None):
+        """计算缓存键
+        
+        Args:
+            device_config: 设备配置字典或快照（快照的摘要只计算一次）
+            generator_name: 生成器名称（包括生成方法）
+            template_version: 生成器模板版本
+            options: 影响输出内容的生成选项
+            
+        Returns:
+            十六进制SHA-256缓存键
+        """
+        payload = canonical_json({
+            "config": snapshot_digest(device_config),
+            "generator": generator_name,
+            "version": template_version,
+            "options": options or {}
+        })
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _object_path(self, key):
+        """返回缓存键对应的对象文件路径"""
+        return os.path.join(self.objects_dir, key[:2], key)
+    
+    def _index_path(self, key):
+        """返回缓存键对应的索引项路径"""
+        return os.path.join(self.index_dir, key[:2], key)
+    
+    def fetch(self, key, output_file):
+        """从缓存中取出产物到输出文件
+        
+        输出文件内容已与缓存对象相同时不重写，保持其修改时间不变
+        
+        Returns:
+            是否命中缓存
+        """
+        index_path = self._index_path(key)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if _file_digest(output_file) != entry["sha256"]:
+                self._place(key, entry, output_file)
+            # 更新索引项的修改时间，用于LRU淘汰
+            os.utime(index_path, None)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return False
+        
+        with self._lock:
+            self.hits += 1
+        return True
+    
+    def _place(self, key, entry, output_file):
+        """校验缓存对象并放置到输出路径
+        
+        Raises:
+            OSError: 缓存对象不存在、摘要不一致或无法写入输出目录
+        """
+        object_path = self._object_path(key)
+        output_dir = os.path.dirname(os.path.abspath(output_file))
+        fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix=".cache_")
+        try:
+            linked = False
+            if self.use_hardlinks and _file_digest(object_path) == entry["sha256"]:
+                os.close(fd)
+                fd = None
+                os.unlink(temp_path)
+                try:
+                    os.link(object_path, temp_path)
+                    linked = True
+                except OSError:
+                    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+            if not linked:
+                with open(object_path, "rb") as source, os.fdopen(fd, "wb") as target:
+                    fd = None
+                    digest = _copy_with_digest(source, target)
+                if digest != entry["sha256"]:
+                    self._discard(key)
+                    raise OSError(f"缓存对象已损坏: {object_path}")
+                os.chmod(temp_path, entry["mode"])
+            os.replace(temp_path, output_file)
+        finally:
+            if fd is not None:
+                os.close(fd)
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def store(self, key, source_file):
+        """将已生成的文件存入缓存（缓存对象只读保存）"""
+        object_path = self._object_path(key)
+        index_path = self._index_path(key)
+        if os.path.exists(object_path) and os.path.exists(index_path):
+            return
+        
+        mode = stat.S_IMODE(os.stat(source_file).st_mode)
+        # 对象存在但索引项缺失时，内容一致的对象只需补写索引项，否则替换对象
+        replaced = os.path.getsize(object_path) if os.path.exists(object_path) else None
+        digest = _file_digest(object_path) if replaced is not None else None
+        added = 0
+        if digest is None or digest != _file_digest(source_file):
+            object_dir = os.path.dirname(object_path)
+            os.makedirs(object_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=object_dir, prefix=".tmp_")
+            try:
+                with open(source_file, "rb") as source, os.fdopen(fd, "wb") as target:
+                    digest = _copy_with_digest(source, target)
+                os.chmod(temp_path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+                if os.path.exists(object_path):
+                    _remove(object_path)
+                os.replace(temp_path, object_path)
+            finally:
+                if os.path.exists(temp_path):
+                    _remove(temp_path)
+            added = os.path.getsize(object_path) - (replaced or 0)
+        
+        index_dir = os.path.dirname(index_path)
+        os.makedirs(index_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=index_dir, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"sha256": digest, "mode": mode}, f)
+            os.replace(temp_path, index_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        
+        with self._lock:
+            self.stores += 1
+            if self._size is not None:
+                self._size += added
+            if self._current_size() > self.max_bytes:
+                self._evict()
+    
+    def _discard(self, key):
+        """删除缓存对象及其索引项"""
+        for path in (self._index_path(key), self._object_path(key)):
+            try:
+                _remove(path)
+            except OSError:
+                pass
+    
+    def _current_size(self):
+        """返回缓存当前占用的字节数（首次调用时扫描目录）"""
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._scan())
+        return self._size
+    
+    def _scan(self):
+        """遍历缓存对象，返回(缓存键, 大小, 最近访问时间)列表
+        
+        最近访问时间取索引项的修改时间，没有索引项的对象视为最早访问
+        """
+        entries = []
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name.startswith("."):
+                    continue
+                try:
+                    size = os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+                try:
+                    accessed = os.path.getmtime(self._index_path(name))
+                except OSError:
+                    accessed = 0.0
+                entries.append((name, size, accessed))
+        return entries
+    
+    def _evict(self):
+        """淘汰最近最少使用的对象，直到容量低于上限"""
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._discard(key)
+            total -= size
+            self.evictions += 1
+        self._size = total
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for directory in (self.index_dir, self.objects_dir):
+                shutil.rmtree(directory, onerror=_remove_readonly)
+                os.makedirs(directory, exist_ok=True)
+            self._size = 0
+    
+    def stats(self):
+        """返回缓存命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            "cache_dir": self.cache_dir,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+def _file_digest(path):
+    """返回文件的SHA-256十六进制摘要，文件不存在时返回None"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_COPY_BLOCK_SIZE), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def _copy_with_digest(source, target):
+    """将源文件对象复制到目标文件对象，返回内容的SHA-256十六进制摘要"""
+    digest = hashlib.sha256()
+    for block in iter(lambda: source.read(_COPY_BLOCK_SIZE), b""):
+        digest.update(block)
+        target.write(block)
+    return digest.hexdigest()
+
+def _remove(path):
+    """删除文件，只读文件（Windows上无法直接删除）先恢复写权限"""
+    try:
+        os.unlink(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        os.unlink(path)
+
+def _remove_readonly(function, path, _):
+    """shutil.rmtree的错误处理：恢复写权限后重试"""
+    if not os.path.exists(path):
+        return
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+    function(path)
+
+def artifact_cache_key(cache, device_config, generator_class, method_name):
+    """计算生成器类某个生成方法的缓存键
+    
+    缓存只用于可复现模式，选项中包含SOURCE_DATE_EPOCH，
+    不同构建时间生成的产物使用不同的缓存键
+    """
+    return cache.make_key(
+        device_config,
+        f"{generator_class.__name__}.{method_name}",
+        generator_class.GENERATOR_VERSION,
+        output_options(True)
+    )
+
+def generator_cache_key(generator, device_config, method_name):
+    """计算生成器实例某个生成方法的缓存键
+    
+    只有挂载了缓存且处于可复现模式的生成器才使用缓存，
+    否则输出中嵌入的时间戳会使缓存内容过期
+    
+    Returns:
+        缓存键，不使用缓存时返回None
+    """
+    cache = getattr(generator, "cache", None)
+    if cache is None or not getattr(generator, "deterministic", False):
+        return None
+    return artifact_cache_key(cache, device_config, type(generator), method_name)
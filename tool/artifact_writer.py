@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产物写入模块
+负责将生成的代码写入输出文件，内容未变化时保持文件不变
+
+所有产物先写入同目录下的临时文件，再通过重命名原子替换目标文件，
+构建过程或并发的重新生成不会读到写了一半的文件。
+也可以将整套产物直接写入单个zip或tar归档
+"""
+
+import io
+import os
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+
+# 流式写入时累积多少字符后编码并写入一次
+STREAM_BUFFER_SIZE = 1 << 16
+
+# 归档格式：扩展名 -> (格式, tarfile写入模式)
+BUNDLE_FORMATS = {
+    ".zip": ("zip", None),
+    ".tar": ("tar", "w"),
+    ".tar.gz": ("tar", "w:gz"),
+    ".tgz": ("tar", "w:gz"),
+    ".tar.xz": ("tar", "w:xz")
+}
+
+# tar成员超过该大小时暂存到磁盘
+_TAR_SPOOL_SIZE = 8 << 20
+
+# zip格式支持的最早修改时间（1980-01-01）
+_ZIP_MIN_MTIME = 315532800
+
+def _temp_path(output_file):
+    """目标文件同目录下的临时文件路径（同一文件系统内才能原子重命名）"""
+    directory, name = os.path.split(os.path.abspath(output_file))
+    return os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+@contextmanager
+def atomic_open(output_file, mode="wb", encoding=None):
+    """以原子替换方式打开文件用于写入
+    
+    写入同目录下的临时文件，正常退出时重命名为目标文件，发生异常时删除临时文件，
+    目标文件保持不变。重命名同时断开目标文件与产物缓存的硬链接
+    
+    Args:
+        output_file: 输出文件路径
+        mode: "wb"或"w"
+        encoding: 文本模式下的编码
+    """
+    temp_path = _temp_path(output_file)
+    # 与open()相同，按umask确定新文件权限
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(temp_path, output_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+def write_text_artifact(output_file, content, encoding="utf-8"):
+    """写入文本产物
+    
+    Args:
+        output_file: 输出文件路径
+        content: 文本内容
+        encoding: 文本编码
+        
+    Returns:
+        是否实际写入了文件
+    """
+    return write_bytes_artifact(output_file, content.encode(encoding))
+
+def write_bytes_artifact(output_file, data):
+    """写入已编码的产物内容
+    
+    如果目标文件已存在且内容完全相同，则不重写文件，
+    以保持其修改时间不变，避免触发下游FPGA构建步骤
+    
+    Args:
+        output_file: 输出文件路径
+        data: 字节内容
+        
+    Returns:
+        是否实际写入了文件
+    """
+    try:
+        if os.path.getsize(output_file) == len(data):
+            with open(output_file, "rb") as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    
+    # 原子替换，同时断开目标文件与产物缓存的硬链接，不会改写缓存内容
+    with atomic_open(output_file) as f:
+        f.write(data)
+    return True
+
+def write_chunked_artifact(output_file, chunks, encoding="utf-8", buffer_size=STREAM_BUFFER_SIZE):
+    """流式写入文本产物
+    
+    片段累积到buffer_size个字符后编码写入同目录下的临时文件，同时计算摘要，
+    内存中始终只保留一个缓冲区。全部写完后如果内容与现有文件相同则丢弃临时文件
+    （保持修改时间不变），否则用临时文件原子替换目标文件；替换同时断开与产物缓存的硬链接。
+    片段迭代过程中发生异常时删除临时文件，现有文件保持不变
+    
+    Args:
+        output_file: 输出文件路径
+        chunks: 文本片段的可迭代对象
+        encoding: 文本编码
+        buffer_size: 缓冲区大小（字符）
+        
+    Returns:
+        (是否实际写入了文件, 字节数, SHA-256十六进制摘要, 编码和写入耗时)
+    """
+    temp_path = _temp_path(output_file)
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            size, sha256, write_time = _write_chunks(f, chunks, encoding, buffer_size)
+        
+        start = time.perf_counter()
+        if _has_digest(output_file, size, sha256):
+            os.unlink(temp_path)
+            changed = False
+        else:
+            os.replace(temp_path, output_file)
+            changed = True
+        write_time += time.perf_counter() - start
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return changed, size, sha256.hexdigest(), write_time
+
+class ChunkedArtifact:
+    """由调用方逐段写入的流式文本产物
+
+    与write_chunked_artifact()相同：写入同目录下的临时文件并计算摘要，提交时内容未变化则保持
+    现有文件不变，否则原子替换。片段由调用方推送，一次遍历可以同时写入多个产物
+    """
+
+    def __init__(self, output_file, encoding="utf-8", buffer_size=STREAM_BUFFER_SIZE):
+        self.output_file = output_file
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.size = 0
+        self.write_time = 0.0
+        self._digest = hashlib.sha256()
+        self._pending = []
+        self._pending_size = 0
+        self._temp_path = _temp_path(output_file)
+        fd = os.open(self._temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        """写入一个文本片段，累积到buffer_size个字符后编码写入临时文件"""
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+        if self._pending_size >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        start = time.perf_counter()
+        data = "".join(self._pending).encode(self.encoding)
+        self._file.write(data)
+        self._digest.update(data)
+        self.size += len(data)
+        self._pending = []
+        self._pending_size = 0
+        self.write_time += time.perf_counter() - start
+
+    def commit(self):
+        """完成写入，内容变化时替换目标文件
+
+        Returns:
+            (是否实际写入了文件, 字节数, SHA-256十六进制摘要, 编码和写入耗时)
+        """
+        try:
+            self._flush()
+            start = time.perf_counter()
+            self._file.close()
+            if _has_digest(self.output_file, self.size, self._digest):
+                os.unlink(self._temp_path)
+                changed = False
+            else:
+                os.replace(self._temp_path, self.output_file)
+                changed = True
+            self.write_time += time.perf_counter() - start
+        except BaseException:
+            self.abort()
+            raise
+        return changed, self.size, self._digest.hexdigest(), self.write_time
+
+    def abort(self):
+        """放弃写入，删除临时文件，现有文件保持不变"""
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.unlink(self._temp_path)
+
+def _write_chunks(f, chunks, encoding, buffer_size=STREAM_BUFFER_SIZE):
+    """将文本片段分批编码写入二进制文件对象
+        
+    Returns:
+        (字节数, hashlib摘要对象, 编码和写入耗时)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    write_time = 0.0
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < buffer_size:
+            continue
+        start = time.perf_counter()
+        data = "".join(pending).encode(encoding)
+        f.write(data)
+        digest.update(data)
+        size += len(data)
+        write_time += time.perf_counter() - start
+        pending = []
+        pending_size = 0
+    start = time.perf_counter()
+    data = "".join(pending).encode(encoding)
+    f.write(data)
+    digest.update(data)
+    size += len(data)
+    write_time += time.perf_counter() - start
+    return size, digest, write_time
+
+def _has_digest(path, size, expected):
+    """判断文件大小和SHA-256摘要是否与给定摘要对象相同"""
+    try:
+        if os.path.getsize(path) != size:
+            return False
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.digest() == expected.digest()
+    except OSError:
+        return False
+
+def sync_artifacts(paths):
+    """将一批已写入的产物持久化到磁盘
+    
+    逐个fsync本批写入的文件，再对涉及的每个父目录fsync一次，使原子替换产生的
+    重命名同样持久化；只同步本批产物，不影响系统中其他文件系统。
+    原子替换保证读者不会看到写了一半的文件，同步则保证系统崩溃后已报告成功的产物不会丢失
+    
+    Args:
+        paths: 本批写入的文件路径
+    """
+    directories = []
+    for path in paths:
+        _fsync_file(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        if directory not in directories:
+            directories.append(directory)
+    for directory in directories:
+        _fsync_directory(directory)
+
+def _fsync_file(path):
+    """将文件内容同步到磁盘（Windows上fsync需要可写的文件描述符）"""
+    flags = os.O_RDWR if os.name == "nt" else os.O_RDONLY
+    fd = os.open(path, flags | getattr(os, "O_BINARY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _fsync_directory(directory):
+    """将目录项同步到磁盘，使其中的重命名持久化
+    
+    Windows上无法打开目录，重命名由文件系统日志保证；
+    部分文件系统不支持对目录fsync，此时忽略
+    """
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def bundle_format(path):
+    """根据扩展名判断归档格式，不是支持的归档时返回None"""
+    lower = path.lower()
+    for suffix in sorted(BUNDLE_FORMATS, key=len, reverse=True):
+        if lower.endswith(suffix):
+            return BUNDLE_FORMATS[suffix]
+    return None
+
+class BundleWriter:
+    """将产物直接写入单个zip或tar归档
+    
+    归档先写入临时文件，close()时原子替换目标文件；中途失败时丢弃临时文件，
+    因此归档要么是完整的上一版本，要么是完整的新版本
+    """
+    
+    def __init__(self, path, root="", mtime=None, fsync=False):
+        """创建归档
+        
+        Args:
+            path: 归档路径，格式由扩展名决定（.zip、.tar、.tar.gz、.tgz、.tar.xz）
+            root: 归档内的顶层目录名，为空时产物位于归档根目录
+            mtime: 成员修改时间（Unix时间），为None时使用当前时间
+            fsync: 关闭时是否将归档同步到磁盘
+            
+        Raises:
+            ValueError: 不支持的归档格式
+        """
+        # 归档模块只在写入归档时才需要，导入开销较大，不在模块加载时导入
+        import gzip
+        import tarfile
+        import zipfile
+        
+        bundle = bundle_format(path)
+        if bundle is None:
+            raise ValueError(f"不支持的归档格式: {path} (支持 {', '.join(BUNDLE_FORMATS)})")
+        self.path = path
+        self.format, tar_mode = bundle
+        self.root = root.strip("/")
+        self.mtime = time.time() if mtime is None else mtime
+        self.fsync = fsync
+        self._temp_path = _temp_path(path)
+        self._fileobj = None
+        if self.format == "zip":
+            self._archive = zipfile.ZipFile(self._temp_path, "w", zipfile.ZIP_DEFLATED)
+        elif tar_mode == "w:gz":
+            # gzip头部默认包含当前时间和文件名，显式指定以保证归档可复现
+            self._fileobj = gzip.GzipFile("", "wb", fileobj=open(self._temp_path, "wb"), mtime=int(self.mtime))
+            self._archive = tarfile.open(fileobj=self._fileobj, mode="w", format=tarfile.PAX_FORMAT)
+        else:
+            self._archive = tarfile.open(self._temp_path, tar_mode, format=tarfile.PAX_FORMAT)
+        self._closed = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+    
+    def _member_name(self, name):
+        return f"{self.root}/{name}" if self.root else name
+    
+    def add_chunks(self, name, chunks, encoding="utf-8", mode=0o644):
+        """流式写入一个文本成员
+        
+        Args:
+            name: 成员文件名
+            chunks: 文本片段的可迭代对象
+            encoding: 文本编码
+            mode: 成员文件权限
+            
+        Returns:
+            (字节数, SHA-256十六进制摘要)
+        """
+        import tarfile
+        import tempfile
+        import zipfile
+        
+        member = self._member_name(name)
+        if self.format == "zip":
+            info = zipfile.ZipInfo(member, time.gmtime(max(self.mtime, _ZIP_MIN_MTIME))[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o100000 | mode) << 16
+            with self._archive.open(info, "w") as f:
+                size, digest, _ = _write_chunks(f, chunks, encoding)
+            return size, digest.hexdigest()
+        
+        # tar成员头部需要预先知道大小，先写入暂存文件
+        with tempfile.SpooledTemporaryFile(max_size=_TAR_SPOOL_SIZE) as spool:
+            size, digest, _ = _write_chunks(spool, chunks, encoding)
+            spool.seek(0)
+            info = tarfile.TarInfo(member)
+            info.size = size
+            info.mtime = int(self.mtime)
+            info.mode = mode
+            self._archive.addfile(info, spool)
+        return size, digest.hexdigest()
+    
+    def add_bytes(self, name, data, mode=0o644):
+        """写入一个二进制成员，返回(字节数, SHA-256十六进制摘要)"""
+        import tarfile
+        import zipfile
+        
+        member = self._member_name(name)
+        if self.format == "zip":
+            info = zipfile.ZipInfo(member, time.gmtime(max(self.mtime, _ZIP_MIN_MTIME))[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o100000 | mode) << 16
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            info.mtime = int(self.mtime)
+            info.mode = mode
+            self._archive.addfile(info, io.BytesIO(data))
+        return len(data), hashlib.sha256(data).hexdigest()
+    
+    def close(self):
+        """完成归档并原子替换目标文件"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._close_archive()
+            if self.fsync:
+                _fsync_file(self._temp_path)
+            os.replace(self._temp_path, self.path)
+            if self.fsync:
+                _fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+        except BaseException:
+            if os.path.exists(self._temp_path):
+                os.unlink(self._temp_path)
+            raise
+    
+    def abort(self):
+        """放弃归档，目标文件保持不变"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._close_archive()
+        finally:
+            if os.path.exists(self._temp_path):
+                os.unlink(self._temp_path)
+    
+    def _close_archive(self):
+        self._archive.close()
+        if self._fileobj is not None:
+            raw = self._fileobj.fileobj
+            self._fileobj.close()
+            raw.close()
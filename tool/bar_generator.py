@@ -5,18 +5,91 @@ BAR空间生成模块
 负责生成PCIe设备的BAR寄存器实现
 """
 
-import os
+import time
 import re
+from itertools import groupby
+
+from generation_result import GenerationResult, write_generated_artifact, write_streamed_artifact
+from profiler import profiled
+from build_info import generation_timestamp
+from artifact_cache import generator_cache_key
+from template_engine import get_template, join_chunks
+from register_model import build_register_model, parse_constant
+from coe_format import format_coe
+
+# 常量寄存器ROM镜像的文件名，与BAR控制器输出到同一目录
+CONST_ROM_FILENAME = "bar_const_rom.coe"
+
+class ConstantRom:
+    """常量寄存器ROM的布局：从base开始的depth个32位字"""
+    
+    __slots__ = ("base", "depth", "values")
+    
+    def __init__(self, base=0, depth=0, values=None):
+        self.base = base
+        self.depth = depth
+        self.values = values or {}
+    
+    def __contains__(self, address):
+        return address in self.values
+    
+    def __bool__(self):
+        return bool(self.values)
+    
+    @property
+    def address_width(self):
+        """ROM地址位宽"""
+        return max(1, (self.depth - 1).bit_length())
 
 class BARGenerator:
     """BAR空间控制器生成类"""
     
-    def __init__(self):
-        """初始化BAR空间生成模块"""
+    # 生成器版本，模板或生成逻辑变化时递增，使增量生成的指纹失效
+    GENERATOR_VERSION = "1.2.2"
+    
+    # 各生成方法实际使用的配置字段，用于计算增量生成指纹
+    INPUT_KEYS = {
+        "generate_bar_controller": ("name", "vendor_id", "device_id", "key_registers",
+                                    "bar_decode", "bar_decode_bank_bits", "bar_ro_storage"),
+        "generate_const_rom": ("key_registers",)
+    }
+    
+    # 寄存器地址译码结构（配置字段bar_decode）
+    # chain: 优先级if/else链，与早期版本输出相同
+    # case: 单级并行case，每个地址一个分支
+    # banked: 先按地址高位选择寄存器组，再在组内按低位译码的两级case
+    DECODE_STYLES = ("chain", "case", "banked")
+    
+    # banked译码默认的组内地址位数（配置字段bar_decode_bank_bits），每组256字节即64个寄存器
+    DEFAULT_BANK_BITS = 8
+    
+    # 只读常量寄存器的存放方式（配置字段bar_ro_storage）
+    # logic: 常量作为译码逻辑中的字面量
+    # rom: 常量放入ROM镜像（COE文件），寄存器逻辑中只保留可写和非常量寄存器
+    RO_STORAGE_MODES = ("logic", "rom")
+    
+    # 常量寄存器ROM的最大深度（32位字），常量的地址跨度更大时只选取常量最多的窗口
+    MAX_CONST_ROM_DEPTH = 1 << 14
+    
+    # ROM中没有常量寄存器的字，与未知寄存器的读取值相同
+    CONST_ROM_FILL = "DEADBEEF"
+    
+    def __init__(self, deterministic=False, cache=None):
+        """初始化BAR空间生成模块
+        
+        Args:
+            deterministic: 是否生成不含当前时间的可复现输出
+            cache: 产物缓存(ArtifactCache)，仅在可复现模式下使用
+        """
+        self.deterministic = deterministic
+        self.cache = cache
         self.templates = {
-            "bar_controller": self._load_bar_controller_template(),
-            "read_handler": self._load_read_handler_template(),
-            "write_handler": self._load_write_handler_template()
+            "bar_controller": get_template("bar.bar_controller", self._load_bar_controller_template),
+            "read_handler": get_template("bar.read_handler", self._load_read_handler_template),
+            "write_handler": get_template("bar.write_handler", self._load_write_handler_template),
+            "read_case_item": get_template("bar.read_case_item", self._load_read_case_item_template),
+            "write_case_item": get_template("bar.write_case_item", self._load_write_case_item_template),
+            "const_rom": get_template("bar.const_rom", self._load_const_rom_template)
         }
     
     def _load_bar_controller_template(self):
@@ -69,8 +142,12 @@ module {module_name} #(
     // 版本信息
     localparam VERSION_INFO = 32'h{version_info};
     
+    // 读写地址相对BAR基址的偏移
+    wire [31:0] rd_offset = drd_addr - base_address_register;
+    wire [31:0] wr_offset = dwr_addr - base_address_register;
+    
     // 设备特有寄存器
-    {device_registers}
+    {device_registers}{const_rom}
     
     // ==========================================================================
     // 中断控制逻辑
@@ -108,20 +185,12 @@ module {module_name} #(
     always @(posedge clk) begin
         if (rst) begin
             rd_rsp_valid <= 1'b0;
-            rd_rsp_data <= 32'h0;
+            {read_reset}
         end else begin
             rd_rsp_valid <= drd_valid;
             
             if (drd_valid) begin
-                // 计算寄存器地址偏移
-                reg_offset = drd_addr - base_address_register;
-                
-                {read_handler}
-                
-                else begin
-                    // 未知寄存器返回默认值
-                    rd_rsp_data <= 32'hDEADBEEF;
-                end
+                {read_decode}
             end
         end
     end
@@ -139,10 +208,7 @@ module {module_name} #(
             int_enable <= 32'h00000000;
             {reset_values}
         end else if (dwr_valid) begin
-            // 计算寄存器地址偏移
-            reg_offset = dwr_addr - base_address_register;
-            
-            {write_handler}
+            {write_decode}
         end
     end
 
@@ -153,38 +219,87 @@ endmodule
         """加载读处理程序模板"""
         return """
                 // 读操作处理
-                if (reg_offset == 32'h{offset}) begin
+                if (rd_offset == 32'h{offset}) begin
                     // {name}
-                    rd_rsp_data <= {read_value};
+                    {read_target} <= {read_value};
                 end"""
     
     def _load_write_handler_template(self):
         """加载写处理程序模板"""
         return """
             // 写操作处理 - {name}
-            if (reg_offset == 32'h{offset}) begin
+            if (wr_offset == 32'h{offset}) begin
                 {write_action}
             end"""
     
+    def _load_read_case_item_template(self):
+        """加载读译码case分支模板"""
+        return """
+                    {label}: begin
+                        // {name}
+                        {read_target} <= {read_value};
+                    end"""
+    
+    def _load_write_case_item_template(self):
+        """加载写译码case分支模板"""
+        return """
+                {label}: begin
+                    {write_actions}
+                end"""
+    
+    def _load_const_rom_template(self):
+        """加载常量寄存器ROM模板"""
+        return """
+    
+    // ==========================================================================
+    // 常量寄存器ROM
+    // ==========================================================================
+    
+    // 只读常量寄存器存放在ROM中，不占用寄存器和译码逻辑
+    // 在Vivado中使用Block Memory Generator创建名为{rom_module}的单端口ROM:
+    // 位宽32，深度{depth}，初始化文件{coe_file}，不使用输出寄存器（读延迟1个时钟周期）
+    localparam [31:0] CONST_ROM_BASE  = 32'h{base};
+    localparam        CONST_ROM_DEPTH = {depth};
+    
+    wire [31:0] const_rom_offset = rd_offset - CONST_ROM_BASE;
+    wire        const_rom_hit = (const_rom_offset[1:0] == 2'b00) && (const_rom_offset[31:2] < CONST_ROM_DEPTH);
+    wire [31:0] const_rom_data;
+    
+    // 上一周期的读请求是否由ROM响应
+    reg         rd_rom_sel = 1'b0;
+    reg  [31:0] rd_fabric_data;
+    
+    {rom_module} i_const_rom (
+        .clka(clk),
+        .ena(drd_valid),
+        .addra(const_rom_offset[{address_msb}:2]),
+        .douta(const_rom_data)
+    );
+    
+    // ROM数据与读响应寄存器在同一时钟沿有效，读延迟与其他寄存器相同
+    always @(*) begin
+        rd_rsp_data = rd_rom_sel ? const_rom_data : rd_fabric_data;
+    end"""
+    
     def _get_access_type_handler(self, register, is_read=True):
-        """根据寄存器访问类型生成处理代码"""
-        access_type = register.get("access", "RW").upper()
-        reg_name = register.get("var_name", "custom_reg")
+        """根据寄存器访问类型生成处理代码
+        
+        Args:
+            register: 寄存器模型中的Register，访问类型已规范化
+            is_read: 生成读处理（True）还是写处理（False）
+        """
+        access_type = register.access
+        reg_name = register.var_name
         
         if is_read:
             # 读取处理
-            if "RO" in access_type:
-                # 只读寄存器
-                if "reg" in register.get("value", "").lower():
-                    # 使用现有变量
-                    return register.get("value", reg_name)
-                else:
-                    # 使用常量值
-                    return register.get("value", "32'h00000000")
-            elif "RC" in access_type:
+            if access_type == "RO":
+                # 只读寄存器：引用现有变量或使用常量值，未指定值时读取寄存器变量
+                return register.value if register.value is not None else reg_name
+            elif access_type == "RC":
                 # 读清除寄存器
                 result = f"{reg_name}"
-                if not register.get("no_auto_clear", False):
+                if not register.no_auto_clear:
                     result += f";\n                    {reg_name} <= 32'h0"
                 return result
             else:
@@ -192,99 +307,423 @@ endmodule
                 return reg_name
         else:
             # 写入处理
-            if "WO" in access_type or "RW" in access_type:
+            if access_type in ("WO", "RW"):
                 # 只写或读写寄存器
-                return f"{reg_name} <= dwr_data"
-            elif "W1C" in access_type:
+                return f"{reg_name} <= dwr_data;"
+            elif access_type == "W1C":
                 # 写1清除寄存器
-                return f"{reg_name} <= {reg_name} & ~dwr_data"
-            elif "W1S" in access_type:
+                return f"{reg_name} <= {reg_name} & ~dwr_data;"
+            elif access_type == "W1S":
                 # 写1置位寄存器
-                return f"{reg_name} <= {reg_name} | dwr_data"
+                return f"{reg_name} <= {reg_name} | dwr_data;"
             else:
                 # 写入无效（只读寄存器）
                 return "// 只读寄存器，忽略写入操作"
     
-    def generate_bar_controller(self, device_config, output_file):
-        """生成BAR控制器代码"""
-        try:
-            # 准备设备特有寄存器定义
-            registers = device_config.get("key_registers", [])
+    def render_bar_controller(self, device_config, register_model=None):
+        """在内存中渲染BAR控制器代码，不写入文件
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            device_name = device_config.get("name", "自定义设备")
-            module_name = self._sanitize_module_name(device_name)
+        Returns:
+            代码文本
+        """
+        return "".join(self.stream_bar_controller(device_config, register_model))
+    
+    def stream_bar_controller(self, device_config, register_model=None):
+        """流式渲染BAR控制器代码
+        
+        各寄存器的定义、读写处理和复位值在迭代时逐个生成，
+        内存中不保存完整的处理程序列表和输出文本
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            # 处理设备寄存器
-            device_registers = []
-            read_handlers = []
-            write_handlers = []
-            reset_values = []
+        Returns:
+            代码片段的迭代器
+        """
+        # 准备设备特有寄存器定义
+        if register_model is None:
+            register_model = build_register_model(device_config)
+        
+        device_name = device_config.get("name", "自定义设备")
+        module_name = self._sanitize_module_name(device_name)
+        
+        # 版本信息，使用设备ID+供应商ID
+        version_info = f"{device_config.get('device_id', 'FFFF')}{device_config.get('vendor_id', 'FFFF')}"
+        
+        # 译码结构和常量存放方式在开始输出之前检查
+        decode_style, bank_bits = self._get_decode_style(device_config)
+        const_rom = ConstantRom()
+        if self._get_ro_storage(device_config) == "rom":
+            const_rom = self.build_const_rom(register_model)
+        
+        # 使用ROM时寄存器逻辑的读取结果先写入rd_fabric_data，再与ROM数据选择输出
+        read_target = "rd_fabric_data" if const_rom else "rd_rsp_data"
+        read_reset = f"{read_target} <= 32'h0;"
+        if const_rom:
+            # 复位期间读响应不能选择ROM数据
+            read_reset += "\n            rd_rom_sel <= 1'b0;"
+        
+        # 格式化最终模板，寄存器相关的插槽在写出时才生成
+        return self.templates["bar_controller"].iter_render(
+            device_name=device_name,
+            module_name=module_name + "_bar_controller",
+            timestamp=generation_timestamp(self.deterministic, self.GENERATOR_VERSION),
+            version_info=version_info,
+            device_registers=join_chunks("\n    ", self._iter_register_declarations(register_model)),
+            const_rom=self._render_const_rom_logic(module_name, const_rom) if const_rom else "",
+            read_target=read_target,
+            read_reset=read_reset,
+            read_decode=self._iter_read_decode(register_model, decode_style, bank_bits, const_rom,
+                                               read_target),
+            write_decode=self._iter_write_decode(register_model, decode_style, bank_bits),
+            reset_values=join_chunks("\n            ", self._iter_reset_values(register_model))
+        )
+    
+    def _get_decode_style(self, device_config):
+        """返回配置的地址译码结构和banked译码的组内地址位数
+        
+        Raises:
+            ValueError: 不支持的译码结构或组内地址位数
+        """
+        decode_style = str(device_config.get("bar_decode") or "chain").strip().lower()
+        if decode_style not in self.DECODE_STYLES:
+            raise ValueError(f"不支持的BAR地址译码结构: {decode_style} "
+                             f"(支持 {', '.join(self.DECODE_STYLES)})")
+        bank_bits = int(device_config.get("bar_decode_bank_bits") or self.DEFAULT_BANK_BITS)
+        if not 2 <= bank_bits <= 30:
+            raise ValueError(f"bar_decode_bank_bits必须在2到30之间: {bank_bits}")
+        return decode_style, bank_bits
+    
+    def _get_ro_storage(self, device_config):
+        """返回配置的只读常量寄存器存放方式
+        
+        Raises:
+            ValueError: 不支持的存放方式
+        """
+        ro_storage = str(device_config.get("bar_ro_storage") or "logic").strip().lower()
+        if ro_storage not in self.RO_STORAGE_MODES:
+            raise ValueError(f"不支持的只读寄存器存放方式: {ro_storage} "
+                             f"(支持 {', '.join(self.RO_STORAGE_MODES)})")
+        return ro_storage
+    
+    def build_const_rom(self, register_model):
+        """选取放入ROM的常量寄存器
+        
+        每个地址只考虑第一个寄存器（与读译码的优先级一致），该寄存器须为4字节对齐的
+        32位只读寄存器且取值为常量字面量。常量的地址跨度超过MAX_CONST_ROM_DEPTH时
+        选取包含常量最多的窗口，窗口外的常量仍保留在译码逻辑中
+        
+        Args:
+            register_model: 寄存器模型
             
-            for i, reg in enumerate(registers):
-                # 如果没有指定变量名，创建一个
-                if "var_name" not in reg:
-                    reg["var_name"] = f"custom_reg_{i}"
-                
-                # 添加寄存器定义
-                if "RO" not in reg.get("access", "RW").upper() or "value" not in reg or "reg" in reg["value"].lower():
-                    device_registers.append(f"reg [31:0] {reg['var_name']};")
+        Returns:
+            ConstantRom，没有可放入ROM的常量时为空
+        """
+        candidates = []
+        for address, group in groupby(register_model, key=self._register_address):
+            reg = next(group)
+            if not (reg.is_constant and reg.width == 32 and address % 4 == 0):
+                continue
+            value = parse_constant(reg.value)
+            if value is not None and 0 <= value <= 0xFFFFFFFF:
+                candidates.append((address, value))
+        if not candidates:
+            return ConstantRom()
+        
+        # 地址已排序，用双指针找出跨度不超过最大深度且常量最多的窗口
+        span = self.MAX_CONST_ROM_DEPTH * 4
+        best_low, best_high = 0, 0
+        low = 0
+        for high in range(len(candidates)):
+            while candidates[high][0] - candidates[low][0] >= span:
+                low += 1
+            if high - low > best_high - best_low:
+                best_low, best_high = low, high
+        
+        selected = candidates[best_low:best_high + 1]
+        base = selected[0][0]
+        return ConstantRom(base, (selected[-1][0] - base) // 4 + 1, dict(selected))
+    
+    def _render_const_rom_logic(self, module_name, const_rom):
+        """常量寄存器ROM的实例化和读响应选择逻辑"""
+        return self.templates["const_rom"].render(
+            rom_module=module_name + "_const_rom",
+            coe_file=CONST_ROM_FILENAME,
+            base=f"{const_rom.base:08X}",
+            depth=const_rom.depth,
+            address_msb=const_rom.address_width + 1
+        )
+    
+    def _read_default(self, read_target, const_rom, indent):
+        """未匹配任何寄存器时的读处理语句"""
+        if not const_rom:
+            lines = ["// 未知寄存器返回默认值", f"{read_target} <= 32'hDEADBEEF;"]
+        else:
+            lines = ["// 寄存器逻辑中没有的地址由常量ROM响应，ROM以外的地址返回默认值",
+                     f"{read_target} <= 32'hDEADBEEF;",
+                     "rd_rom_sel <= const_rom_hit;"]
+        return ("\n" + " " * indent).join(lines)
+    
+    def _iter_read_decode(self, register_model, decode_style, bank_bits, const_rom, read_target):
+        """读地址译码，未映射的地址返回32'hDEADBEEF或由常量ROM响应"""
+        # ROM中的常量寄存器不参与译码
+        registers = iter(register_model)
+        if const_rom:
+            registers = (reg for reg in register_model if reg.address not in const_rom)
+        
+        if decode_style == "chain":
+            handlers = self._iter_read_handlers(registers, read_target)
+            first = next(handlers, None)
+            if first is None:
+                yield self._read_default(read_target, const_rom, 16)
+                return
+            if const_rom:
+                # 匹配寄存器逻辑时不选择ROM，未匹配时由默认分支覆盖
+                yield "rd_rom_sel <= 1'b0;\n                "
+            yield first
+            for handler in handlers:
+                yield " else"
+                yield handler
+            yield f"""
                 
-                # 读处理程序
-                read_value = self._get_access_type_handler(reg, is_read=True)
-                read_handler = self.templates["read_handler"].format(
-                    offset=reg["addr"].replace("0x", ""),
-                    name=reg.get("name", f"寄存器 {reg['addr']}"),
-                    read_value=read_value
+                else begin
+                    {self._read_default(read_target, const_rom, 20)}
+                end"""
+            return
+        
+        # 地址相同的寄存器只保留第一个，与if/else链的优先级一致，case分支互斥
+        registers = (next(group) for _, group in groupby(registers, key=self._register_address))
+        default = f"""
+                    default: begin
+                        {self._read_default(read_target, const_rom, 24)}
+                    end
+                endcase"""
+        if const_rom:
+            yield "rd_rom_sel <= 1'b0;\n                "
+        if decode_style == "case":
+            yield "case (rd_offset)"
+            yield from self._iter_read_case_items(registers, 32, 0, read_target)
+            yield default
+            return
+        
+        # banked: 外层按地址高位选择寄存器组，内层在组内按低位译码
+        bank_width = 32 - bank_bits
+        yield f"case (rd_offset[31:{bank_bits}])"
+        for bank, bank_registers in groupby(registers, key=lambda reg: reg.address >> bank_bits):
+            yield f"""
+                    {bank_width}'h{bank:0{(bank_width + 3) // 4}X}: begin
+                        case (rd_offset[{bank_bits - 1}:0])"""
+            for item in self._iter_read_case_items(bank_registers, bank_bits, bank << bank_bits, read_target):
+                yield item.replace("\n", "\n        ")
+            yield default.replace("\n", "\n        ")
+            yield """
+                    end"""
+        yield default
+    
+    def _iter_read_case_items(self, registers, width, base, read_target):
+        """读译码的case分支，分支标签为相对base的width位地址"""
+        template = self.templates["read_case_item"]
+        digits = (width + 3) // 4
+        for reg in registers:
+            # 多行的读处理（读清除）缩进到分支内部
+            read_value = self._get_access_type_handler(reg, is_read=True).replace("\n", "\n    ")
+            yield template.render(
+                label=f"{width}'h{reg.address - base:0{digits}X}",
+                name=reg.name,
+                read_target=read_target,
+                read_value=read_value
+            )
+    
+    def _iter_write_decode(self, register_model, decode_style, bank_bits):
+        """写地址译码，未映射的地址忽略写入"""
+        if decode_style == "chain":
+            yield from join_chunks("\n", self._iter_write_handlers(register_model))
+            return
+        
+        default = """
+                default: begin
+                    // 未映射的地址，忽略写入
+                end
+            endcase"""
+        writable = (reg for reg in register_model if reg.access != "RO")
+        # 地址相同的可写寄存器合并到同一分支，与各自独立的if语句效果相同
+        groups = ((address, list(group)) for address, group in groupby(writable, key=self._register_address))
+        if decode_style == "case":
+            yield "case (wr_offset)"
+            yield from self._iter_write_case_items(groups, 32, 0)
+            yield default
+            return
+        
+        bank_width = 32 - bank_bits
+        yield f"case (wr_offset[31:{bank_bits}])"
+        for bank, bank_groups in groupby(groups, key=lambda group: group[0] >> bank_bits):
+            yield f"""
+                {bank_width}'h{bank:0{(bank_width + 3) // 4}X}: begin
+                    case (wr_offset[{bank_bits - 1}:0])"""
+            for item in self._iter_write_case_items(bank_groups, bank_bits, bank << bank_bits):
+                yield item.replace("\n", "\n        ")
+            yield default.replace("\n", "\n        ")
+            yield """
+                end"""
+        yield default
+    
+    def _iter_write_case_items(self, groups, width, base):
+        """写译码的case分支，groups为(地址, 寄存器列表)"""
+        template = self.templates["write_case_item"]
+        digits = (width + 3) // 4
+        for address, registers in groups:
+            write_actions = "\n                    ".join(
+                f"// 写操作处理 - {reg.name}\n                    "
+                f"{self._get_access_type_handler(reg, is_read=False)}"
+                for reg in registers
+            )
+            yield template.render(
+                label=f"{width}'h{address - base:0{digits}X}",
+                write_actions=write_actions
+            )
+    
+    @staticmethod
+    def _register_address(reg):
+        return reg.address
+    
+    def _iter_register_declarations(self, register_model):
+        """寄存器变量定义（只读常量寄存器没有寄存器变量）"""
+        for reg in register_model:
+            if reg.needs_storage:
+                yield f"reg [31:0] {reg.var_name};"
+    
+    def _iter_read_handlers(self, registers, read_target="rd_rsp_data"):
+        """各寄存器的读处理程序"""
+        template = self.templates["read_handler"]
+        for reg in registers:
+            yield template.render(
+                offset=f"{reg.address:08X}",
+                name=reg.name,
+                read_target=read_target,
+                read_value=self._get_access_type_handler(reg, is_read=True)
+            )
+    
+    def _iter_write_handlers(self, register_model):
+        """可写寄存器的写处理程序"""
+        template = self.templates["write_handler"]
+        for reg in register_model:
+            if reg.access != "RO":
+                yield template.render(
+                    offset=f"{reg.address:08X}",
+                    name=reg.name,
+                    write_action=self._get_access_type_handler(reg, is_read=False)
                 )
-                read_handlers.append(read_handler)
-                
-                # 写处理程序
-                access_type = reg.get("access", "RW").upper()
-                if "RO" not in access_type:
-                    write_action = self._get_access_type_handler(reg, is_read=False)
-                    write_handler = self.templates["write_handler"].format(
-                        offset=reg["addr"].replace("0x", ""),
-                        name=reg.get("name", f"寄存器 {reg['addr']}"),
-                        write_action=write_action
-                    )
-                    write_handlers.append(write_handler)
-                
-                # 复位值
-                if "var_name" in reg and "reset_value" in reg:
-                    reset_values.append(f"{reg['var_name']} <= {reg['reset_value']};")
-                elif "var_name" in reg:
-                    reset_values.append(f"{reg['var_name']} <= 32'h00000000;")
+    
+    def _iter_reset_values(self, register_model):
+        """寄存器复位值（只读常量寄存器没有寄存器变量，无需复位）"""
+        for reg in register_model:
+            if reg.needs_storage:
+                reset_value = reg.reset_value if reg.reset_value is not None else "32'h00000000"
+                yield f"{reg.var_name} <= {reset_value};"
+    
+    @profiled("BARGenerator.generate_bar_controller")
+    def generate_bar_controller(self, device_config, output_file, register_model=None):
+        """生成BAR控制器代码
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            output_file: 输出文件路径
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            # 版本信息，使用设备ID+供应商ID
-            version_info = f"{device_config.get('device_id', 'FFFF')}{device_config.get('vendor_id', 'FFFF')}"
+        Returns:
+            GenerationResult，真值表示是否生成成功
+        """
+        start = time.perf_counter()
+        try:
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_bar_controller")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ BAR控制器代码已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 格式化最终模板
-            code = self.templates["bar_controller"].format(
-                device_name=device_name,
-                module_name=module_name + "_bar_controller",
-                timestamp=__import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                version_info=version_info,
-                device_registers="\n    ".join(device_registers),
-                read_handler="else".join(read_handlers),
-                write_handler="\n".join(write_handlers),
-                reset_values="\n            ".join(reset_values)
+            # 流式渲染并写入输出文件，峰值内存不随寄存器数量增长
+            result = write_streamed_artifact(
+                output_file, self.stream_bar_controller(device_config, register_model), start
             )
             
-            # 写入输出文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(code)
+            if cache_key:
+                self.cache.store(cache_key, output_file)
             
             print(f"✅ BAR控制器代码已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成BAR控制器代码失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
+    
+    def render_const_rom(self, device_config, register_model=None):
+        """在内存中渲染常量寄存器ROM镜像（COE文件），不写入文件
+        
+        ROM从ConstantRom.base开始，每个字对应一个4字节对齐的寄存器地址，
+        没有常量寄存器的字填充CONST_ROM_FILL。没有可放入ROM的常量时只包含一个填充字
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
+            
+        Returns:
+            COE文件文本
+        """
+        if register_model is None:
+            register_model = build_register_model(device_config)
+        
+        const_rom = self.build_const_rom(register_model)
+        words = [self.CONST_ROM_FILL] * max(const_rom.depth, 1)
+        for address, value in const_rom.values.items():
+            words[(address - const_rom.base) // 4] = f"{value:08X}"
+        return format_coe(words)
+    
+    @profiled("BARGenerator.generate_const_rom")
+    def generate_const_rom(self, device_config, output_file, register_model=None):
+        """生成常量寄存器ROM镜像
+        
+        配置bar_ro_storage为rom时BAR控制器从该ROM读取只读常量寄存器
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            output_file: 输出文件路径
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
+            
+        Returns:
+            GenerationResult，真值表示是否生成成功
+        """
+        start = time.perf_counter()
+        try:
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_const_rom")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ 常量寄存器ROM已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
+            
+            result = write_generated_artifact(
+                output_file, self.render_const_rom(device_config, register_model), start
+            )
+            
+            if cache_key:
+                self.cache.store(cache_key, output_file)
+            
+            print(f"✅ 常量寄存器ROM已生成: {output_file}")
+            return result
+        except Exception as e:
+            print(f"❌ 生成常量寄存器ROM失败: {str(e)}")
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
     
     def _sanitize_module_name(self, name):
         """将设备名称转换为有效的模块名"""
+        # SV标识符只能使用ASCII字符，先移除中文等非ASCII字符
+        name = re.sub(r'[^\x00-\x7F]+', '', name)
         # 移除非字母数字字符，转换为小写
         name = re.sub(r'[^\w]', '_', name).lower()
         # 确保开头是字母
         if name and not name[0].isalpha():
             name = "dev_" + name
-        return name 
\ No newline at end of file
+        return name or "device"
\ No newline at end of file
@@ -5,16 +5,37 @@
 负责生成PCIe设备的行为模拟代码
 """
 
-import os
+import time
 import re
 
+from generation_result import GenerationResult, write_generated_artifact
+from profiler import profiled
+from build_info import generation_timestamp
+from artifact_cache import generator_cache_key
+from template_engine import get_template
+
 class BehaviorGenerator:
     """设备行为模拟代码生成类"""
     
-    def __init__(self):
-        """初始化行为模拟模块"""
-        self.template = self._load_behavior_template()
-        self.state_machine_template = self._load_state_machine_template()
+    # 生成器版本，模板或生成逻辑变化时递增，使增量生成的指纹失效
+    GENERATOR_VERSION = "1.0.1"
+    
+    # 各生成方法实际使用的配置字段，用于计算增量生成指纹
+    INPUT_KEYS = {
+        "generate_behavior_code": ("name", "type")
+    }
+    
+    def __init__(self, deterministic=False, cache=None):
+        """初始化行为模拟模块
+        
+        Args:
+            deterministic: 是否生成不含当前时间的可复现输出
+            cache: 产物缓存(ArtifactCache)，仅在可复现模式下使用
+        """
+        self.deterministic = deterministic
+        self.cache = cache
+        self.template = get_template("behavior.module", self._load_behavior_template)
+        self.state_machine_template = get_template("behavior.state_machine", self._load_state_machine_template)
         
     def _load_behavior_template(self):
         """加载行为模拟模板"""
@@ -184,50 +205,64 @@ endmodule
     end
 """
     
+    def render_behavior_code(self, device_config):
+        """在内存中渲染设备行为模拟代码，返回文本内容，不写入文件"""
+        device_name = device_config.get("name", "自定义设备")
+        module_name = self._sanitize_module_name(device_name) + "_behavior"
+        device_type = device_config.get("type", "custom")
+        
+        # 根据设备类型定制不同的行为
+        device_interfaces, device_variables, state_definitions, custom_states, custom_behavior, interrupt_logic, timing_simulation, reset_logic = self._generate_type_specific_code(device_type, device_config)
+        
+        # 计算状态位宽
+        num_states = state_definitions.count("localparam")
+        state_bits = max(2, (num_states - 1).bit_length())
+        
+        # 生成状态机代码
+        state_machine = self.state_machine_template.render(
+            reset_logic=reset_logic,
+            custom_states=custom_states,
+            custom_behavior=custom_behavior
+        )
+        
+        # 生成最终代码
+        return self.template.render(
+            device_name=device_name,
+            module_name=module_name,
+            timestamp=generation_timestamp(self.deterministic, self.GENERATOR_VERSION),
+            device_interfaces=device_interfaces,
+            state_definitions=state_definitions,
+            state_bits=state_bits,
+            device_variables=device_variables,
+            state_machine=state_machine,
+            interrupt_logic=interrupt_logic,
+            timing_simulation=timing_simulation
+        )
+    
+    @profiled("BehaviorGenerator.generate_behavior_code")
     def generate_behavior_code(self, device_config, output_file):
         """生成设备行为模拟代码"""
+        start = time.perf_counter()
         try:
-            device_name = device_config.get("name", "自定义设备")
-            module_name = self._sanitize_module_name(device_name) + "_behavior"
-            device_type = device_config.get("type", "custom")
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_behavior_code")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ 设备行为模拟代码已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 根据设备类型定制不同的行为
-            device_interfaces, device_variables, state_definitions, custom_states, custom_behavior, interrupt_logic, timing_simulation, reset_logic = self._generate_type_specific_code(device_type, device_config)
-            
-            # 计算状态位宽
-            num_states = state_definitions.count("localparam")
-            state_bits = max(2, (num_states - 1).bit_length())
-            
-            # 生成状态机代码
-            state_machine = self.state_machine_template.format(
-                reset_logic=reset_logic,
-                custom_states=custom_states,
-                custom_behavior=custom_behavior
-            )
-            
-            # 生成最终代码
-            code = self.template.format(
-                device_name=device_name,
-                module_name=module_name,
-                timestamp=__import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                device_interfaces=device_interfaces,
-                state_definitions=state_definitions,
-                state_bits=state_bits,
-                device_variables=device_variables,
-                state_machine=state_machine,
-                interrupt_logic=interrupt_logic,
-                timing_simulation=timing_simulation
-            )
+            code = self.render_behavior_code(device_config)
             
             # 写入输出文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(code)
+            result = write_generated_artifact(output_file, code, start)
+            
+            if cache_key:
+                self.cache.store(cache_key, output_file)
             
             print(f"✅ 设备行为模拟代码已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成设备行为模拟代码失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
     
     def _generate_type_specific_code(self, device_type, device_config):
         """根据设备类型生成特定代码部分"""
@@ -272,6 +307,13 @@ endmodule
     reg        rx_overflow;
     reg        packet_available;"""
             
+            # 添加网络特定状态
+            state_definitions += """
+    
+    // 网络特定状态
+    localparam STATE_RX_PACKET = 5;  // 接收数据包
+    localparam STATE_TX_PACKET = 6;  // 发送数据包"""
+            
             custom_states = """
                 STATE_RX_PACKET: begin
                     // 接收数据包
@@ -419,7 +461,7 @@ endmodule
                     
                     // 设置命令完成中断
                     int_status <= int_status | 32'h00000002;
-                }
+                end
             end
             
             // 数据传输处理
@@ -499,9 +541,11 @@ endmodule
     
     def _sanitize_module_name(self, name):
         """将设备名称转换为有效的模块名"""
+        # SV标识符只能使用ASCII字符，先移除中文等非ASCII字符
+        name = re.sub(r'[^\x00-\x7F]+', '', name)
         # 移除非字母数字字符，转换为小写
         name = re.sub(r'[^\w]', '_', name).lower()
         # 确保开头是字母
         if name and not name[0].isalpha():
             name = "dev_" + name
-        return name 
\ No newline at end of file
+        return name or "device"
\ No newline at end of file
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+性能基准测试包
+在tool目录下以 python -m benchmarks.<模块名> 的方式运行
+"""
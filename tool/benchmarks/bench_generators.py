@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成器基准测试
+使用不同规模的合成配置，分别测量各生成器以及generate_all完整流程的耗时和峰值内存，
+并与保存的基线比较，标记出性能退化的测量项
+
+用法（在tool目录下）:
+    python -m benchmarks.bench_generators [--types nic,wifi] [--sizes 10,1k,10k,100k]
+                                          [--repeat N] [--json 输出文件]
+                                          [--baseline 基线文件] [--save-baseline]
+
+基线与机器相关，应在同一台机器上先用--save-baseline保存，修改代码后再运行比较。
+存在退化时以状态码1退出
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+
+from benchmarks.synthetic import SYNTHETIC_DEVICE_TYPES, make_config, parse_count, format_count
+
+# tool目录
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+
+from pcie_spoof_tool import PCIeSpoofTool, GENERATION_STEPS, load_module_class
+
+# 默认寄存器规模
+DEFAULT_SIZES = "10,1k,10k,100k"
+
+# 默认基线文件
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_generators.json")
+
+# 完整流程的测量项名称
+GENERATE_ALL = "generate_all"
+
+# 耗时差值小于该值（秒）时不视为退化，避免小规模测量的噪声
+MIN_TIME_DELTA = 0.005
+
+# 峰值内存差值小于该值（字节）时不视为退化
+MIN_MEMORY_DELTA = 256 * 1024
+
+def _generator_target(step):
+    """返回单个生成器测量项：(名称, 执行函数)"""
+    key, module_key, method_name, filename, _ = step
+    module_class = load_module_class(module_key)
+
+    def run(config, output_dir):
+        # 每次使用新的生成器实例，包含寄存器模型的构建开销
+        generator = module_class(deterministic=True)
+        result = getattr(generator, method_name)(config, os.path.join(output_dir, filename))
+        if not result:
+            raise RuntimeError(f"{module_class.__name__}.{method_name} 生成失败")
+        return result.bytes
+
+    return f"{module_class.__name__}.{method_name}", run
+
+def _run_generate_all(config, output_dir):
+    """通过PCIeSpoofTool.generate_all执行完整生成流程"""
+    tool = PCIeSpoofTool(deterministic=True)
+    tool.device_config = config
+    if not tool.generate_all(output_dir, workers=1) or not tool.last_report.success:
+        raise RuntimeError(tool.last_error or f"生成失败: {', '.join(tool.last_report.failed)}")
+    return tool.last_report.total_bytes
+
+def benchmark_targets():
+    """返回所有测量项：各生成器单独执行，以及generate_all完整流程"""
+    targets = [_generator_target(step) for step in GENERATION_STEPS]
+    targets.append((GENERATE_ALL, _run_generate_all))
+    return targets
+
+def measure(run, config, output_dir, repeat, trace_memory=True):
+    """测量单个测量项
+
+    计时和内存分开测量：tracemalloc会明显拖慢执行，计时运行中不开启
+
+    Returns:
+        {"time": 中位数秒, "min": 最小秒, "runs": 次数, "peak_memory": 字节, "bytes": 输出字节数}
+    """
+    samples = []
+    output_bytes = 0
+    for _ in range(repeat):
+        # 各测量项之间会输出文件，每次运行前清空输出目录，避免内容相同跳过写入
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir)
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            output_bytes = run(config, output_dir)
+            samples.append(time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir)
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            with redirect_stdout(io.StringIO()):
+                run(config, output_dir)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "time": statistics.median(samples),
+        "min": min(samples),
+        "runs": len(samples),
+        "peak_memory": peak,
+        "bytes": output_bytes
+    }
+
+def run_benchmarks(device_types, sizes, repeat, trace_memory=True, progress=None):
+    """执行所有测量项
+
+    Args:
+        device_types: 设备类型列表
+        sizes: 寄存器数量列表
+        repeat: 计时重复次数
+        trace_memory: 是否测量峰值内存
+        progress: 每完成一项调用progress(名称, 结果)
+
+    Returns:
+        {"设备类型/规模/测量项": 结果}
+    """
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="pcie_bench_")
+    try:
+        for device_type in device_types:
+            for size in sizes:
+                config = make_config(device_type, size)
+                for target_name, run in benchmark_targets():
+                    name = f"{device_type}/{format_count(size)}/{target_name}"
+                    results[name] = measure(run, config, os.path.join(work_dir, "out"), repeat, trace_memory)
+                    if progress:
+                        progress(name, results[name])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def compare_with_baseline(results, baseline, tolerance, memory_tolerance):
+    """与基线比较，返回退化项列表[(名称, 指标, 基线值, 当前值)]
+
+    耗时超过基线(1 + tolerance)倍且差值超过MIN_TIME_DELTA时视为耗时退化，
+    峰值内存同理。基线中不存在的测量项不参与比较
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if (result["time"] > base["time"] * (1 + tolerance) and
+                result["time"] - base["time"] > MIN_TIME_DELTA):
+            regressions.append((name, "time", base["time"], result["time"]))
+        if (result.get("peak_memory") is not None and base.get("peak_memory") is not None and
+                result["peak_memory"] > base["peak_memory"] * (1 + memory_tolerance) and
+                result["peak_memory"] - base["peak_memory"] > MIN_MEMORY_DELTA):
+            regressions.append((name, "peak_memory", base["peak_memory"], result["peak_memory"]))
+    return regressions
+
+def environment_info():
+    """记录测量环境，基线只在相同环境下具有可比性"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+def load_baseline(path):
+    """加载基线文件，不存在时返回None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _format_result(name, result, base=None):
+    """格式化单个测量项的输出行"""
+    memory = "-" if result["peak_memory"] is None else f"{result['peak_memory'] / 1048576:.1f}"
+    line = f"{name:<64}{result['time'] * 1000:>12.1f}{memory:>12}"
+    if base is not None and base.get("time"):
+        line += f"{(result['time'] / base['time'] - 1) * 100:>+10.1f}%"
+    return line
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="PCIe设备伪装工具生成器基准测试")
+    parser.add_argument("--types", default=",".join(SYNTHETIC_DEVICE_TYPES),
+                        help="设备类型，逗号分隔")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="寄存器数量，逗号分隔 (支持1k、10k等写法)")
+    parser.add_argument("--repeat", "-n", type=int, default=3, help="每项计时的重复次数")
+    parser.add_argument("--no-memory", action="store_true", help="不测量峰值内存")
+    parser.add_argument("--json", help="将结果保存为JSON文件")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="耗时退化阈值，相对基线的比例 (默认0.25)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                        help="峰值内存退化阈值，相对基线的比例 (默认0.10)")
+    args = parser.parse_args()
+
+    device_types = [t.strip() for t in args.types.split(",") if t.strip()]
+    for device_type in device_types:
+        if device_type not in SYNTHETIC_DEVICE_TYPES:
+            parser.error(f"未知的设备类型: {device_type}")
+    sizes = [parse_count(size) for size in args.sizes.split(",") if size.strip()]
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    baseline_results = baseline["results"] if baseline else {}
+    if baseline and baseline.get("environment") != environment_info():
+        print("⚠️ 基线的测量环境与当前环境不同，比较结果仅供参考")
+
+    print(f"{'测量项':<64}{'耗时(ms)':>12}{'峰值(MiB)':>12}{'相对基线':>11}")
+    results = run_benchmarks(
+        device_types, sizes, args.repeat, trace_memory=not args.no_memory,
+        progress=lambda name, result: print(_format_result(name, result, baseline_results.get(name)),
+                                            flush=True)
+    )
+
+    data = {"environment": environment_info(), "repeat": args.repeat, "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"\n结果已保存到: {args.json}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"\n基线已保存到: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\n未找到基线文件 {args.baseline}，使用--save-baseline保存基线后再进行比较")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline_results, args.tolerance, args.memory_tolerance)
+    if not regressions:
+        print("\n✅ 未发现性能退化")
+        return 0
+
+    print(f"\n❌ 发现 {len(regressions)} 项性能退化:")
+    for name, metric, base, current in regressions:
+        if metric == "time":
+            print(f"  {name}: 耗时 {base * 1000:.1f} ms -> {current * 1000:.1f} ms")
+        else:
+            print(f"  {name}: 峰值内存 {base / 1048576:.1f} MiB -> {current / 1048576:.1f} MiB")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
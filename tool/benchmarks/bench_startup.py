@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动开销基准测试
+测量pcie_spoof_tool的导入时间、CLI命令启动时间和工具实例构造时间
+
+用法（在tool目录下）:
+    python -m benchmarks.bench_startup [--runs N] [--json 输出文件]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+# tool目录
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -X importtime输出中的目标模块行
+IMPORT_TIME_PATTERN = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+def measure_import_time(module_name, runs):
+    """在全新的解释器中测量模块导入的累计时间（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+            cwd=TOOL_DIR, capture_output=True, text=True
+        )
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_PATTERN.match(line)
+            if match and match.group(2) == module_name:
+                samples.append(int(match.group(1)) / 1000.0)
+    return samples
+
+def measure_command_time(args, runs):
+    """测量CLI命令从启动到退出的墙钟时间（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "pcie_spoof_tool.py"] + args,
+                       cwd=TOOL_DIR, capture_output=True)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+def measure_in_process(runs):
+    """在当前进程中测量工具构造和首次加载全部生成模块的时间（毫秒）"""
+    sys.path.insert(0, TOOL_DIR)
+    from pcie_spoof_tool import PCIeSpoofTool, MODULE_SPECS
+    
+    construct = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        PCIeSpoofTool()
+        construct.append((time.perf_counter() - start) * 1000.0)
+    
+    tool = PCIeSpoofTool()
+    start = time.perf_counter()
+    for key in MODULE_SPECS:
+        tool.modules[key]
+    load_all = (time.perf_counter() - start) * 1000.0
+    
+    return construct, [load_all]
+
+def summarize(samples):
+    """计算样本的中位数、最小值和最大值"""
+    if not samples:
+        return {"median": None, "min": None, "max": None, "runs": 0}
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "runs": len(samples)
+    }
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="PCIe设备伪装工具启动开销基准测试")
+    parser.add_argument("--runs", "-n", type=int, default=10, help="每项测量的重复次数")
+    parser.add_argument("--json", help="将结果保存为JSON文件")
+    args = parser.parse_args()
+    
+    config_file = os.path.join(tempfile.mkdtemp(prefix="pcie_bench_"), "config.json")
+    
+    results = {
+        "import pcie_spoof_tool": summarize(measure_import_time("pcie_spoof_tool", args.runs)),
+        "import pcie_spoof_gui_enhanced": summarize(
+            measure_import_time("pcie_spoof_gui_enhanced", args.runs)),
+        "cli list": summarize(measure_command_time(["list"], args.runs)),
+        "cli create": summarize(measure_command_time(
+            ["create", "--preset", "ar9287", "--output", config_file], args.runs)),
+    }
+    construct, load_all = measure_in_process(args.runs)
+    results["PCIeSpoofTool()"] = summarize(construct)
+    results["首次加载全部生成模块"] = summarize(load_all)
+    
+    print(f"{'测量项':<32}{'中位数(ms)':>12}{'最小(ms)':>12}{'最大(ms)':>12}")
+    for name, stats in results.items():
+        if stats["runs"] == 0:
+            print(f"{name:<32}{'不可用':>12}")
+            continue
+        print(f"{name:<32}{stats['median']:>12.2f}{stats['min']:>12.2f}{stats['max']:>12.2f}")
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n结果已保存到: {args.json}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
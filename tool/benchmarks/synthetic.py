@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成配置生成
+按设备类型和寄存器数量生成可复现的设备配置，用于基准测试和大规模配置的手工验证
+
+用法（在tool目录下）:
+    python -m benchmarks.synthetic --type nic --registers 10k --output nic_10k.json
+"""
+
+import sys
+import json
+import random
+import argparse
+
+# 基准测试覆盖的设备类型
+SYNTHETIC_DEVICE_TYPES = ("nic", "wifi", "storage", "custom")
+
+# 各设备类型的基本信息
+DEVICE_IDENTITIES = {
+    "nic": {"name": "合成网卡", "vendor_id": "8086", "device_id": "1521", "class_code": "020000"},
+    "wifi": {"name": "合成无线网卡", "vendor_id": "168C", "device_id": "002E", "class_code": "028000"},
+    "storage": {"name": "合成存储控制器", "vendor_id": "144D", "device_id": "A808", "class_code": "010802"},
+    "custom": {"name": "合成自定义设备", "vendor_id": "FFFF", "device_id": "FFFF", "class_code": "000000"}
+}
+
+# 各设备类型的寄存器名称前缀
+REGISTER_PREFIXES = {
+    "nic": ("RX_DESC", "TX_DESC", "MAC_FILTER", "STATS", "PHY_CTRL"),
+    "wifi": ("BEACON", "TX_QUEUE", "RX_QUEUE", "RF_CTRL", "KEY_CACHE"),
+    "storage": ("SQ_TAIL", "CQ_HEAD", "NS_ATTR", "LBA_MAP", "ADMIN_Q"),
+    "custom": ("CTRL", "STATUS", "DATA", "CONFIG", "DEBUG")
+}
+
+# 访问类型分布（与实际设备大致相当：读写为主，少量只读常量和清除类寄存器）
+ACCESS_WEIGHTS = (("RW", 50), ("RO", 30), ("RC", 8), ("W1C", 8), ("W1S", 4))
+
+# 合成寄存器的起始地址，避开所有设备共有的基本寄存器
+REGISTER_BASE = 0x1000
+
+def parse_count(text):
+    """解析寄存器数量，支持1k、10k、1m等后缀"""
+    text = str(text).strip().lower()
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1000000, text[:-1]
+    return int(text) * multiplier
+
+def format_count(count):
+    """将寄存器数量格式化为1k、10k等简写"""
+    if count >= 1000000 and count % 1000000 == 0:
+        return f"{count // 1000000}m"
+    if count >= 1000 and count % 1000 == 0:
+        return f"{count // 1000}k"
+    return str(count)
+
+def _make_bit_fields(rng, access):
+    """生成互不重叠的位域，约三分之一的寄存器没有位域"""
+    fields = []
+    bit = 0
+    for index in range(rng.choice((0, 0, 1, 2, 3, 4))):
+        width = rng.choice((1, 1, 2, 4, 8))
+        if bit + width > 32:
+            break
+        if width == 1:
+            field = {"name": f"F{index}_EN", "bit": bit}
+        else:
+            field = {"name": f"F{index}_MODE", "msb": bit + width - 1, "lsb": bit}
+        if access != "RW":
+            field["access"] = access
+        fields.append(field)
+        bit += width + rng.randint(0, 3)
+    return fields
+
+def make_config(device_type, register_count, seed=0):
+    """生成合成设备配置
+
+    相同的参数总是生成相同的配置
+
+    Args:
+        device_type: 设备类型（nic、wifi、storage或custom）
+        register_count: key_registers中的寄存器数量
+        seed: 随机种子
+    """
+    if device_type not in DEVICE_IDENTITIES:
+        raise ValueError(f"未知的设备类型: {device_type}")
+    rng = random.Random(f"{device_type}:{register_count}:{seed}")
+    accesses = [access for access, _ in ACCESS_WEIGHTS]
+    weights = [weight for _, weight in ACCESS_WEIGHTS]
+    prefixes = REGISTER_PREFIXES[device_type]
+
+    registers = []
+    for index in range(register_count):
+        access = rng.choices(accesses, weights)[0]
+        register = {
+            "addr": f"0x{REGISTER_BASE + index * 4:05X}",
+            "name": f"{prefixes[index % len(prefixes)]}_{index}",
+            "value": f"32'h{rng.getrandbits(32):08X}",
+            "access": access
+        }
+        if rng.random() < 0.25:
+            register["description"] = f"合成寄存器 {index}"
+        bit_fields = _make_bit_fields(rng, access)
+        if bit_fields:
+            register["bit_fields"] = bit_fields
+        registers.append(register)
+
+    identity = DEVICE_IDENTITIES[device_type]
+    return {
+        "name": f"{identity['name']} ({format_count(register_count)}寄存器)",
+        "vendor_id": identity["vendor_id"],
+        "device_id": identity["device_id"],
+        "class_code": identity["class_code"],
+        "type": device_type,
+        "key_registers": registers
+    }
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="生成用于基准测试的合成设备配置")
+    parser.add_argument("--type", "-t", choices=SYNTHETIC_DEVICE_TYPES, default="custom", help="设备类型")
+    parser.add_argument("--registers", "-n", default="1k", help="寄存器数量 (支持1k、10k等写法)")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", "-o", required=True, help="输出配置文件路径")
+    args = parser.parse_args()
+
+    config = make_config(args.type, parse_count(args.registers), args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+    print(f"✅ 已生成合成配置: {args.output} ({len(config['key_registers'])} 个寄存器)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+位域校验模块
+检查每个寄存器的位域是否相互重叠、超出寄存器宽度，以及未被位域覆盖的保留位
+
+位域在寄存器模型中已转换为整数掩码，每个寄存器只需按位或累积已覆盖的位，
+与新位域按位与即可发现重叠，整个寄存器的检查是少量整数运算；
+内容相同的位域布局（导入的大型寄存器集中很常见）只检查一次
+"""
+
+from register_model import Register, BitField, parse_address
+from register_index import RegisterConflict, SOURCE_LABELS
+
+def _register_label(register):
+    label = SOURCE_LABELS.get(register.source, register.source)
+    return f"{label}{register.name}(0x{register.address:04X})"
+
+def _field_bits(field):
+    """位域的位范围文本"""
+    return f"[{field.lsb}]" if field.msb == field.lsb else f"[{field.msb}:{field.lsb}]"
+
+def mask_ranges(mask):
+    """将掩码拆分为连续置位区间[(msb, lsb)]，按位从低到高排列"""
+    ranges = []
+    while mask:
+        lsb = (mask & -mask).bit_length() - 1
+        run = mask >> lsb
+        # run的最低位起连续1的个数
+        length = (run ^ (run + 1)).bit_length() - 1
+        ranges.append((lsb + length - 1, lsb))
+        mask &= ~(((1 << length) - 1) << lsb)
+    return ranges
+
+def _format_ranges(mask):
+    return ", ".join(f"[{msb}]" if msb == lsb else f"[{msb}:{lsb}]" for msb, lsb in mask_ranges(mask))
+
+def _check_layout(width, fields):
+    """检查一种位域布局，返回(问题类型, 严重程度, 消息)列表
+
+    结果只依赖宽度和位域，可以在布局相同的寄存器之间共享
+    """
+    full = (1 << width) - 1
+    covered = 0
+    findings = []
+    for position, field in enumerate(fields):
+        mask = field.mask
+        if field.lsb < 0 or mask & ~full:
+            findings.append(("field_range", "error",
+                             f"位域{field.name}{_field_bits(field)}超出寄存器宽度{width}位"))
+            mask &= full
+        overlap = mask & covered
+        if overlap:
+            # 只在出错时回溯查找与之重叠的位域
+            others = [other.name for other in fields[:position] if other.mask & overlap]
+            findings.append(("field_overlap", "error",
+                             f"位域{field.name}{_field_bits(field)}与{'、'.join(others)}在{_format_ranges(overlap)}重叠"))
+        covered |= mask
+    reserved = full & ~covered
+    if fields and reserved:
+        findings.append(("field_reserved", "info", f"保留位{_format_ranges(reserved)}未定义位域"))
+    return findings
+
+def validate_bit_fields(registers):
+    """检查寄存器序列（RegisterModel或Register列表）的位域
+
+    Returns:
+        RegisterConflict列表：位域重叠和超出宽度为错误，未覆盖的保留位为提示(info)
+    """
+    conflicts = []
+    layouts = {}
+    for register in registers:
+        fields = register.bit_fields
+        if not fields:
+            continue
+        # 位域实例在模型构建时按内容共享，相同布局的键相同
+        key = (register.width, tuple(map(id, fields)))
+        findings = layouts.get(key)
+        if findings is None:
+            findings = layouts[key] = _check_layout(register.width, fields)
+        for kind, severity, message in findings:
+            conflicts.append(RegisterConflict(kind, severity, (register,),
+                                              f"{_register_label(register)}: {message}"))
+    return conflicts
+
+def validate_register_configs(registers, source="key"):
+    """检查寄存器配置字典列表的位域，位范围无法解析的位域记为错误
+
+    供编辑器在保存时调用，地址无效或尚未分配的寄存器也会被检查位域
+    """
+    conflicts = []
+    valid = []
+    field_cache = {}
+    label = SOURCE_LABELS.get(source, source)
+    for index, reg in enumerate(registers):
+        name = reg.get("name", "") or f"第{index + 1}项"
+        try:
+            fields = reg.get("bit_fields")
+            if fields is None:
+                fields = reg.get("bitfields", ())
+            bit_fields = []
+            for field in fields:
+                try:
+                    if "msb" in field and "lsb" in field and int(field["msb"]) < int(field["lsb"]):
+                        raise ValueError(f"最高位{field['msb']}小于最低位{field['lsb']}")
+                    bit_field = BitField.from_dict(field)
+                except (ValueError, TypeError) as e:
+                    conflicts.append(RegisterConflict(
+                        "field_range", "error", (),
+                        f"{label}{name}: 位域{field.get('name', '')}的位范围无效: {str(e)}"
+                    ))
+                    continue
+                bit_fields.append(field_cache.setdefault(
+                    (bit_field.name, bit_field.msb, bit_field.lsb), bit_field
+                ))
+            width = int(reg.get("width", reg.get("size", 32)) or 32)
+        except (ValueError, TypeError) as e:
+            conflicts.append(RegisterConflict("field_range", "error", (), f"{label}{name}: {str(e)}"))
+            continue
+        try:
+            address = parse_address(reg.get("addr", reg.get("address", reg.get("offset"))))
+        except (ValueError, TypeError):
+            # 地址问题由寄存器地址索引报告
+            address = 0
+        valid.append(Register(address, name, width=width, bit_fields=bit_fields, index=index, source=source))
+    return conflicts + validate_bit_fields(valid)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建信息模块
+提供写入生成文件头部的时间戳，支持可复现（确定性）输出
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+
+# 时间戳格式
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 可复现归档中成员的默认修改时间（1980-01-01 UTC，zip格式支持的最早时间）
+DETERMINISTIC_MTIME = 315532800
+
+def generation_timestamp(deterministic=False, version=None):
+    """返回写入生成文件的时间戳
+    
+    确定性模式下输出只取决于配置和生成器版本：如果设置了
+    SOURCE_DATE_EPOCH环境变量则使用该时间（UTC），否则使用固定的版本说明
+    
+    Args:
+        deterministic: 是否启用确定性输出
+        version: 生成器版本
+        
+    Returns:
+        时间戳字符串
+    """
+    if not deterministic:
+        return datetime.now().strftime(TIMESTAMP_FORMAT)
+    
+    epoch = source_date_epoch()
+    if epoch is not None:
+        build_time = datetime.fromtimestamp(epoch, tz=timezone.utc)
+        return build_time.strftime(TIMESTAMP_FORMAT) + " UTC"
+    
+    return f"可复现构建 (生成器版本 {version or '未知'})"
+
+def source_date_epoch():
+    """返回有效的SOURCE_DATE_EPOCH（Unix时间），未设置或无法转换为日期时返回None"""
+    try:
+        epoch = int(os.environ.get("SOURCE_DATE_EPOCH", ""))
+        datetime.fromtimestamp(epoch, tz=timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+    return epoch
+
+def output_options(deterministic=False):
+    """返回影响生成文件内容的选项，用于增量生成指纹和产物缓存键
+    
+    确定性模式下文件头部的时间戳取决于SOURCE_DATE_EPOCH，
+    因此将其一并计入，修改该环境变量后相应产物会重新生成
+    
+    Args:
+        deterministic: 是否启用确定性输出
+    """
+    options = {"deterministic": bool(deterministic)}
+    if deterministic:
+        options["source_date_epoch"] = source_date_epoch()
+    return options
+
+def archive_mtime(deterministic=False):
+    """返回写入归档成员的修改时间（Unix时间）
+    
+    确定性模式下使用SOURCE_DATE_EPOCH，未设置时使用固定时间，
+    使相同配置生成的归档逐字节相同
+    
+    Args:
+        deterministic: 是否启用确定性输出
+    """
+    if not deterministic:
+        return time.time()
+    try:
+        return max(int(os.environ.get("SOURCE_DATE_EPOCH", "")), DETERMINISTIC_MTIME)
+    except ValueError:
+        return DETERMINISTIC_MTIME
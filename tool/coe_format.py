@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COE文件格式模块
+生成Vivado Block Memory Generator使用的存储器初始化文件（.coe），
+配置空间、写入掩码和BAR常量寄存器ROM共用
+"""
+
+# 每行的字数
+COE_WORDS_PER_LINE = 4
+
+def format_coe(data, first_line_comment=None):
+    """将32位字列表格式化为COE文件内容
+
+    每行4个字，以逗号分隔，最后一个字之后以分号结束
+
+    Args:
+        data: 十六进制字符串列表
+        first_line_comment: 添加在第一行末尾的注释
+
+    Returns:
+        COE文件文本
+    """
+    lines = [
+        "memory_initialization_radix=16;\n",
+        "memory_initialization_vector=\n"
+    ]
+
+    count = len(data)
+    for i in range(0, count, COE_WORDS_PER_LINE):
+        line = ",".join(data[i:i + COE_WORDS_PER_LINE])
+        # 在第一行添加注释
+        if i == 0 and first_line_comment:
+            line += f",  // {first_line_comment}"
+        # 最后一行以分号结束
+        lines.append(line + (";\n" if i + COE_WORDS_PER_LINE >= count else ",\n"))
+
+    return "".join(lines)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置快照模块
+将设备配置冻结为不可变快照，供生成器并发读取、在多次生成之间复用
+
+快照采用写时复制：修改操作返回新的快照，未修改的部分与原快照共享，
+因此从快照派生新配置的开销只与修改的层级有关，与配置大小无关。
+快照内容不会被修改，基于快照计算的摘要等派生数据可以安全地缓存在快照上
+"""
+
+import json
+import hashlib
+
+def canonical_json(obj):
+    """将对象序列化为规范化的JSON字符串（键排序、无多余空白）"""
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("配置快照是只读的，请使用set()/remove()创建修改后的新快照")
+
+class FrozenDict(dict):
+    """只读字典
+
+    继承dict以便直接进行JSON序列化，并兼容现有的device_config.get()用法
+    """
+
+    __slots__ = ("_memo",)
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        # 派生数据缓存不参与序列化
+        return (FrozenDict, (dict(self),))
+
+    def __hash__(self):
+        return hash(snapshot_digest(self))
+
+    def copy(self):
+        """快照不可变，复制直接返回自身"""
+        return self
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def set(self, key, value):
+        """返回将key设置为value后的新快照，其余字段与当前快照共享"""
+        changed = dict(self)
+        changed[key] = freeze(value)
+        return FrozenDict(changed)
+
+    def evolve(self, **changes):
+        """返回批量修改字段后的新快照"""
+        changed = dict(self)
+        for key, value in changes.items():
+            changed[key] = freeze(value)
+        return FrozenDict(changed)
+
+    def remove(self, key):
+        """返回删除key后的新快照"""
+        changed = dict(self)
+        changed.pop(key, None)
+        return FrozenDict(changed)
+
+    def memoize(self, key, factory):
+        """获取基于快照内容计算的派生数据，首次访问时调用factory计算并缓存
+
+        并发访问时factory可能被调用多次，但结果相同，不影响正确性
+        """
+        try:
+            memo = self._memo
+        except AttributeError:
+            # 大多数嵌套字典从不使用缓存，首次使用时才创建
+            memo = self._memo = {}
+        try:
+            return memo[key]
+        except KeyError:
+            value = memo[key] = factory()
+            return value
+
+class FrozenList(tuple):
+    """只读列表，JSON序列化结果与list相同"""
+
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def set(self, index, value):
+        """返回替换index处元素后的新列表，其余元素共享"""
+        items = list(self)
+        items[index] = freeze(value)
+        return FrozenList(items)
+
+    def appended(self, value):
+        """返回追加元素后的新列表"""
+        return FrozenList(self + (freeze(value),))
+
+# 本身不可变、无需转换的标量类型
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+def freeze(obj):
+    """将配置递归转换为不可变快照，已冻结的部分直接复用"""
+    if isinstance(obj, _SCALAR_TYPES) or isinstance(obj, (FrozenDict, FrozenList)):
+        return obj
+    if isinstance(obj, dict):
+        return FrozenDict({key: value if type(value) in _SCALAR_TYPES else freeze(value)
+                           for key, value in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return FrozenList([value if type(value) in _SCALAR_TYPES else freeze(value) for value in obj])
+    return obj
+
+def thaw(obj):
+    """将快照递归转换为可修改的普通dict/list（深复制）"""
+    if isinstance(obj, dict):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(value) for value in obj]
+    return obj
+
+def snapshot_digest(config, key=None):
+    """计算配置（或其中某个字段）规范化JSON的SHA-256摘要
+
+    config为快照时结果缓存在快照上，多个生成步骤和缓存键计算共享同一次序列化
+
+    Args:
+        config: 设备配置字典或快照
+        key: 字段名，为None时计算整个配置的摘要
+    """
+    def compute():
+        value = config if key is None else config.get(key)
+        return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
+
+    if isinstance(config, FrozenDict):
+        return config.memoize(("digest", key), compute)
+    return compute()
@@ -5,15 +5,35 @@
 负责生成PCIe配置空间和写入掩码文件
 """
 
-import os
-import struct
+import time
 import re
 
+from generation_result import GenerationResult, write_generated_artifact
+from profiler import profiled
+from artifact_cache import generator_cache_key
+from coe_format import format_coe
+
 class ConfigSpoofer:
     """PCIe配置空间伪装类"""
     
-    def __init__(self):
-        """初始化配置空间伪装模块"""
+    # 生成器版本，模板或生成逻辑变化时递增，使增量生成的指纹失效
+    GENERATOR_VERSION = "1.1.0"
+    
+    # 各生成方法实际使用的配置字段，用于计算增量生成指纹
+    INPUT_KEYS = {
+        "generate_config_space": ("vendor_id", "device_id", "class_code", "revision_id", "subsystem_vendor_id", "subsystem_id"),
+        "generate_writemask": ("type", "writemask_overrides")
+    }
+    
+    def __init__(self, deterministic=False, cache=None):
+        """初始化配置空间伪装模块
+        
+        Args:
+            deterministic: 是否生成不含当前时间的可复现输出
+            cache: 产物缓存(ArtifactCache)，仅在可复现模式下使用
+        """
+        self.deterministic = deterministic
+        self.cache = cache
         self.config_template = self._load_default_template()
         self.writemask_template = self._load_default_writemask()
         
@@ -55,108 +75,112 @@ class ConfigSpoofer:
         
         return template
     
+    def render_config_space(self, device_config):
+        """在内存中渲染配置空间文件，返回文本内容，不写入文件"""
+        # 复制模板
+        config_data = self.config_template.copy()
+        
+        # 设置设备ID和供应商ID
+        vendor_id = device_config.get("vendor_id", "8086")  # Intel
+        device_id = device_config.get("device_id", "08b1")  # Wireless-AC 7260
+        config_data[0] = f"{device_id}{vendor_id}"
+        
+        # 设置命令和状态寄存器
+        config_data[1] = "fffff004"  # 默认状态和命令寄存器
+        
+        # 设置类别代码和修订版本
+        class_code = device_config.get("class_code", "028000")  # Wireless-AC 7260
+        revision_id = device_config.get("revision_id", "cb")  # Wireless-AC 7260
+        config_data[2] = f"{class_code}{revision_id}"
+        
+        # 设置子系统ID和子系统供应商ID
+        subsystem_vendor_id = device_config.get("subsystem_vendor_id", "8086")  # Intel
+        subsystem_id = device_config.get("subsystem_id", "5070")  # Wireless-AC 7260
+        config_data[11] = f"{subsystem_id}{subsystem_vendor_id}"
+        
+        # 设置PCIe能力指针
+        config_data[13] = "000000c0"  # 指向偏移0xC0
+        
+        # 生成COE文件
+        return self._format_coe(config_data, "设备ID/供应商ID + 命令/状态 + 类别代码 + 头类型")
+    
+    @profiled("ConfigSpoofer.generate_config_space")
     def generate_config_space(self, device_config, output_file):
         """根据设备配置生成配置空间文件"""
+        start = time.perf_counter()
         try:
-            # 复制模板
-            config_data = self.config_template.copy()
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_config_space")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ 配置空间文件已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 设置设备ID和供应商ID
-            vendor_id = device_config.get("vendor_id", "8086")  # Intel
-            device_id = device_config.get("device_id", "08b1")  # Wireless-AC 7260
-            config_data[0] = f"{device_id}{vendor_id}"
+            # 渲染并写入COE文件
+            result = write_generated_artifact(output_file, self.render_config_space(device_config), start)
             
-            # 设置命令和状态寄存器
-            config_data[1] = "fffff004"  # 默认状态和命令寄存器
+            if cache_key:
+                self.cache.store(cache_key, output_file)
             
-            # 设置类别代码和修订版本
-            class_code = device_config.get("class_code", "028000")  # Wireless-AC 7260
-            revision_id = device_config.get("revision_id", "cb")  # Wireless-AC 7260
-            config_data[2] = f"{class_code}{revision_id}"
-            
-            # 设置子系统ID和子系统供应商ID
-            subsystem_vendor_id = device_config.get("subsystem_vendor_id", "8086")  # Intel
-            subsystem_id = device_config.get("subsystem_id", "5070")  # Wireless-AC 7260
-            config_data[11] = f"{subsystem_id}{subsystem_vendor_id}"
-            
-            # 设置PCIe能力指针
-            config_data[13] = "000000c0"  # 指向偏移0xC0
-            
-            # 生成COE文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write("memory_initialization_radix=16;\n")
-                f.write("memory_initialization_vector=\n")
-                
-                # 写入数据，每行4个32位字
-                for i in range(0, 64, 4):
-                    if i + 3 < 64:
-                        line = f"{config_data[i]},{config_data[i+1]},{config_data[i+2]},{config_data[i+3]}"
-                        # 在第一行添加注释
-                        if i == 0:
-                            line += ",  // 设备ID/供应商ID + 命令/状态 + 类别代码 + 头类型"
-                        f.write(line + ",\n")
-                    else:
-                        # 处理最后一行（可能不完整）
-                        remaining = 64 - i
-                        line = ",".join(config_data[i:i+remaining])
-                        f.write(line + ";\n")
-                        
             print(f"✅ 配置空间文件已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成配置空间文件失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
+    
+    def render_writemask(self, device_config):
+        """在内存中渲染写入掩码文件，返回文本内容，不写入文件"""
+        # 复制模板
+        writemask_data = self.writemask_template.copy()
+        
+        # 特定设备类型的写入掩码设置
+        device_type = device_config.get("type", "custom")
+        if device_type == "nic" or device_type == "wifi":
+            # 网络设备的特殊写入掩码
+            writemask_data[1] = "00000107"  # 命令寄存器允许总线主控、内存空间使能和IO空间使能
+        elif device_type == "storage":
+            # 存储设备的特殊写入掩码
+            writemask_data[1] = "00000107"  # 基本与网卡相同
+            writemask_data[3] = "0000FF00"  # 允许修改Cache Line Size
+        
+        # 应用设备特定的写入掩码设置
+        custom_writemask = device_config.get("writemask_overrides", {})
+        for offset_str, mask in custom_writemask.items():
+            try:
+                offset = int(offset_str, 0)  # 支持十六进制偏移
+                if 0 <= offset < 64:
+                    writemask_data[offset] = mask
+            except ValueError:
+                pass
+        
+        # 生成COE文件
+        return self._format_coe(writemask_data, "设备ID/供应商ID(只读) + 命令/状态(部分可写) + 类别代码(只读)")
     
+    @profiled("ConfigSpoofer.generate_writemask")
     def generate_writemask(self, device_config, output_file):
         """根据设备配置生成写入掩码文件"""
+        start = time.perf_counter()
         try:
-            # 复制模板
-            writemask_data = self.writemask_template.copy()
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_writemask")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ 写入掩码文件已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 特定设备类型的写入掩码设置
-            device_type = device_config.get("type", "custom")
-            if device_type == "nic" or device_type == "wifi":
-                # 网络设备的特殊写入掩码
-                writemask_data[1] = "00000107"  # 命令寄存器允许总线主控、内存空间使能和IO空间使能
-            elif device_type == "storage":
-                # 存储设备的特殊写入掩码
-                writemask_data[1] = "00000107"  # 基本与网卡相同
-                writemask_data[3] = "0000FF00"  # 允许修改Cache Line Size
+            # 渲染并写入COE文件
+            result = write_generated_artifact(output_file, self.render_writemask(device_config), start)
             
-            # 应用设备特定的写入掩码设置
-            custom_writemask = device_config.get("writemask_overrides", {})
-            for offset_str, mask in custom_writemask.items():
-                try:
-                    offset = int(offset_str, 0)  # 支持十六进制偏移
-                    if 0 <= offset < 64:
-                        writemask_data[offset] = mask
-                except ValueError:
-                    pass
+            if cache_key:
+                self.cache.store(cache_key, output_file)
             
-            # 生成COE文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write("memory_initialization_radix=16;\n")
-                f.write("memory_initialization_vector=\n")
-                
-                # 写入数据，每行4个32位字
-                for i in range(0, 64, 4):
-                    if i + 3 < 64:
-                        line = f"{writemask_data[i]},{writemask_data[i+1]},{writemask_data[i+2]},{writemask_data[i+3]}"
-                        # 在第一行添加注释
-                        if i == 0:
-                            line += ",  // 设备ID/供应商ID(只读) + 命令/状态(部分可写) + 类别代码(只读)"
-                        f.write(line + ",\n")
-                    else:
-                        # 处理最后一行（可能不完整）
-                        remaining = 64 - i
-                        line = ",".join(writemask_data[i:i+remaining])
-                        f.write(line + ";\n")
-                        
             print(f"✅ 写入掩码文件已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成写入掩码文件失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
+    
+    def _format_coe(self, data, first_line_comment):
+        """将32位字列表格式化为COE文件内容"""
+        return format_coe(data, first_line_comment)
     
     def extract_fields_from_config_space(self, config_file):
         """从现有配置空间文件中提取字段信息"""
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置文件监视模块
+监视一个或多个配置文件，文件保存后合并短时间内的连续修改，返回发生变化的文件
+
+安装了watchdog时使用文件系统通知，否则定期比较文件的修改时间、大小和inode。
+收到通知后同样比较文件状态，同一目录中其他文件的变化不会触发重新生成；
+编辑器先写临时文件再重命名的保存方式也能正确识别
+"""
+
+import os
+import time
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# 轮询间隔（秒）
+DEFAULT_POLL_INTERVAL = 0.1
+
+# 最后一次修改后等待多久没有新的修改才返回（秒）
+DEFAULT_DEBOUNCE = 0.05
+
+# 使用文件系统通知时仍定期检查文件状态，防止遗漏通知
+_NOTIFY_FALLBACK_INTERVAL = 1.0
+
+def _file_state(path):
+    """文件的修改时间、大小和inode，文件不存在时为None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+if WATCHDOG_AVAILABLE:
+    class _ChangeHandler(FileSystemEventHandler):
+        """收到被监视文件的事件时设置标志"""
+
+        def __init__(self, paths, event):
+            super().__init__()
+            self._paths = paths
+            self._event = event
+
+        def on_any_event(self, event):
+            for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+                if path and os.path.abspath(path) in self._paths:
+                    self._event.set()
+                    return
+
+class ConfigWatcher:
+    """配置文件监视器"""
+
+    def __init__(self, paths, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE, use_watchdog=True):
+        """初始化监视器
+
+        Args:
+            paths: 配置文件路径列表
+            interval: 轮询间隔（秒）
+            debounce: 最后一次修改后等待的静默时间（秒）
+            use_watchdog: 安装了watchdog时使用文件系统通知
+        """
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.interval = interval
+        self.debounce = debounce
+        self._states = {path: _file_state(path) for path in self.paths}
+        self._event = threading.Event()
+        self._observer = None
+        if use_watchdog and WATCHDOG_AVAILABLE:
+            self._observer = Observer()
+            handler = _ChangeHandler(frozenset(self.paths), self._event)
+            for directory in sorted({os.path.dirname(path) for path in self.paths}):
+                self._observer.schedule(handler, directory, recursive=False)
+            self._observer.start()
+
+    @property
+    def mode(self):
+        """监视方式：watchdog或polling"""
+        return "watchdog" if self._observer is not None else "polling"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """停止文件系统通知"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def _changed(self):
+        """返回状态与上次记录不同的文件，并更新记录"""
+        changed = []
+        for path in self.paths:
+            state = _file_state(path)
+            if state != self._states[path]:
+                self._states[path] = state
+                changed.append(path)
+        return changed
+
+    def _sleep(self, timeout):
+        """等待timeout秒，使用文件系统通知时收到事件立即返回"""
+        if self._observer is not None:
+            self._event.wait(timeout)
+            self._event.clear()
+        else:
+            time.sleep(timeout)
+
+    def wait(self, timeout=None):
+        """等待配置文件发生变化
+
+        检测到变化后继续等待，直到debounce秒内不再有新的修改，
+        编辑器连续多次写入只返回一次
+
+        Args:
+            timeout: 最长等待时间（秒），为None时一直等待
+
+        Returns:
+            发生变化的文件路径列表，超时时为空列表
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = _NOTIFY_FALLBACK_INTERVAL if self._observer is not None else self.interval
+        while True:
+            changed = self._changed()
+            if changed:
+                break
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._sleep(min(interval, remaining))
+            else:
+                self._sleep(interval)
+
+        pending = set(changed)
+        while True:
+            time.sleep(self.debounce)
+            more = self._changed()
+            if not more:
+                break
+            pending.update(more)
+        self._event.clear()
+        return [path for path in self.paths if path in pending]
@@ -8,6 +8,8 @@ DMA编辑器组件
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from register_index import RegisterIndex, format_conflicts
+
 class DMAEditor(ttk.Frame):
     """DMA编辑器组件"""
     
@@ -401,7 +403,12 @@ class DMAEditor(ttk.Frame):
             if self.update_callback:
                 self.update_callback(self.config)
             
-            messagebox.showinfo("成功", "DMA配置已应用")
+            # 一次报告全部地址重叠和重名的寄存器
+            conflicts = RegisterIndex().add_config(self.config.get("registers", []), "dma").conflicts()
+            if conflicts:
+                messagebox.showwarning("警告", f"DMA配置已应用，但寄存器存在以下冲突:\n{format_conflicts(conflicts)}")
+            else:
+                messagebox.showinfo("成功", "DMA配置已应用")
     
     def reset_defaults(self):
         """重置为默认配置"""
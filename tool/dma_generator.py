@@ -5,15 +5,36 @@ DMA控制器模块
 负责生成PCIe设备的DMA控制器代码
 """
 
-import os
+import time
 import re
 
+from generation_result import GenerationResult, write_generated_artifact
+from profiler import profiled
+from build_info import generation_timestamp
+from artifact_cache import generator_cache_key
+from template_engine import get_template
+
 class DMAGenerator:
     """DMA控制器生成类"""
     
-    def __init__(self):
-        """初始化DMA控制器模块"""
-        self.template = self._load_dma_template()
+    # 生成器版本，模板或生成逻辑变化时递增，使增量生成的指纹失效
+    GENERATOR_VERSION = "1.0.0"
+    
+    # 各生成方法实际使用的配置字段，用于计算增量生成指纹
+    INPUT_KEYS = {
+        "generate_dma_controller": ("name", "type", "dma_buffer_depth", "dma_max_payload")
+    }
+    
+    def __init__(self, deterministic=False, cache=None):
+        """初始化DMA控制器模块
+        
+        Args:
+            deterministic: 是否生成不含当前时间的可复现输出
+            cache: 产物缓存(ArtifactCache)，仅在可复现模式下使用
+        """
+        self.deterministic = deterministic
+        self.cache = cache
+        self.template = get_template("dma.module", self._load_dma_template)
         
     def _load_dma_template(self):
         """加载DMA控制器模板"""
@@ -145,7 +166,7 @@ module {module_name} (
                     // 设置TLP格式和类型
                     if (current_src_addr[63:32] == 32'h0) begin
                         tlp_fmt_type <= TLP_MEM_READ32;
-                        tlp_address <= {{32{1'b0}}, current_src_addr[31:0]};
+                        tlp_address <= {{{{32{{1'b0}}}}, current_src_addr[31:0]}};
                     end
                     else begin
                         tlp_fmt_type <= TLP_MEM_READ64;
@@ -190,7 +211,7 @@ module {module_name} (
                     // 设置TLP格式和类型
                     if (current_dst_addr[63:32] == 32'h0) begin
                         tlp_fmt_type <= TLP_MEM_WRITE32;
-                        tlp_address <= {{32{1'b0}}, current_dst_addr[31:0]};
+                        tlp_address <= {{{{32{{1'b0}}}}, current_dst_addr[31:0]}};
                     end
                     else begin
                         tlp_fmt_type <= TLP_MEM_WRITE64;
@@ -305,42 +326,56 @@ module {module_name} (
 endmodule
 """
     
+    def render_dma_controller(self, device_config):
+        """在内存中渲染DMA控制器代码，返回文本内容，不写入文件"""
+        device_name = device_config.get("name", "自定义设备")
+        module_name = self._sanitize_module_name(device_name) + "_dma_controller"
+        device_type = device_config.get("type", "custom")
+        
+        # 缓冲区深度和最大负载配置
+        buffer_depth = device_config.get("dma_buffer_depth", 64)
+        max_payload_size = device_config.get("dma_max_payload", 256)
+        max_payload_dw = max_payload_size // 4
+        
+        # 根据设备类型生成特定接口和逻辑
+        device_specific_interface, device_specific_logic = self._generate_device_specific_parts(device_type, device_config)
+        
+        # 生成最终代码
+        return self.template.render(
+            device_name=device_name,
+            module_name=module_name,
+            timestamp=generation_timestamp(self.deterministic, self.GENERATOR_VERSION),
+            buffer_depth=buffer_depth,
+            max_payload=max_payload_size,
+            max_payload_dw=max_payload_dw,
+            device_specific_interface=device_specific_interface,
+            device_specific_logic=device_specific_logic
+        )
+    
+    @profiled("DMAGenerator.generate_dma_controller")
     def generate_dma_controller(self, device_config, output_file):
         """生成DMA控制器代码"""
+        start = time.perf_counter()
         try:
-            device_name = device_config.get("name", "自定义设备")
-            module_name = self._sanitize_module_name(device_name) + "_dma_controller"
-            device_type = device_config.get("type", "custom")
-            
-            # 缓冲区深度和最大负载配置
-            buffer_depth = device_config.get("dma_buffer_depth", 64)
-            max_payload_size = device_config.get("dma_max_payload", 256)
-            max_payload_dw = max_payload_size // 4
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_dma_controller")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ DMA控制器代码已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 根据设备类型生成特定接口和逻辑
-            device_specific_interface, device_specific_logic = self._generate_device_specific_parts(device_type, device_config)
-            
-            # 生成最终代码
-            code = self.template.format(
-                device_name=device_name,
-                module_name=module_name,
-                timestamp=__import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                buffer_depth=buffer_depth,
-                max_payload=max_payload_size,
-                max_payload_dw=max_payload_dw,
-                device_specific_interface=device_specific_interface,
-                device_specific_logic=device_specific_logic
-            )
+            code = self.render_dma_controller(device_config)
             
             # 写入输出文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(code)
+            result = write_generated_artifact(output_file, code, start)
+            
+            if cache_key:
+                self.cache.store(cache_key, output_file)
             
             print(f"✅ DMA控制器代码已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成DMA控制器代码失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
     
     def _generate_device_specific_parts(self, device_type, device_config):
         """根据设备类型生成特定部分"""
@@ -419,9 +454,11 @@ endmodule
     
     def _sanitize_module_name(self, name):
         """将设备名称转换为有效的模块名"""
+        # SV标识符只能使用ASCII字符，先移除中文等非ASCII字符
+        name = re.sub(r'[^\x00-\x7F]+', '', name)
         # 移除非字母数字字符，转换为小写
         name = re.sub(r'[^\w]', '_', name).lower()
         # 确保开头是字母
         if name and not name[0].isalpha():
             name = "dev_" + name
-        return name 
\ No newline at end of file
+        return name or "device"
\ No newline at end of file
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成指纹模块
+根据各生成器实际使用的配置字段和生成器版本计算指纹，用于增量生成
+"""
+
+import os
+import json
+import hashlib
+
+from artifact_writer import atomic_open
+from config_snapshot import canonical_json, snapshot_digest
+
+# 清单文件名，保存在输出目录中
+MANIFEST_FILENAME = ".pcie_spoof_manifest.json"
+
+def compute_fingerprint(device_config, input_keys, version, options=None):
+    """计算生成器输入的指纹
+    
+    各字段分别计算摘要，配置为快照时摘要在各生成步骤之间共享
+    
+    Args:
+        device_config: 设备配置字典或快照
+        input_keys: 生成器使用的配置字段
+        version: 生成器版本
+        options: 影响输出内容的生成选项
+        
+    Returns:
+        十六进制SHA-256指纹
+    """
+    inputs = {key: snapshot_digest(device_config, key) for key in input_keys}
+    payload = canonical_json({"version": version, "inputs": inputs, "options": options or {}})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class GenerationManifest:
+    """输出目录中各产物指纹的清单"""
+    
+    def __init__(self, output_dir):
+        """初始化清单
+        
+        Args:
+            output_dir: 输出目录
+        """
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.output_dir = output_dir
+        self.fingerprints = {}
+    
+    def load(self):
+        """从输出目录加载清单，文件不存在或损坏时视为空清单"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.fingerprints = dict(data.get("fingerprints", {}))
+        except (OSError, ValueError):
+            self.fingerprints = {}
+        return self
+    
+    def is_up_to_date(self, filename, fingerprint):
+        """检查产物是否已按相同指纹生成且文件仍然存在"""
+        return (self.fingerprints.get(filename) == fingerprint and
+                os.path.exists(os.path.join(self.output_dir, filename)))
+    
+    def update(self, filename, fingerprint):
+        """记录产物的最新指纹"""
+        self.fingerprints[filename] = fingerprint
+    
+    def discard(self, filename):
+        """移除产物指纹，下次生成时强制重新生成"""
+        self.fingerprints.pop(filename, None)
+    
+    def save(self):
+        """保存清单到输出目录"""
+        with atomic_open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprints": self.fingerprints}, f, indent=2, sort_keys=True)
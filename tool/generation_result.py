@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成结果模块
+描述单个产物的生成结果以及一次生成流程的汇总报告，可序列化为JSON
+"""
+
+import os
+import json
+import time
+import hashlib
+
+from artifact_writer import atomic_open, write_bytes_artifact, write_chunked_artifact
+from profiler import PROFILER, profile_phase
+
+class GenerationResult:
+    """单个产物的生成结果
+
+    真值等于success，因此仍可以像原来的布尔返回值一样使用
+    """
+
+    __slots__ = ("name", "label", "path", "success", "bytes", "sha256", "render_time",
+                 "write_time", "skipped", "cached", "changed", "error")
+
+    def __init__(self, path, success=True, bytes=0, sha256=None, render_time=0.0, write_time=0.0,
+                 skipped=False, cached=False, changed=True, error=None, name=None, label=None):
+        """初始化生成结果
+
+        Args:
+            path: 产物文件路径
+            success: 是否生成成功
+            bytes: 产物字节数
+            sha256: 产物内容的SHA-256摘要
+            render_time: 渲染耗时（秒）
+            write_time: 写入耗时（秒）
+            skipped: 增量生成时因输入未变化而跳过
+            cached: 从产物缓存获取
+            changed: 文件内容是否发生变化
+            error: 失败原因
+            name: 产物键（如bar、registers）
+            label: 显示名称
+        """
+        self.name = name
+        self.label = label
+        self.path = path
+        self.success = success
+        self.bytes = bytes
+        self.sha256 = sha256
+        self.render_time = render_time
+        self.write_time = write_time
+        self.skipped = skipped
+        self.cached = cached
+        self.changed = changed
+        self.error = error
+
+    def __bool__(self):
+        return self.success
+
+    def __repr__(self):
+        status = "ok" if self.success else f"error={self.error!r}"
+        return f"GenerationResult({self.path!r}, {status}, bytes={self.bytes})"
+
+    @property
+    def total_time(self):
+        """渲染和写入的总耗时（秒）"""
+        return self.render_time + self.write_time
+
+    @property
+    def status(self):
+        """结果状态：failed、skipped、cached或generated"""
+        if not self.success:
+            return "failed"
+        if self.skipped:
+            return "skipped"
+        if self.cached:
+            return "cached"
+        return "generated"
+
+    @classmethod
+    def from_file(cls, path, elapsed=0.0, **kwargs):
+        """根据已存在的产物文件构建结果（缓存命中或增量跳过时使用）"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            return cls.failure(path, e, elapsed)
+        return cls(path, bytes=len(data), sha256=hashlib.sha256(data).hexdigest(),
+                   write_time=elapsed, changed=False, **kwargs)
+
+    @classmethod
+    def failure(cls, path, error, elapsed=0.0):
+        """构建失败结果"""
+        return cls(path, success=False, render_time=elapsed, changed=False, error=str(error))
+
+    def to_dict(self):
+        """转换为可序列化为JSON的字典"""
+        return {
+            "name": self.name,
+            "label": self.label,
+            "path": self.path,
+            "status": self.status,
+            "success": self.success,
+            "bytes": self.bytes,
+            "sha256": self.sha256,
+            "render_time": self.render_time,
+            "write_time": self.write_time,
+            "skipped": self.skipped,
+            "cached": self.cached,
+            "changed": self.changed,
+            "error": self.error
+        }
+
+def write_generated_artifact(output_file, content, render_start, encoding="utf-8"):
+    """写入渲染完成的产物并返回生成结果
+
+    Args:
+        output_file: 输出文件路径
+        content: 渲染得到的文本或字节
+        render_start: 渲染开始时间（time.perf_counter()）
+        encoding: 文本编码
+    """
+    # 生成方法开始到写入之前的部分记为模板渲染阶段
+    PROFILER.checkpoint("render")
+    write_start = time.perf_counter()
+    with profile_phase("write"):
+        data = content if isinstance(content, bytes) else content.encode(encoding)
+        changed = write_bytes_artifact(output_file, data)
+        PROFILER.add_bytes(len(data))
+    write_end = time.perf_counter()
+    return GenerationResult(
+        output_file,
+        bytes=len(data),
+        sha256=hashlib.sha256(data).hexdigest(),
+        render_time=write_start - render_start,
+        write_time=write_end - write_start,
+        changed=changed
+    )
+
+def write_streamed_artifact(output_file, chunks, render_start, encoding="utf-8"):
+    """流式写入产物并返回生成结果
+
+    渲染与写入交替进行，写入耗时为编码和写文件的累计时间，其余时间计为渲染耗时
+
+    Args:
+        output_file: 输出文件路径
+        chunks: 文本片段的迭代器
+        render_start: 渲染开始时间（time.perf_counter()）
+        encoding: 文本编码
+    """
+    # 开始流式输出之前的准备工作记为模板渲染阶段
+    PROFILER.checkpoint("render")
+    with profile_phase("stream"):
+        changed, size, sha256, write_time = write_chunked_artifact(output_file, chunks, encoding)
+        PROFILER.add_bytes(size)
+    end = time.perf_counter()
+    return GenerationResult(
+        output_file,
+        bytes=size,
+        sha256=sha256,
+        render_time=end - render_start - write_time,
+        write_time=write_time,
+        changed=changed
+    )
+
+def write_artifacts(artifacts, output_dir, encoding="utf-8"):
+    """将内存中渲染的产物写入目录
+
+    Args:
+        artifacts: {文件名: 文本或字节}，例如PCIeSpoofTool.render_all()的返回值
+        output_dir: 输出目录
+        encoding: 文本编码
+
+    Returns:
+        {文件名: GenerationResult}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    for filename, content in artifacts.items():
+        output_file = os.path.join(output_dir, filename)
+        start = time.perf_counter()
+        try:
+            results[filename] = write_generated_artifact(output_file, content, start, encoding)
+        except OSError as e:
+            results[filename] = GenerationResult.failure(output_file, e, time.perf_counter() - start)
+    return results
+
+class GenerationReport:
+    """一次生成流程的汇总报告"""
+
+    def __init__(self, output_dir, workers=1, executor="sequential", incremental=False):
+        """初始化汇总报告
+
+        Args:
+            output_dir: 输出目录
+            workers: 并发工作数
+            executor: 执行模式（sequential、thread或process）
+            incremental: 是否为增量生成
+        """
+        self.output_dir = output_dir
+        self.workers = workers
+        self.executor = executor
+        self.incremental = incremental
+        self.total_time = 0.0
+        self.results = {}
+        self.cache = None
+
+    def add(self, result):
+        """添加单个产物的生成结果"""
+        self.results[result.name] = result
+        return result
+
+    def __iter__(self):
+        return iter(self.results.values())
+
+    @property
+    def success(self):
+        """所有产物是否都生成成功"""
+        return all(result.success for result in self.results.values())
+
+    @property
+    def failed(self):
+        """生成失败的产物键列表"""
+        return [result.name for result in self.results.values() if not result.success]
+
+    @property
+    def total_bytes(self):
+        """所有产物的总字节数"""
+        return sum(result.bytes for result in self.results.values())
+
+    def summary_lines(self):
+        """生成各产物状态和总耗时的可读摘要行"""
+        lines = []
+        for result in self.results.values():
+            if result.skipped:
+                lines.append(f"{result.label}: ⏭️ 未变化，已跳过")
+            elif result.cached:
+                lines.append(f"{result.label}: ♻️ 缓存命中")
+            elif result.success:
+                lines.append(f"{result.label}: ✅ 成功 ({result.bytes} 字节, "
+                             f"渲染 {result.render_time * 1000:.1f} ms, 写入 {result.write_time * 1000:.1f} ms)")
+            else:
+                lines.append(f"{result.label}: ❌ 失败 ({result.error})")
+        lines.append("")
+        lines.append(f"总耗时: {self.total_time * 1000:.1f} ms, 总大小: {self.total_bytes} 字节 "
+                     f"(并发数: {self.workers}, 模式: {self.executor})")
+        if self.cache is not None:
+            lines.append(f"缓存: 命中 {self.cache['hits']}, 未命中 {self.cache['misses']}, "
+                         f"命中率 {self.cache['hit_rate'] * 100:.0f}%")
+        return lines
+
+    def to_dict(self):
+        """转换为可序列化为JSON的字典"""
+        data = {
+            "output_dir": self.output_dir,
+            "workers": self.workers,
+            "executor": self.executor,
+            "incremental": self.incremental,
+            "success": self.success,
+            "total_time": self.total_time,
+            "total_bytes": self.total_bytes,
+            "render_time": sum(result.render_time for result in self.results.values()),
+            "write_time": sum(result.write_time for result in self.results.values()),
+            "artifacts": {name: result.to_dict() for name, result in self.results.items()}
+        }
+        if self.cache is not None:
+            data["cache"] = self.cache
+        return data
+
+    def to_json(self, indent=2):
+        """序列化为JSON字符串"""
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def save(self, path):
+        """将报告保存为JSON文件"""
+        with atomic_open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
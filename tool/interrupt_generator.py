@@ -5,15 +5,36 @@
 负责生成PCIe设备的中断处理代码
 """
 
-import os
+import time
 import re
 
+from generation_result import GenerationResult, write_generated_artifact
+from profiler import profiled
+from build_info import generation_timestamp
+from artifact_cache import generator_cache_key
+from template_engine import get_template
+
 class InterruptGenerator:
     """中断处理器生成类"""
     
-    def __init__(self):
-        """初始化中断处理器模块"""
-        self.template = self._load_interrupt_template()
+    # 生成器版本，模板或生成逻辑变化时递增，使增量生成的指纹失效
+    GENERATOR_VERSION = "1.0.1"
+    
+    # 各生成方法实际使用的配置字段，用于计算增量生成指纹
+    INPUT_KEYS = {
+        "generate_interrupt_handler": ("name", "type")
+    }
+    
+    def __init__(self, deterministic=False, cache=None):
+        """初始化中断处理器模块
+        
+        Args:
+            deterministic: 是否生成不含当前时间的可复现输出
+            cache: 产物缓存(ArtifactCache)，仅在可复现模式下使用
+        """
+        self.deterministic = deterministic
+        self.cache = cache
+        self.template = get_template("interrupt.module", self._load_interrupt_template)
         
     def _load_interrupt_template(self):
         """加载中断处理器模板"""
@@ -87,52 +108,66 @@ module {module_name} (
     end
     
     // ==========================================================================
-    // PCIe中断生成逻辑
+    // 中断类型处理
     // ==========================================================================
     
-    {interrupt_generation}
+    // 中断向量路由（在中断生成逻辑引用之前声明）
+    {interrupt_routing}
     
     // ==========================================================================
-    // 中断类型处理
+    // PCIe中断生成逻辑
     // ==========================================================================
     
-    // 中断向量路由
-    {interrupt_routing}
+    {interrupt_generation}
 
 endmodule
 """
     
+    def render_interrupt_handler(self, device_config):
+        """在内存中渲染中断处理器代码，返回文本内容，不写入文件"""
+        device_name = device_config.get("name", "自定义设备")
+        module_name = self._sanitize_module_name(device_name) + "_interrupt_handler"
+        device_type = device_config.get("type", "custom")
+        
+        # 根据设备类型准备不同的中断设置
+        msi_signals, device_signals, interrupt_definitions, interrupt_generation, interrupt_routing = self._generate_type_specific_interrupts(device_type, device_config)
+        
+        # 生成最终代码
+        return self.template.render(
+            device_name=device_name,
+            module_name=module_name,
+            timestamp=generation_timestamp(self.deterministic, self.GENERATOR_VERSION),
+            msi_signals=msi_signals,
+            device_signals=device_signals,
+            interrupt_definitions=interrupt_definitions,
+            interrupt_generation=interrupt_generation,
+            interrupt_routing=interrupt_routing
+        )
+    
+    @profiled("InterruptGenerator.generate_interrupt_handler")
     def generate_interrupt_handler(self, device_config, output_file):
         """生成中断处理器代码"""
+        start = time.perf_counter()
         try:
-            device_name = device_config.get("name", "自定义设备")
-            module_name = self._sanitize_module_name(device_name) + "_interrupt_handler"
-            device_type = device_config.get("type", "custom")
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_interrupt_handler")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ 中断处理器代码已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 根据设备类型准备不同的中断设置
-            msi_signals, device_signals, interrupt_definitions, interrupt_generation, interrupt_routing = self._generate_type_specific_interrupts(device_type, device_config)
-            
-            # 生成最终代码
-            code = self.template.format(
-                device_name=device_name,
-                module_name=module_name,
-                timestamp=__import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                msi_signals=msi_signals,
-                device_signals=device_signals,
-                interrupt_definitions=interrupt_definitions,
-                interrupt_generation=interrupt_generation,
-                interrupt_routing=interrupt_routing
-            )
+            code = self.render_interrupt_handler(device_config)
             
             # 写入输出文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(code)
+            result = write_generated_artifact(output_file, code, start)
+            
+            if cache_key:
+                self.cache.store(cache_key, output_file)
             
             print(f"✅ 中断处理器代码已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成中断处理器代码失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
     
     def _generate_type_specific_interrupts(self, device_type, device_config):
         """根据设备类型生成中断处理代码"""
@@ -339,6 +374,7 @@ endmodule
             interrupt_generation = """
     // 存储设备中断生成
     reg [1:0] int_mode;  // 中断模式: 0=传统, 1=MSI, 2=MSI-X
+    reg       media_present_prev;  // 上一周期的介质状态，用于检测介质变化
     
     initial begin
         int_mode = 2'b00;     // 默认使用传统中断
@@ -355,6 +391,7 @@ endmodule
             int_in_progress <= 1'b0;
             int_counter <= 8'h0;
             int_mode <= 2'b00;
+            media_present_prev <= media_present;
         end else begin
             // 检测中断模式
             if (msix_enable)
@@ -422,7 +459,8 @@ endmodule
             end
             
             // 介质变化检测
-            if (media_present != status_reg[24]) begin
+            media_present_prev <= media_present;
+            if (media_present != media_present_prev) begin
                 // 介质状态变化中断
                 int_status <= int_status | INT_MEDIA_CHANGE;
             end
@@ -444,9 +482,11 @@ endmodule
     
     def _sanitize_module_name(self, name):
         """将设备名称转换为有效的模块名"""
+        # SV标识符只能使用ASCII字符，先移除中文等非ASCII字符
+        name = re.sub(r'[^\x00-\x7F]+', '', name)
         # 移除非字母数字字符，转换为小写
         name = re.sub(r'[^\w]', '_', name).lower()
         # 确保开头是字母
         if name and not name[0].isalpha():
             name = "dev_" + name
-        return name 
\ No newline at end of file
+        return name or "device"
\ No newline at end of file
@@ -456,24 +456,22 @@ class PCIeSpoofGUI:
             # 生成代码
             result = self.tool.generate_all(output_dir)
             
-            if result:
+            report = self.tool.last_report
+            if result and report.success:
                 # 记录成功信息
                 self.log_text.insert(tk.END, f"✅ 代码生成成功！\n")
                 self.log_text.insert(tk.END, f"输出路径: {output_dir}\n\n")
-                self.log_text.insert(tk.END, "生成的文件:\n")
-                self.log_text.insert(tk.END, "- pcileech_cfgspace.coe\n")
-                self.log_text.insert(tk.END, "- pcileech_cfgspace_writemask.coe\n")
-                self.log_text.insert(tk.END, "- bar_controller.sv\n")
-                self.log_text.insert(tk.END, "- device_behavior.sv\n")
-                self.log_text.insert(tk.END, "- register_map.sv\n")
-                self.log_text.insert(tk.END, "- interrupt_handler.sv\n")
-                self.log_text.insert(tk.END, "- test_device.py\n")
-                self.log_text.insert(tk.END, "- device_spoof_includes.sv\n")
-                self.log_text.insert(tk.END, "- README.md\n")
+                self.log_text.insert(tk.END, "生成结果:\n")
+                for line in report.summary_lines():
+                    self.log_text.insert(tk.END, f"{line}\n")
                 
-                self.status_var.set(f"代码生成完成: {output_dir}")
+                self.status_var.set(f"代码生成完成: {output_dir} "
+                                    f"({report.total_bytes} 字节, {report.total_time * 1000:.1f} ms)")
                 messagebox.showinfo("成功", f"代码生成完成！文件已保存至: {output_dir}")
             else:
+                if report is not None:
+                    for line in report.summary_lines():
+                        self.log_text.insert(tk.END, f"{line}\n")
                 self.log_text.insert(tk.END, "❌ 生成失败！请检查配置和输出路径。\n")
                 self.status_var.set("代码生成失败")
                 messagebox.showerror("错误", "代码生成失败！")
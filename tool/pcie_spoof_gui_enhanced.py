@@ -13,7 +13,8 @@ from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
 
 # 导入主工具
-from pcie_spoof_tool import PCIeSpoofTool, PRESET_DEVICES, DEVICE_TYPES
+from pcie_spoof_tool import PCIeSpoofTool, PRESET_DEVICES, DEVICE_TYPES, REGISTER_EXPORT_KEYS
+from config_snapshot import thaw
 
 # 导入自定义组件
 try:
@@ -26,6 +27,18 @@ try:
 except ImportError:
     COMPONENTS_AVAILABLE = False
 
+# 生成选项对应的产物键（与PCIeSpoofTool.generate_all的only参数相同）
+GENERATION_OPTION_ARTIFACTS = {
+    "gen_config": ("cfgspace", "writemask"),
+    "gen_bar": ("bar", "bar_rom"),
+    "gen_behavior": ("behavior",),
+    "gen_registers": ("registers",) + tuple(REGISTER_EXPORT_KEYS.values()),
+    "gen_interrupts": ("interrupt",),
+    "gen_dma": ("dma",),
+    "gen_test": ("test",),
+    "gen_readme": ("includes", "readme")
+}
+
 class PCIeSpoofGUIEnhanced:
     """PCIe设备伪装工具增强版GUI类"""
     
@@ -124,6 +137,7 @@ class PCIeSpoofGUIEnhanced:
         file_menu.add_command(label="新建配置", command=self.new_config)
         file_menu.add_command(label="加载配置", command=self.load_config_file)
         file_menu.add_command(label="保存配置", command=self.save_config_file)
+        file_menu.add_command(label="导入寄存器规格", command=self.import_register_spec)
         file_menu.add_separator()
         file_menu.add_command(label="生成代码", command=self.generate_code)
         file_menu.add_separator()
@@ -145,6 +159,12 @@ class PCIeSpoofGUIEnhanced:
         
         menu_bar.add_cascade(label="视图", menu=view_menu)
         
+        # 工具菜单
+        tools_menu = tk.Menu(menu_bar, tearoff=0)
+        tools_menu.add_command(label="资源估算", command=self.estimate_resources)
+        
+        menu_bar.add_cascade(label="工具", menu=tools_menu)
+        
         # 帮助菜单
         help_menu = tk.Menu(menu_bar, tearoff=0)
         help_menu.add_command(label="使用说明", command=self.show_help)
@@ -308,7 +328,8 @@ class PCIeSpoofGUIEnhanced:
                 
                 # 如果有寄存器数据，加载到编辑器
                 if COMPONENTS_AVAILABLE and "key_registers" in preset_data and self.register_editor is not None:
-                    self.registers = preset_data["key_registers"]
+                    # 预设是只读快照，复制后交给编辑器修改
+                    self.registers = thaw(preset_data["key_registers"])
                     self.register_editor.set_registers(self.registers)
                     self.visual_view.update_register_map(self.registers)
             elif preset == "无":
@@ -473,6 +494,14 @@ class PCIeSpoofGUIEnhanced:
         )
         generate_btn.pack(side=tk.RIGHT, padx=5)
         
+        # 资源估算按钮
+        estimate_btn = ttk.Button(
+            button_frame, 
+            text="资源估算", 
+            command=self.estimate_resources
+        )
+        estimate_btn.pack(side=tk.RIGHT, padx=5)
+        
         # 保存配置按钮
         save_config_btn = ttk.Button(
             button_frame, 
@@ -646,6 +675,56 @@ class PCIeSpoofGUIEnhanced:
             self.status_var.set(f"保存配置失败: {str(e)}")
             messagebox.showerror("错误", f"保存配置失败: {str(e)}")
     
+    def import_register_spec(self):
+        """从CSV、IP-XACT或SystemRDL寄存器规格导入设备寄存器"""
+        if not hasattr(self.tool, 'device_config') or not self.tool.device_config:
+            messagebox.showwarning("警告", "请先创建或加载配置！")
+            return
+        
+        filename = filedialog.askopenfilename(
+            title="选择寄存器规格文件",
+            filetypes=[("寄存器规格", "*.csv *.tsv *.xml *.ipxact *.spirit *.rdl"),
+                       ("CSV表格", "*.csv *.tsv"), ("IP-XACT", "*.xml *.ipxact *.spirit"),
+                       ("SystemRDL", "*.rdl"), ("所有文件", "*.*")]
+        )
+        if not filename:
+            return
+        
+        replace = messagebox.askyesnocancel("导入寄存器规格", "是否替换现有的设备寄存器？\n选择“否”将追加到现有寄存器之后")
+        if replace is None:
+            return
+        
+        # 编辑器中的寄存器可能尚未同步到配置，以编辑器为准
+        if COMPONENTS_AVAILABLE and self.register_editor is not None:
+            target = {"key_registers": self.registers}
+        else:
+            target = self.tool.device_config
+        
+        from spec_importer import import_registers
+        
+        try:
+            self.status_var.set(f"正在导入: {filename}")
+            self.root.update_idletasks()
+            count = import_registers(target, filename, replace=replace)
+        except Exception as e:
+            self.status_var.set(f"导入寄存器规格失败: {str(e)}")
+            messagebox.showerror("错误", f"导入寄存器规格失败: {str(e)}")
+            return
+        
+        registers = target["key_registers"]
+        self.tool.device_config["key_registers"] = registers
+        if COMPONENTS_AVAILABLE and self.register_editor is not None:
+            self.register_editor.set_registers(registers)
+            self.on_registers_updated(registers)
+        self.update_current_config()
+        
+        errors = self.check_register_conflicts()
+        if errors:
+            messagebox.showwarning("导入完成", f"已导入{count}个寄存器，但存在{len(errors)}处寄存器冲突，请在寄存器编辑器中修正。")
+        else:
+            self.status_var.set(f"已从{os.path.basename(filename)}导入{count}个寄存器")
+            messagebox.showinfo("成功", f"已导入{count}个寄存器！")
+    
     def generate_code(self):
         """生成代码"""
         if not hasattr(self.tool, 'device_config') or not self.tool.device_config:
@@ -657,10 +736,7 @@ class PCIeSpoofGUIEnhanced:
             messagebox.showwarning("警告", "请先选择输出目录！")
             return
             
-        # 清空日志
-        self.log_text.delete(1.0, tk.END)
-        
-        # 获取生成选项
+        # 获取生成选项，转换为要生成的产物键
         options = {
             "gen_config": self.gen_config_var.get(),
             "gen_bar": self.gen_bar_var.get(),
@@ -671,6 +747,14 @@ class PCIeSpoofGUIEnhanced:
             "gen_test": self.gen_test_var.get(),
             "gen_readme": self.gen_readme_var.get()
         }
+        artifacts = [key for option, selected in options.items() if selected
+                     for key in GENERATION_OPTION_ARTIFACTS[option]]
+        if not artifacts:
+            messagebox.showwarning("警告", "请至少选择一项生成选项！")
+            return
+        
+        # 清空日志
+        self.log_text.delete(1.0, tk.END)
         
         try:
             # 记录开始
@@ -680,46 +764,25 @@ class PCIeSpoofGUIEnhanced:
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
             
-            # 生成代码（这里简化，实际应该根据选项调用相应的生成方法）
-            # 由于pcie_spoof_tool.py中generate_all方法不支持选择性生成，
-            # 这里直接调用原方法，后续可以扩展为支持选择性生成
-            result = self.tool.generate_all(output_dir)
+            # 只生成选中的产物
+            result = self.tool.generate_all(output_dir, only=artifacts)
             
-            if result:
-                # 记录成功信息
+            report = self.tool.last_report
+            if result and report.success:
+                # 记录成功信息，使用生成报告中的实际产物和耗时
                 self.log_text.insert(tk.END, f"✅ 代码生成成功！\n")
                 self.log_text.insert(tk.END, f"输出路径: {output_dir}\n\n")
-                self.log_text.insert(tk.END, "生成的文件:\n")
-                
-                if options["gen_config"]:
-                    self.log_text.insert(tk.END, "- pcileech_cfgspace.coe\n")
-                    self.log_text.insert(tk.END, "- pcileech_cfgspace_writemask.coe\n")
-                
-                if options["gen_bar"]:
-                    self.log_text.insert(tk.END, "- bar_controller.sv\n")
+                self.log_text.insert(tk.END, "生成结果:\n")
+                for line in report.summary_lines():
+                    self.log_text.insert(tk.END, f"{line}\n")
                 
-                if options["gen_behavior"]:
-                    self.log_text.insert(tk.END, "- device_behavior.sv\n")
-                
-                if options["gen_registers"]:
-                    self.log_text.insert(tk.END, "- register_map.sv\n")
-                
-                if options["gen_interrupts"]:
-                    self.log_text.insert(tk.END, "- interrupt_handler.sv\n")
-                
-                if options["gen_dma"]:
-                    self.log_text.insert(tk.END, "- dma_controller.sv\n")
-                
-                if options["gen_test"]:
-                    self.log_text.insert(tk.END, "- test_device.py\n")
-                
-                if options["gen_readme"]:
-                    self.log_text.insert(tk.END, "- device_spoof_includes.sv\n")
-                    self.log_text.insert(tk.END, "- README.md\n")
-                
-                self.status_var.set(f"代码生成完成: {output_dir}")
+                self.status_var.set(f"代码生成完成: {output_dir} "
+                                    f"({report.total_bytes} 字节, {report.total_time * 1000:.1f} ms)")
                 messagebox.showinfo("成功", f"代码生成完成！文件已保存至: {output_dir}")
             else:
+                if report is not None:
+                    for line in report.summary_lines():
+                        self.log_text.insert(tk.END, f"{line}\n")
                 self.log_text.insert(tk.END, "❌ 生成失败！请检查配置和输出路径。\n")
                 self.status_var.set("代码生成失败")
                 messagebox.showerror("错误", "代码生成失败！")
@@ -728,6 +791,34 @@ class PCIeSpoofGUIEnhanced:
             self.status_var.set(f"代码生成失败: {str(e)}")
             messagebox.showerror("错误", f"代码生成失败: {str(e)}")
     
+    def estimate_resources(self):
+        """估算生成的RTL占用的FPGA资源，结果显示在生成日志中"""
+        if not hasattr(self.tool, 'device_config') or not self.tool.device_config:
+            messagebox.showwarning("警告", "请先创建或加载配置！")
+            return
+        
+        # 切换到代码生成选项卡并清空日志
+        self.notebook.select(2)
+        self.log_text.delete(1.0, tk.END)
+        
+        try:
+            self.log_text.insert(tk.END, "开始资源估算...\n")
+            self.log_text.update()
+            
+            estimate = self.tool.estimate_resources(include_dma=self.gen_dma_var.get())
+            for line in estimate.summary_lines("xc7a35t"):
+                self.log_text.insert(tk.END, f"{line}\n")
+            
+            worst = estimate.worst
+            if worst is not None:
+                self.status_var.set(f"资源估算完成: LUT {estimate.total('luts')}, "
+                                    f"触发器 {estimate.total('flops')}, BRAM18 {estimate.total('bram18')}, "
+                                    f"约 {worst.fmax:.1f} MHz")
+        except Exception as e:
+            self.log_text.insert(tk.END, f"❌ 发生错误: {str(e)}\n")
+            self.status_var.set(f"资源估算失败: {str(e)}")
+            messagebox.showerror("错误", f"资源估算失败: {str(e)}")
+    
     def on_registers_updated(self, registers):
         """处理寄存器更新事件
         
@@ -735,6 +826,7 @@ class PCIeSpoofGUIEnhanced:
             registers: 更新后的寄存器数据
         """
         self.registers = registers
+        self.check_register_conflicts()
         
         # 更新视图
         if hasattr(self, 'visual_view') and self.visual_view is not None:
@@ -747,6 +839,7 @@ class PCIeSpoofGUIEnhanced:
             config: 更新后的DMA配置
         """
         self.dma_config = config
+        self.check_register_conflicts()
     
     def on_interrupt_updated(self, config):
         """处理中断配置更新事件
@@ -755,6 +848,25 @@ class PCIeSpoofGUIEnhanced:
             config: 更新后的中断配置
         """
         self.interrupt_config = config
+        self.check_register_conflicts()
+    
+    def check_register_conflicts(self):
+        """检查寄存器、DMA和中断编辑器之间的寄存器地址冲突，结果显示在状态栏
+        
+        各编辑器只检查自身的寄存器，不同来源之间的重叠在这里检查
+        """
+        from register_index import find_register_conflicts
+        
+        conflicts = find_register_conflicts({
+            "key_registers": self.registers,
+            "dma_config": self.dma_config,
+            "interrupt_config": self.interrupt_config
+        })
+        errors = [conflict for conflict in conflicts if conflict.is_error]
+        if errors:
+            more = f" 等{len(errors)}处" if len(errors) > 1 else ""
+            self.status_var.set(f"寄存器地址冲突: {errors[0]}{more}")
+        return errors
     
     def show_help(self):
         """显示帮助信息"""
@@ -765,6 +877,7 @@ PCIe设备伪装工具 - 使用说明
    - 新建配置: 创建新的设备伪装配置
    - 加载配置: 打开已有的配置文件
    - 保存配置: 保存当前配置到文件
+   - 导入寄存器规格: 从CSV、IP-XACT或SystemRDL文件导入设备寄存器
    - 生成代码: 生成所有伪装代码文件
 
 2. 高级功能:
@@ -6,19 +6,26 @@ PCIe设备伪装自动化工具
 """
 
 import os
+import io
 import sys
+import glob
 import argparse
+import importlib
 import json
 import re
+import time
+from contextlib import redirect_stdout
 from pathlib import Path
 
-# 导入子模块
-from config_spoofer import ConfigSpoofer
-from bar_generator import BARGenerator
-from behavior_generator import BehaviorGenerator
-from register_mapper import RegisterMapper
-from interrupt_generator import InterruptGenerator
-from test_generator import TestGenerator
+# 导入子模块（生成模块见MODULE_SPECS，寄存器模型、结构检查、资源估算、规格导入和配置监视等
+# 功能模块都在首次使用时才导入，list/create等命令不需要加载它们）
+from generation_result import GenerationResult, GenerationReport, write_generated_artifact
+from fingerprint import GenerationManifest, compute_fingerprint
+from build_info import generation_timestamp, archive_mtime, output_options
+from artifact_writer import atomic_open, sync_artifacts, BundleWriter, BUNDLE_FORMATS
+from artifact_cache import ArtifactCache, DEFAULT_MAX_BYTES, artifact_cache_key
+from config_snapshot import freeze, thaw
+from profiler import PROFILER, PROFILE_FORMATS, profile_phase, profiled
 
 # 版本号
 VERSION = "1.0.0"
@@ -34,8 +41,8 @@ DEVICE_TYPES = {
     "custom": "自定义设备"
 }
 
-# 预设设备信息
-PRESET_DEVICES = {
+# 预设设备信息（只读快照，使用时通过thaw()复制为可修改的配置）
+PRESET_DEVICES = freeze({
     "intel_wireless_ac7260": {
         "name": "Intel(R) 双频 Wireless-AC 7260",
         "vendor_id": "8086",
@@ -85,44 +92,266 @@ PRESET_DEVICES = {
             {"addr": "0x00014", "name": "控制器配置", "value": "32'h00460001", "access": "RW"}
         ]
     }
+})
+
+# 生成模块定义: 模块键 -> (Python模块名, 类名)
+# 生成模块在首次使用时才导入和构造，list/create等命令不需要加载它们
+MODULE_SPECS = {
+    "config": ("config_spoofer", "ConfigSpoofer"),
+    "bar": ("bar_generator", "BARGenerator"),
+    "behavior": ("behavior_generator", "BehaviorGenerator"),
+    "registers": ("register_mapper", "RegisterMapper"),
+    "interrupt": ("interrupt_generator", "InterruptGenerator"),
+    "test": ("test_generator", "TestGenerator"),
+    "dma": ("dma_generator", "DMAGenerator")
 }
 
+def load_module_class(module_key):
+    """导入并返回生成模块类"""
+    module_name, class_name = MODULE_SPECS[module_key]
+    return getattr(importlib.import_module(module_name), class_name)
+
+class LazyModuleRegistry:
+    """延迟加载的生成模块注册表
+    
+    按模块键访问时才导入对应的Python模块并构造生成器实例，
+    构造后的实例会被缓存复用
+    """
+    
+    def __init__(self, **options):
+        """初始化注册表
+        
+        Args:
+            options: 构造生成器实例时传入的参数
+        """
+        self.options = options
+        self._instances = {}
+    
+    def __getitem__(self, module_key):
+        instance = self._instances.get(module_key)
+        if instance is None:
+            instance = load_module_class(module_key)(**self.options)
+            self._instances[module_key] = instance
+        return instance
+    
+    def __contains__(self, module_key):
+        return module_key in MODULE_SPECS
+    
+    def __iter__(self):
+        return iter(MODULE_SPECS)
+    
+    def __len__(self):
+        return len(MODULE_SPECS)
+    
+    def keys(self):
+        return MODULE_SPECS.keys()
+    
+    def loaded(self):
+        """返回已构造的生成器实例"""
+        return list(self._instances.values())
+    
+    def set_option(self, name, value):
+        """修改构造参数，并同步到已构造的实例"""
+        self.options[name] = value
+        for instance in self._instances.values():
+            setattr(instance, name, value)
+
+# 以下常量用于命令行参数和产物键，与各功能模块中的定义一致，解析命令行时无需导入功能模块
+
+# 寄存器定义导出格式，与register_exporter.EXPORT_FORMATS一致
+REGISTER_EXPORT_FORMATS = ("sv_package", "c", "python", "json")
+
+# 寄存器规格格式，与spec_importer.SPEC_FORMATS一致
+SPEC_FORMAT_NAMES = ("csv", "ipxact", "rdl")
+
+# 资源估算的FPGA器件和默认目标时钟，与resource_estimator.FPGA_DEVICES、DEFAULT_CLOCK_MHZ一致
+FPGA_DEVICE_NAMES = ("xc7a35t", "xc7a75t", "xc7a100t")
+DEFAULT_CLOCK_MHZ = 62.5
+
+# 寄存器地址分配的默认对齐，与address_allocator.DEFAULT_ALIGNMENT一致
+DEFAULT_ALIGNMENT = 4
+
+# 配置监视的轮询间隔和静默时间，与config_watcher中的默认值一致
+DEFAULT_POLL_INTERVAL = 0.1
+DEFAULT_DEBOUNCE = 0.05
+
+# 生成步骤定义: (产物键, 模块键, 生成方法, 输出文件名, 显示名称)
+# 各步骤只读取device_config并写入各自的文件，彼此独立，可以并发执行
+GENERATION_STEPS = [
+    ("cfgspace", "config", "generate_config_space", "pcileech_cfgspace.coe", "配置空间文件"),
+    ("writemask", "config", "generate_writemask", "pcileech_cfgspace_writemask.coe", "写入掩码文件"),
+    ("bar", "bar", "generate_bar_controller", "bar_controller.sv", "BAR控制器代码"),
+    ("bar_rom", "bar", "generate_const_rom", "bar_const_rom.coe", "常量寄存器ROM"),
+    ("behavior", "behavior", "generate_behavior_code", "device_behavior.sv", "行为模拟代码"),
+    ("registers", "registers", "generate_register_map", "register_map.sv", "寄存器映射代码"),
+    ("interrupt", "interrupt", "generate_interrupt_handler", "interrupt_handler.sv", "中断处理代码"),
+    ("test", "test", "generate_test_script", "test_device.py", "测试脚本")
+]
+
+# DMA控制器不属于默认产物，只在显式选择（产物键"dma"）时生成
+DMA_STEP = ("dma", "dma", "generate_dma_controller", "dma_controller.sv", "DMA控制器代码")
+
+# 使用共享寄存器模型的生成步骤，模型在generate_all中只构建一次
+REGISTER_MODEL_STEPS = ("bar", "bar_rom", "registers", "test")
+
+# 结构检查发现问题时最多打印的问题数
+CHECK_PRINT_LIMIT = 10
+
+# README使用的配置字段，用于计算增量生成指纹
+README_INPUT_KEYS = ("name", "vendor_id", "device_id", "type")
+
+# 工具自身生成的产物文件名
+INCLUDES_FILENAME = "device_spoof_includes.sv"
+README_FILENAME = "README.md"
+
+# 包含文件中RTL产物的包含顺序，结构检查按此顺序将各产物作为同一编译单元
+INCLUDED_RTL = ("register_map.sv", "interrupt_handler.sv", "device_behavior.sv", "bar_controller.sv")
+
+# 寄存器定义导出格式对应的产物键，由寄存器映射模块一次遍历同时生成
+REGISTER_EXPORT_KEYS = {export_format: f"export_{export_format}" for export_format in REGISTER_EXPORT_FORMATS}
+
+# 所有产物键（生成步骤、DMA控制器、寄存器定义导出和工具自身生成的包含文件、README）
+ARTIFACT_KEYS = (tuple(step[0] for step in GENERATION_STEPS) + (DMA_STEP[0],) +
+                 tuple(REGISTER_EXPORT_KEYS.values()) + ("includes", "readme"))
+
+def _uses_const_rom(config):
+    """配置的BAR控制器是否将只读常量寄存器放入ROM（bar_ro_storage为rom）"""
+    return str(config.get("bar_ro_storage") or "").strip().lower() == "rom"
+
+def _selected_steps(config, only):
+    """返回选中的生成步骤，only为None时为全部默认步骤，DMA控制器只在显式选择时生成
+
+    常量寄存器ROM只在配置使用ROM时生成
+    """
+    steps = [step for step in GENERATION_STEPS
+             if (only is None or step[0] in only) and (step[0] != "bar_rom" or _uses_const_rom(config))]
+    if only is not None and DMA_STEP[0] in only:
+        steps.append(DMA_STEP)
+    return steps
+
+def _include_order(path):
+    """RTL文件在包含文件中的顺序，未被包含的文件排在最后"""
+    name = os.path.basename(path)
+    return (INCLUDED_RTL.index(name) if name in INCLUDED_RTL else len(INCLUDED_RTL), name)
+
+def render_method_name(method_name):
+    """生成方法对应的内存渲染方法名（generate_xxx -> render_xxx）
+    
+    各生成器的generate_xxx(device_config, output_file)都是在render_xxx(device_config)
+    渲染结果之上增加缓存和文件写入
+    """
+    return "render_" + method_name[len("generate_"):]
+
+# 并发执行器类型
+EXECUTOR_TYPES = ("thread", "process")
+
+# BAR控制器的寄存器地址译码结构，与BARGenerator.DECODE_STYLES一致（此处不导入生成模块）
+BAR_DECODE_STYLES = ("chain", "case", "banked")
+
+# BAR控制器中只读常量寄存器的存放方式，与BARGenerator.RO_STORAGE_MODES一致
+BAR_RO_STORAGE_MODES = ("logic", "rom")
+
+# 工作进程内缓存的生成模块实例
+_worker_modules = {}
+
+def _run_generation_step(module_key, method_name, device_config, output_file, deterministic=False,
+                         profile=None):
+    """在工作进程中执行单个生成步骤
+    
+    每个工作进程只构造一次生成模块实例，后续任务复用
+    
+    Args:
+        profile: 为None时不剖析，否则在工作进程中开启剖析，取值表示是否记录峰值内存
+    
+    Returns:
+        GenerationResult；开启剖析时返回(GenerationResult, 剖析记录)，由主进程合并
+    """
+    module = _worker_modules.get(module_key)
+    if module is None:
+        module = load_module_class(module_key)()
+        _worker_modules[module_key] = module
+    module.deterministic = deterministic
+    if profile is None:
+        return _as_result(getattr(module, method_name)(device_config, output_file), output_file)
+    
+    PROFILER.enable(trace_memory=profile)
+    try:
+        result = _as_result(getattr(module, method_name)(device_config, output_file), output_file)
+    finally:
+        PROFILER.disable()
+    records = PROFILER.records()
+    PROFILER.reset()
+    return result, records
+
+def _as_result(result, output_file):
+    """将生成方法的返回值统一为GenerationResult（兼容仍返回布尔值的生成器）"""
+    if isinstance(result, GenerationResult):
+        return result
+    if result:
+        return GenerationResult.from_file(output_file)
+    return GenerationResult.failure(output_file, "生成失败")
+
 class PCIeSpoofTool:
     """PCIe设备伪装工具主类"""
     
-    def __init__(self):
-        """初始化工具"""
+    def __init__(self, deterministic=False, cache=None):
+        """初始化工具
+        
+        Args:
+            deterministic: 是否生成可复现的输出（不嵌入当前时间）
+            cache: 产物缓存(ArtifactCache)，启用时自动切换为可复现模式
+        """
+        self.deterministic = deterministic or cache is not None
+        self.cache = cache
         self.config_path = None
         self.output_path = None
         self.device_config = {}
-        self.modules = {}
+        self.modules = None
+        self.last_report = None
+        self.last_error = None
         self.initialize_modules()
         
     def initialize_modules(self):
-        """初始化各个功能模块"""
-        self.modules['config'] = ConfigSpoofer()
-        self.modules['bar'] = BARGenerator()
-        self.modules['behavior'] = BehaviorGenerator()
-        self.modules['registers'] = RegisterMapper()
-        self.modules['interrupt'] = InterruptGenerator()
-        self.modules['test'] = TestGenerator()
+        """初始化各个功能模块（延迟到首次使用时加载）"""
+        self.modules = LazyModuleRegistry(deterministic=self.deterministic)
+    
+    def set_deterministic(self, deterministic):
+        """切换可复现输出模式
+        
+        启用后所有生成文件不再嵌入当前时间，输出只取决于配置和工具版本
+        """
+        self.deterministic = deterministic
+        self.modules.set_option("deterministic", deterministic)
+    
+    def set_cache(self, cache):
+        """设置产物缓存
         
+        缓存内容必须不含生成时间，因此启用缓存时同时启用可复现模式
+        """
+        self.cache = cache
+        if cache is not None:
+            self.set_deterministic(True)
+        
+    @profiled("config_load")
     def load_config(self, config_path):
         """加载配置文件"""
         self.config_path = config_path
+        self.last_error = None
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 self.device_config = json.load(f)
             print(f"✅ 成功加载配置文件: {config_path}")
             return True
         except Exception as e:
-            print(f"❌ 加载配置文件失败: {str(e)}")
+            self.last_error = f"加载配置文件失败: {str(e)}"
+            print(f"❌ {self.last_error}")
             return False
     
+    @profiled("config_load")
     def create_new_config(self, device_type, preset=None):
         """创建新的设备配置"""
         if preset and preset in PRESET_DEVICES:
-            self.device_config = PRESET_DEVICES[preset].copy()
+            self.device_config = thaw(PRESET_DEVICES[preset])
             print(f"✅ 已加载预设设备: {self.device_config['name']}")
         else:
             self.device_config = {
@@ -147,7 +376,7 @@ class PCIeSpoofTool:
             self.output_path = f"{safe_name}_config.json"
         
         try:
-            with open(self.output_path, 'w', encoding='utf-8') as f:
+            with atomic_open(self.output_path, 'w', encoding='utf-8') as f:
                 json.dump(self.device_config, f, indent=2, ensure_ascii=False)
             print(f"✅ 配置已保存到: {self.output_path}")
             return True
@@ -155,80 +384,655 @@ class PCIeSpoofTool:
             print(f"❌ 保存配置失败: {str(e)}")
             return False
     
-    def generate_all(self, output_dir):
-        """生成所有伪装文件"""
+    @profiled("snapshot")
+    def snapshot(self):
+        """返回当前配置的只读快照
+        
+        生成过程只读取快照，因此生成期间修改device_config不会影响本次输出，
+        各生成器也无法修改调用方的配置。device_config本身已是快照时直接复用
+        """
+        return freeze(self.device_config)
+    
+    @profiled("generate_all")
+    def generate_all(self, output_dir, workers=1, executor="process", incremental=False, fsync=False,
+                     check=True, only=None):
+        """生成所有伪装文件
+        
+        各文件都通过临时文件原子替换写入，生成过程中其他进程不会读到写了一半的文件
+        
+        Args:
+            output_dir: 输出目录
+            workers: 并发工作数，1表示顺序执行，0表示使用全部CPU核心
+            executor: 并发执行器类型，"thread"或"process"
+            incremental: 增量模式，跳过输入指纹未变化的生成步骤
+            fsync: 全部文件写入后将本次写入的文件及其目录同步到磁盘
+            check: 对本次生成的RTL产物进行结构检查，发现问题的产物记为失败
+            only: 只生成指定的产物键（与render_all相同），为None时生成全部默认产物
+            
+        Returns:
+            是否完成生成流程，各产物的详细结果保存在last_report(GenerationReport)中
+        """
+        self.last_report = None
+        self.last_error = None
         try:
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
             
-            # 1. 生成配置空间文件
-            cfg_result = self.modules['config'].generate_config_space(
-                self.device_config, 
-                os.path.join(output_dir, "pcileech_cfgspace.coe")
-            )
+            # 所有生成步骤共享同一个只读快照
+            config = self.snapshot()
+            self._check_register_conflicts(config)
             
-            # 2. 生成写入掩码文件
-            mask_result = self.modules['config'].generate_writemask(
-                self.device_config, 
-                os.path.join(output_dir, "pcileech_cfgspace_writemask.coe")
-            )
+            if workers is not None and workers <= 0:
+                workers = os.cpu_count() or 1
             
-            # 3. 生成BAR控制器代码
-            bar_result = self.modules['bar'].generate_bar_controller(
-                self.device_config, 
-                os.path.join(output_dir, "bar_controller.sv")
-            )
+            # 计算各生成步骤的输入指纹
+            manifest = GenerationManifest(output_dir).load()
+            options = output_options(self.deterministic)
+            steps = _selected_steps(config, only)
+            fingerprints = {}
+            pending_steps = []
+            with profile_phase("fingerprint"):
+                for step in steps:
+                    key, module_key, method_name, filename, _ = step
+                    module_class = load_module_class(module_key)
+                    fingerprints[key] = compute_fingerprint(
+                        config,
+                        module_class.INPUT_KEYS[method_name],
+                        module_class.GENERATOR_VERSION,
+                        options
+                    )
+                    if not (incremental and manifest.is_up_to_date(filename, fingerprints[key])):
+                        pending_steps.append(step)
             
-            # 4. 生成行为模拟代码
-            behavior_result = self.modules['behavior'].generate_behavior_code(
-                self.device_config, 
-                os.path.join(output_dir, "device_behavior.sv")
-            )
+            start = time.perf_counter()
             
-            # 5. 生成寄存器映射代码
-            reg_result = self.modules['registers'].generate_register_map(
-                self.device_config, 
-                os.path.join(output_dir, "register_map.sv")
-            )
+            # 查询产物缓存，命中的步骤无需渲染
+            cache_keys = {}
+            step_results = {}
+            if self.cache is not None and self.deterministic:
+                with profile_phase("cache_lookup"):
+                    for step in list(pending_steps):
+                        key, module_key, method_name, filename, _ = step
+                        output_file = os.path.join(output_dir, filename)
+                        fetch_start = time.perf_counter()
+                        cache_keys[key] = artifact_cache_key(
+                            self.cache, config, load_module_class(module_key), method_name
+                        )
+                        if self.cache.fetch(cache_keys[key], output_file):
+                            step_results[key] = GenerationResult.from_file(
+                                output_file, time.perf_counter() - fetch_start, cached=True
+                            )
+                            pending_steps.remove(step)
             
-            # 6. 生成中断处理代码
-            int_result = self.modules['interrupt'].generate_interrupt_handler(
-                self.device_config, 
-                os.path.join(output_dir, "interrupt_handler.sv")
+            parallel = bool(workers and workers > 1 and len(pending_steps) > 1)
+            report = GenerationReport(
+                output_dir,
+                workers=workers or 1,
+                executor=executor if parallel else "sequential",
+                incremental=incremental
             )
             
-            # 7. 生成测试文件
-            test_result = self.modules['test'].generate_test_script(
-                self.device_config, 
-                os.path.join(output_dir, "test_device.py")
-            )
+            # 需要寄存器的生成步骤共享同一个寄存器模型，解析和排序只做一次
+            # 进程池中序列化模型比重新构建更慢，由各工作进程自行构建
+            register_model = None
+            process_pool = parallel and executor == "process"
+            if not process_pool and any(step[0] in REGISTER_MODEL_STEPS for step in pending_steps):
+                register_model = self._build_register_model(config)
+            
+            if parallel:
+                step_results.update(self._run_steps_concurrently(config, output_dir, pending_steps, workers,
+                                                                 executor, register_model))
+            else:
+                step_results.update(self._run_steps_sequentially(config, output_dir, pending_steps,
+                                                                 register_model))
+            
+            # 结构检查未通过的产物不存入缓存，也不记录指纹，下次生成时重新生成
+            if check:
+                with profile_phase("check"):
+                    self._check_rtl_results(step_results, steps)
+            
+            # 将新生成的产物存入缓存
+            for key, _, _, filename, _ in pending_steps:
+                if key in cache_keys and step_results[key]:
+                    self.cache.store(cache_keys[key], os.path.join(output_dir, filename))
+            
+            # 汇总各产物的生成结果，并更新指纹清单
+            for key, _, _, filename, label in steps:
+                result = step_results.get(key)
+                if result is None:
+                    # 增量模式下输入未变化的步骤
+                    result = GenerationResult.from_file(os.path.join(output_dir, filename), skipped=True)
+                result.name, result.label = key, label
+                report.add(result)
+                if result:
+                    manifest.update(filename, fingerprints[key])
+                else:
+                    manifest.discard(filename)
+            
+            # 导出其他格式的寄存器定义
+            export_formats = [export_format for export_format in self._register_export_formats(config)
+                              if only is None or REGISTER_EXPORT_KEYS[export_format] in only]
+            if export_formats:
+                with profile_phase("register_exports"):
+                    for result in self._generate_register_exports(config, output_dir, export_formats, register_model,
+                                                                  manifest, incremental, options, check):
+                        report.add(result)
             
             # 生成简单的包含脚本
-            self._generate_include_script(output_dir)
+            if only is None or "includes" in only:
+                result = self._generate_include_script(output_dir)
+                result.name, result.label = "includes", "包含文件"
+                report.add(result)
             
             # 创建README文件
-            self._generate_readme(output_dir)
+            if only is None or "readme" in only:
+                readme_fingerprint = compute_fingerprint(config, README_INPUT_KEYS, VERSION, options)
+                if incremental and manifest.is_up_to_date(README_FILENAME, readme_fingerprint):
+                    result = GenerationResult.from_file(os.path.join(output_dir, README_FILENAME), skipped=True)
+                else:
+                    result = self._generate_readme(output_dir, config)
+                    if result:
+                        manifest.update(README_FILENAME, readme_fingerprint)
+                result.name, result.label = "readme", "说明文档"
+                report.add(result)
             
-            # 生成完成总结
-            print("\n========= 生成结果汇总 =========")
-            print(f"配置空间文件: {'✅ 成功' if cfg_result else '❌ 失败'}")
-            print(f"写入掩码文件: {'✅ 成功' if mask_result else '❌ 失败'}")
-            print(f"BAR控制器代码: {'✅ 成功' if bar_result else '❌ 失败'}")
-            print(f"行为模拟代码: {'✅ 成功' if behavior_result else '❌ 失败'}")
-            print(f"寄存器映射代码: {'✅ 成功' if reg_result else '❌ 失败'}")
-            print(f"中断处理代码: {'✅ 成功' if int_result else '❌ 失败'}")
-            print(f"测试脚本: {'✅ 成功' if test_result else '❌ 失败'}")
-            print(f"\n所有文件已生成到目录: {output_dir}")
-            print("================================\n")
+            manifest.save()
+            if fsync:
+                with profile_phase("fsync"):
+                    sync_artifacts([result.path for result in report if result.changed] + [manifest.path])
+            report.total_time = time.perf_counter() - start
+            if self.cache is not None:
+                report.cache = self.cache.stats()
+            self.last_report = report
             
+            # 生成完成总结
+            self._print_report(report)
             return True
         except Exception as e:
-            print(f"❌ 生成文件时发生错误: {str(e)}")
+            self.last_error = f"生成文件时发生错误: {str(e)}"
+            print(f"❌ {self.last_error}")
             return False
     
-    def _generate_include_script(self, output_dir):
-        """生成简单的包含脚本"""
-        include_content = """
+    @profiled("render_all")
+    def render_all(self, only=None):
+        """在内存中渲染所有产物，不读写任何文件
+        
+        预览、比较和服务封装等场景可以直接使用返回的文本，无需经过临时文件。
+        写入磁盘可以使用generation_result.write_artifacts()
+        
+        Args:
+            only: 只渲染指定的产物键（如["bar", "registers"]，与生成报告中的键相同），
+                  为None时渲染全部产物
+            
+        Returns:
+            {输出文件名: 文本}，顺序与generate_all的生成顺序一致
+            
+        Raises:
+            RuntimeError: 某个产物渲染失败
+        """
+        from register_model import build_register_model
+        
+        config = self.snapshot()
+        register_model = None
+        artifacts = {}
+        for key, module_key, method_name, filename, label in _selected_steps(config, only):
+            render = getattr(self.modules[module_key], render_method_name(method_name))
+            try:
+                if key in REGISTER_MODEL_STEPS:
+                    if register_model is None:
+                        register_model = build_register_model(config)
+                    artifacts[filename] = render(config, register_model=register_model)
+                else:
+                    artifacts[filename] = render(config)
+            except Exception as e:
+                raise RuntimeError(f"渲染{label}失败: {str(e)}") from e
+        export_formats = [export_format for export_format in self._register_export_formats(config)
+                          if only is None or REGISTER_EXPORT_KEYS[export_format] in only]
+        if export_formats:
+            try:
+                if register_model is None:
+                    register_model = build_register_model(config)
+                artifacts.update(self.modules["registers"].render_register_exports(config, export_formats,
+                                                                                   register_model))
+            except Exception as e:
+                raise RuntimeError(f"导出寄存器定义失败: {str(e)}") from e
+        if only is None or "includes" in only:
+            artifacts[INCLUDES_FILENAME] = self._render_include_script()
+        if only is None or "readme" in only:
+            artifacts[README_FILENAME] = self._render_readme(config)
+        return artifacts
+    
+    @profiled("export_bundle")
+    def export_bundle(self, bundle_path, root="", fsync=False, check=True):
+        """将所有产物直接流式写入单个zip或tar归档，不经过输出目录
+        
+        BAR控制器和寄存器映射逐块写入归档，其余产物渲染后写入。
+        归档先写入临时文件，全部产物成功后才原子替换目标文件，
+        任何产物失败时目标归档保持不变
+        
+        Args:
+            bundle_path: 归档路径，格式由扩展名决定（.zip、.tar、.tar.gz、.tgz、.tar.xz）
+            root: 归档内的顶层目录名，为空时产物位于归档根目录
+            fsync: 完成后将归档同步到磁盘
+            check: 在写入归档的同时对RTL产物进行结构检查，发现问题时不生成归档
+            
+        Returns:
+            是否成功生成归档，各产物的详细结果保存在last_report(GenerationReport)中
+        """
+        self.last_report = None
+        self.last_error = None
+        start = time.perf_counter()
+        report = GenerationReport(bundle_path, executor="bundle")
+        try:
+            config = self.snapshot()
+            self._check_register_conflicts(config)
+        except Exception as e:
+            self.last_error = f"生成文件时发生错误: {str(e)}"
+            print(f"❌ {self.last_error}")
+            return False
+        try:
+            register_model = self._build_register_model(config)
+            bundle = BundleWriter(bundle_path, root, mtime=archive_mtime(self.deterministic), fsync=fsync)
+        except Exception as e:
+            self.last_error = f"创建归档失败: {str(e)}"
+            print(f"❌ {self.last_error}")
+            return False
+        
+        from sv_checker import SVChecker, CompilationUnit
+        
+        unit = CompilationUnit()
+        with bundle:
+            for key, module_key, method_name, filename, label in _selected_steps(config, None):
+                step_start = time.perf_counter()
+                try:
+                    with profile_phase(key):
+                        chunks = self._stream_step(config, module_key, method_name,
+                                                   register_model if key in REGISTER_MODEL_STEPS else None)
+                        checker = None
+                        if check and filename.endswith(".sv"):
+                            checker = SVChecker(filename, unit)
+                            chunks = checker.tee(chunks)
+                        size, sha256 = bundle.add_chunks(
+                            filename, chunks, mode=0o755 if filename.endswith(".py") else 0o644
+                        )
+                    if checker is not None and checker.issues:
+                        self._print_check_issues(label, checker.issues)
+                        raise ValueError(f"结构检查发现{len(checker.issues)}个问题，首个: {checker.issues[0]}")
+                    result = GenerationResult(filename, bytes=size, sha256=sha256,
+                                              render_time=time.perf_counter() - step_start)
+                    print(f"✅ {label}已写入归档: {filename}")
+                except Exception as e:
+                    print(f"❌ 生成{label}失败: {str(e)}")
+                    result = GenerationResult.failure(filename, e, time.perf_counter() - step_start)
+                result.name, result.label = key, label
+                report.add(result)
+            
+            export_formats = self._register_export_formats(config)
+            if export_formats:
+                for result in self._bundle_register_exports(bundle, config, export_formats, register_model, check):
+                    report.add(result)
+            
+            for key, label, filename, content in (
+                ("includes", "包含文件", INCLUDES_FILENAME, self._render_include_script()),
+                ("readme", "说明文档", README_FILENAME, self._render_readme(config))
+            ):
+                size, sha256 = bundle.add_bytes(filename, content.encode("utf-8"))
+                result = GenerationResult(filename, bytes=size, sha256=sha256)
+                result.name, result.label = key, label
+                report.add(result)
+            
+            if not report.success:
+                # 不完整的归档不替换目标文件
+                bundle.abort()
+        
+        report.total_time = time.perf_counter() - start
+        self.last_report = report
+        self._print_report(report)
+        if not report.success:
+            self.last_error = f"归档未生成，失败的产物: {', '.join(report.failed)}"
+            print(f"❌ {self.last_error}")
+        return report.success
+    
+    @profiled("estimate_resources")
+    def estimate_resources(self, include_dma=False, clock_mhz=DEFAULT_CLOCK_MHZ):
+        """估算生成的RTL模块占用的FPGA资源和最长译码路径
+        
+        各RTL产物在内存中流式渲染后直接扫描，不写入文件也不运行综合。
+        BAR控制器使用常量寄存器ROM时，ROM按块RAM计入BAR控制器
+        
+        Args:
+            include_dma: 是否包含DMA控制器，配置中已启用DMA时总是包含
+            clock_mhz: 目标时钟频率（MHz），估算的fmax低于该值时给出警告
+            
+        Returns:
+            ResourceEstimate
+            
+        Raises:
+            RuntimeError: 某个产物渲染失败
+        """
+        from resource_estimator import ResourceEstimate, scan_rtl
+        
+        config = self.snapshot()
+        register_model = self._build_register_model(config)
+        estimate = ResourceEstimate(config.get("name", "自定义设备"), clock_mhz)
+        steps = [(key, module_key, method_name, filename, label)
+                 for key, module_key, method_name, filename, label in GENERATION_STEPS
+                 if filename.endswith(".sv")]
+        if include_dma or (config.get("dma_config") or {}).get("enabled"):
+            steps.append(DMA_STEP)
+        
+        for key, module_key, method_name, filename, label in steps:
+            try:
+                with profile_phase(key):
+                    modules = scan_rtl(self._stream_step(config, module_key, method_name,
+                                                         register_model if key in REGISTER_MODEL_STEPS else None),
+                                       filename)
+                    if key == "bar" and _uses_const_rom(config):
+                        const_rom = self.modules["bar"].build_const_rom(register_model)
+                        if const_rom and modules:
+                            modules[0].add_memory("const_rom", 32, const_rom.depth, block=True)
+            except Exception as e:
+                raise RuntimeError(f"估算{label}失败: {str(e)}") from e
+            estimate.add(modules)
+        return estimate
+    
+    def allocate_addresses(self, relocate=False, reserve_base=True, start=0, alignment=DEFAULT_ALIGNMENT):
+        """为当前配置中未指定地址的寄存器分配地址，结果写回device_config
+        
+        Args:
+            relocate: 重新紧凑排列所有未标记fixed的寄存器
+            reserve_base: 保留基本寄存器占用的地址
+            start: 分配的起始地址
+            alignment: 默认对齐（字节）
+            
+        Returns:
+            AllocationResult
+            
+        Raises:
+            ValueError: 地址空间不足、对齐要求或固定地址无效
+        """
+        from address_allocator import allocate_register_addresses
+        
+        with profile_phase("allocate"):
+            return allocate_register_addresses(self.device_config, relocate=relocate, reserve_base=reserve_base,
+                                               start=start, alignment=alignment)
+    
+    def import_register_spec(self, spec_path, spec_format=None, replace=False):
+        """从寄存器规格文件（CSV、IP-XACT或SystemRDL）导入设备寄存器
+        
+        Args:
+            spec_path: 规格文件路径
+            spec_format: "csv"、"ipxact"或"rdl"，为None时根据扩展名判断
+            replace: 替换现有的设备寄存器，否则追加到末尾
+            
+        Returns:
+            导入的寄存器数
+            
+        Raises:
+            ValueError: 规格文件格式错误
+            OSError: 无法读取规格文件
+        """
+        from spec_importer import import_registers
+        
+        with profile_phase("import"):
+            return import_registers(self.device_config, spec_path, spec_format, replace=replace)
+    
+    def _check_rtl_results(self, step_results, steps=GENERATION_STEPS):
+        """对本次生成的RTL产物进行结构检查，存在问题的产物替换为失败结果
+        
+        各RTL产物由包含文件包含到同一编译单元，宏和模块名在产物之间也不能重复
+        """
+        from sv_checker import CompilationUnit, check_sv_files
+        
+        unit = CompilationUnit()
+        steps = sorted((step for step in steps if step[3].endswith(".sv")),
+                       key=lambda step: _include_order(step[3]))
+        for key, _, _, _, label in steps:
+            result = step_results.get(key)
+            if not result:
+                continue
+            issues = check_sv_files([result.path], unit)[result.path]
+            if issues:
+                self._print_check_issues(label, issues)
+                step_results[key] = GenerationResult.failure(
+                    result.path, f"结构检查发现{len(issues)}个问题，首个: {issues[0]}",
+                    result.render_time + result.write_time
+                )
+    
+    def _register_export_formats(self, config):
+        """配置中register_exports指定的寄存器定义导出格式，未指定时导出全部格式
+        
+        Raises:
+            ValueError: 未知的导出格式
+        """
+        if "register_exports" not in config:
+            return REGISTER_EXPORT_FORMATS
+        from register_exporter import parse_export_formats
+        
+        return parse_export_formats(config["register_exports"])
+    
+    def _generate_register_exports(self, config, output_dir, formats, register_model, manifest, incremental,
+                                   options, check):
+        """将寄存器定义导出为其他格式，所有格式共用一个指纹并在一次遍历中生成
+        
+        Returns:
+            GenerationResult列表
+        """
+        from register_exporter import EXPORT_FORMATS
+        from sv_checker import check_sv_files
+        
+        module_class = load_module_class("registers")
+        fingerprint = compute_fingerprint(config, module_class.INPUT_KEYS["generate_register_exports"],
+                                          module_class.GENERATOR_VERSION, options)
+        filenames = {export_format: EXPORT_FORMATS[export_format][0] for export_format in formats}
+        if incremental and all(manifest.is_up_to_date(filename, fingerprint) for filename in filenames.values()):
+            results = {export_format: GenerationResult.from_file(os.path.join(output_dir, filename), skipped=True)
+                       for export_format, filename in filenames.items()}
+        else:
+            results = self.modules["registers"].generate_register_exports(config, output_dir, formats,
+                                                                          register_model)
+            package = results.get("sv_package")
+            if check and package:
+                issues = check_sv_files([package.path])[package.path]
+                if issues:
+                    self._print_check_issues(EXPORT_FORMATS["sv_package"][1], issues)
+                    results["sv_package"] = GenerationResult.failure(
+                        package.path, f"结构检查发现{len(issues)}个问题，首个: {issues[0]}",
+                        package.render_time + package.write_time
+                    )
+        
+        for export_format, result in results.items():
+            result.name, result.label = REGISTER_EXPORT_KEYS[export_format], EXPORT_FORMATS[export_format][1]
+            if result:
+                manifest.update(filenames[export_format], fingerprint)
+            else:
+                manifest.discard(filenames[export_format])
+        return list(results.values())
+    
+    def _bundle_register_exports(self, bundle, config, formats, register_model, check):
+        """将寄存器定义的各种导出格式写入归档
+        
+        Returns:
+            GenerationResult列表
+        """
+        from register_exporter import EXPORT_FORMATS
+        from sv_checker import check_sv
+        
+        start = time.perf_counter()
+        try:
+            with profile_phase("register_exports"):
+                rendered = self.modules["registers"].render_register_exports(config, formats, register_model)
+        except Exception as e:
+            print(f"❌ 导出寄存器定义失败: {str(e)}")
+            results = []
+            for export_format in formats:
+                result = GenerationResult.failure(EXPORT_FORMATS[export_format][0], e, time.perf_counter() - start)
+                result.name, result.label = REGISTER_EXPORT_KEYS[export_format], EXPORT_FORMATS[export_format][1]
+                results.append(result)
+            return results
+        
+        render_time = (time.perf_counter() - start) / len(formats)
+        results = []
+        for export_format in formats:
+            filename, label = EXPORT_FORMATS[export_format]
+            content = rendered[filename]
+            issues = check_sv(content, filename) if check and filename.endswith(".sv") else ()
+            if issues:
+                self._print_check_issues(label, issues)
+                result = GenerationResult.failure(filename, f"结构检查发现{len(issues)}个问题，首个: {issues[0]}",
+                                                  render_time)
+            else:
+                size, sha256 = bundle.add_bytes(filename, content.encode("utf-8"))
+                result = GenerationResult(filename, bytes=size, sha256=sha256, render_time=render_time)
+                print(f"✅ {label}已写入归档: {filename}")
+            result.name, result.label = REGISTER_EXPORT_KEYS[export_format], label
+            results.append(result)
+        return results
+    
+    def _check_register_conflicts(self, config):
+        """检查全部来源的寄存器地址冲突和设备寄存器的位域，一次报告所有问题
+        
+        Raises:
+            ValueError: 存在地址重叠、无效地址、位域重叠或超出宽度，继续生成会得到错误的译码
+        """
+        from register_model import build_register_model
+        from register_index import find_register_conflicts
+        from bitfield_validator import validate_bit_fields
+        
+        with profile_phase("register_conflicts"):
+            conflicts = find_register_conflicts(config)
+            try:
+                conflicts.extend(validate_bit_fields(build_register_model(config)))
+            except (KeyError, ValueError):
+                # 地址无效时模型无法构建，地址问题已在上面报告
+                pass
+        errors = [conflict for conflict in conflicts if conflict.is_error]
+        warnings = [conflict for conflict in conflicts if conflict.severity == "warning"]
+        for mark, group in (("❌", errors), ("⚠️", warnings)):
+            for conflict in group[:CHECK_PRINT_LIMIT]:
+                print(f"{mark} {conflict}")
+            if len(group) > CHECK_PRINT_LIMIT:
+                print(f"{mark} ……共{len(group)}个")
+        if errors:
+            raise ValueError(f"寄存器配置存在{len(errors)}个错误（地址重叠、地址无效或位域错误），请修正后重新生成")
+    
+    def _print_check_issues(self, label, issues):
+        """打印结构检查发现的问题"""
+        print(f"❌ {label}未通过结构检查:")
+        for issue in issues[:CHECK_PRINT_LIMIT]:
+            print(f"    {issue}")
+        if len(issues) > CHECK_PRINT_LIMIT:
+            print(f"    ……共{len(issues)}个问题")
+    
+    def _stream_step(self, config, module_key, method_name, register_model=None):
+        """返回生成步骤的输出片段，生成器支持流式渲染时逐块产生，否则一次性渲染"""
+        module = self.modules[module_key]
+        suffix = method_name[len("generate_"):]
+        render = getattr(module, "stream_" + suffix, None)
+        if render is None:
+            render = getattr(module, "render_" + suffix)
+        if register_model is not None:
+            output = render(config, register_model=register_model)
+        else:
+            output = render(config)
+        return (output,) if isinstance(output, str) else output
+    
+    def _print_report(self, report):
+        """打印生成结果汇总"""
+        print("\n========= 生成结果汇总 =========")
+        for line in report.summary_lines():
+            print(line)
+        print(f"所有文件已生成到: {report.output_dir}")
+        print("================================\n")
+    
+    @profiled("register_model")
+    def _build_register_model(self, config):
+        """根据配置快照构建寄存器模型
+        
+        寄存器地址无效时返回None，由各生成器自行构建并报告错误
+        """
+        from register_model import build_register_model
+        
+        try:
+            return build_register_model(config)
+        except (KeyError, ValueError):
+            return None
+    
+    def _run_steps_sequentially(self, config, output_dir, steps, register_model=None):
+        """按顺序执行生成步骤"""
+        step_results = {}
+        for key, module_key, method_name, filename, _ in steps:
+            step_results[key] = self._run_module_step(
+                config, module_key, method_name, os.path.join(output_dir, filename),
+                register_model if key in REGISTER_MODEL_STEPS else None, profile_key=key
+            )
+        return step_results
+    
+    def _run_steps_concurrently(self, config, output_dir, steps, workers, executor, register_model=None):
+        """使用线程池或进程池并发执行生成步骤
+        
+        配置快照不可变，各线程共享同一份快照而无需加锁或复制
+        """
+        if executor not in EXECUTOR_TYPES:
+            raise ValueError(f"未知的执行器类型: {executor}")
+        
+        # 并发执行器依赖multiprocessing，导入开销较大，仅在需要时导入
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+        
+        pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        workers = min(workers, len(steps))
+        step_results = {}
+        
+        # 工作线程和工作进程中记录的阶段挂在当前阶段之下
+        profile_parent = PROFILER.current_path()
+        profile = PROFILER.trace_memory if PROFILER.enabled else None
+        
+        with pool_class(max_workers=workers) as pool:
+            futures = {}
+            for key, module_key, method_name, filename, _ in steps:
+                output_file = os.path.join(output_dir, filename)
+                if executor == "process":
+                    future = pool.submit(_run_generation_step, module_key, method_name,
+                                         config, output_file, self.deterministic, profile)
+                else:
+                    future = pool.submit(self._run_module_step, config, module_key, method_name, output_file,
+                                         register_model if key in REGISTER_MODEL_STEPS else None,
+                                         key, profile_parent)
+                futures[key] = (future, output_file)
+            
+            for key, (future, output_file) in futures.items():
+                try:
+                    result = future.result()
+                    if executor == "process" and profile is not None:
+                        result, records = result
+                        step_path = f"{profile_parent};{key}" if profile_parent else key
+                        PROFILER.merge(records, parent=step_path)
+                    step_results[key] = result
+                except Exception as e:
+                    print(f"❌ 生成步骤 {key} 执行失败: {str(e)}")
+                    step_results[key] = GenerationResult.failure(output_file, e)
+        
+        return step_results
+    
+    def _run_module_step(self, config, module_key, method_name, output_file, register_model=None,
+                         profile_key=None, profile_parent=None):
+        """使用当前实例的生成模块执行单个生成步骤
+        
+        Args:
+            profile_key: 剖析阶段名称（生成步骤键）
+            profile_parent: 在工作线程中执行时的父阶段路径
+        """
+        with profile_phase(profile_key or module_key, profile_parent):
+            method = getattr(self.modules[module_key], method_name)
+            if register_model is not None:
+                result = method(config, output_file, register_model=register_model)
+            else:
+                result = method(config, output_file)
+            return _as_result(result, output_file)
+    
+    def _render_include_script(self):
+        """渲染简单的包含脚本"""
+        return """
 // 设备伪装模块包含文件
 // 由PCIe设备伪装工具自动生成
 
@@ -241,20 +1045,26 @@ class PCIeSpoofTool:
 // 注意: 将这些文件复制到您的PCILeech项目相应目录中
 // 然后在主模块中包含此文件: `include "device_spoof_includes.sv"
 """
+    
+    @profiled("includes")
+    def _generate_include_script(self, output_dir):
+        """生成简单的包含脚本"""
+        output_file = os.path.join(output_dir, INCLUDES_FILENAME)
+        start = time.perf_counter()
         try:
-            with open(os.path.join(output_dir, "device_spoof_includes.sv"), 'w') as f:
-                f.write(include_content)
-            return True
-        except Exception:
-            return False
+            return write_generated_artifact(output_file, self._render_include_script(), start)
+        except Exception as e:
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
     
-    def _generate_readme(self, output_dir):
-        """生成README文件"""
-        device_name = self.device_config.get("name", "自定义设备")
-        vendor_id = self.device_config.get("vendor_id", "FFFF")
-        device_id = self.device_config.get("device_id", "FFFF")
+    def _render_readme(self, config=None):
+        """渲染README文件"""
+        if config is None:
+            config = self.device_config
+        device_name = config.get("name", "自定义设备")
+        vendor_id = config.get("vendor_id", "FFFF")
+        device_id = config.get("device_id", "FFFF")
         
-        readme_content = f"""# {device_name} 伪装实现
+        return f"""# {device_name} 伪装实现
 
 此目录包含由PCIe设备伪装工具自动生成的文件，用于实现{device_name}的完全伪装。
 
@@ -263,17 +1073,20 @@ class PCIeSpoofTool:
 - 设备名称: {device_name}
 - 厂商ID (Vendor ID): 0x{vendor_id}
 - 设备ID (Device ID): 0x{device_id}
-- 设备类型: {DEVICE_TYPES.get(self.device_config.get("type", "custom"), "自定义设备")}
+- 设备类型: {DEVICE_TYPES.get(config.get("type", "custom"), "自定义设备")}
 
 ## 文件说明
 
 - `pcileech_cfgspace.coe`: PCIe配置空间初始化文件
 - `pcileech_cfgspace_writemask.coe`: 配置空间写入掩码文件
 - `bar_controller.sv`: BAR空间控制器实现
+- `bar_const_rom.coe`: BAR只读常量寄存器ROM初始化文件 (配置bar_ro_storage为rom时使用)
 - `device_behavior.sv`: 设备行为模拟代码
 - `register_map.sv`: 寄存器映射实现
 - `interrupt_handler.sv`: 中断处理器实现
 - `test_device.py`: 设备测试脚本
+- `register_pkg.sv`、`register_map.h`、`register_map.py`、`register_map.json`: 寄存器定义的SystemVerilog包、
+  C头文件、Python常量和JSON描述，与`register_map.sv`使用相同的名称 (配置register_exports可选择导出格式)
 - `device_spoof_includes.sv`: 包含文件
 
 ## 使用说明
@@ -287,14 +1100,248 @@ class PCIeSpoofTool:
 ## 自动生成说明
 
 此实现由PCIe设备伪装工具自动生成。
-生成时间: {__import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+生成时间: {generation_timestamp(self.deterministic, VERSION)}
 """
+    
+    @profiled("readme")
+    def _generate_readme(self, output_dir, config=None):
+        """生成README文件"""
+        output_file = os.path.join(output_dir, README_FILENAME)
+        start = time.perf_counter()
         try:
-            with open(os.path.join(output_dir, "README.md"), 'w', encoding='utf-8') as f:
-                f.write(readme_content)
-            return True
-        except Exception:
-            return False
+            return write_generated_artifact(output_file, self._render_readme(config), start)
+        except Exception as e:
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
+
+# 批量生成时每个工作进程内复用的工具实例和产物缓存
+_batch_tool = None
+_batch_cache = None
+
+def _collect_config_paths(sources):
+    """将目录或通配符展开为配置文件路径列表"""
+    config_paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = glob.glob(os.path.join(source, "*.json"))
+        else:
+            matches = glob.glob(source)
+        for path in sorted(matches):
+            if path not in config_paths:
+                config_paths.append(path)
+    return config_paths
+
+def _assign_output_dirs(config_paths, output_root):
+    """为每个配置文件分配独立的输出目录，避免同名配置互相覆盖"""
+    output_dirs = []
+    used_names = set()
+    for path in config_paths:
+        stem = Path(path).stem
+        name = stem
+        index = 2
+        while name in used_names:
+            name = f"{stem}_{index}"
+            index += 1
+        used_names.add(name)
+        output_dirs.append(os.path.join(output_root, name))
+    return output_dirs
+
+def _run_batch_job(config_path, output_dir, deterministic=False, cache_dir=None,
+                   cache_size=DEFAULT_MAX_BYTES):
+    """在工作进程中生成单个配置的所有文件
+    
+    工作进程首次执行任务时创建工具实例，之后的任务复用已构造的生成模块
+    
+    Returns:
+        单个配置的生成结果字典
+    """
+    global _batch_tool, _batch_cache
+    if _batch_tool is None:
+        _batch_tool = PCIeSpoofTool()
+    tool = _batch_tool
+    tool.set_deterministic(deterministic)
+    if cache_dir:
+        if _batch_cache is None or _batch_cache.cache_dir != cache_dir:
+            _batch_cache = ArtifactCache(cache_dir, cache_size)
+        tool.set_cache(_batch_cache)
+    hits_before = _batch_cache.hits if cache_dir else 0
+    misses_before = _batch_cache.misses if cache_dir else 0
+    
+    start = time.perf_counter()
+    report = None
+    errors = []
+    try:
+        # 详细输出由结构化报告代替，丢弃工具的逐行打印
+        with redirect_stdout(io.StringIO()):
+            success = tool.load_config(config_path) and tool.generate_all(output_dir)
+        report = tool.last_report if success else None
+        if tool.last_error:
+            errors.append(tool.last_error)
+    except Exception as e:
+        success = False
+        errors.append(str(e))
+    
+    if report is not None:
+        errors.extend(f"{result.label}: {result.error}" for result in report if not result.success)
+    
+    return {
+        "config": config_path,
+        "output_dir": output_dir,
+        "success": bool(success) and not errors,
+        "time": time.perf_counter() - start,
+        "failed_artifacts": report.failed if report is not None else [],
+        "errors": errors,
+        "cache_hits": (_batch_cache.hits - hits_before) if cache_dir else 0,
+        "cache_misses": (_batch_cache.misses - misses_before) if cache_dir else 0,
+        "report": report.to_dict() if report is not None else None
+    }
+
+def generate_batch(sources, output_root, workers=0, deterministic=False, cache_dir=None,
+                   cache_size=DEFAULT_MAX_BYTES, fsync=False):
+    """批量生成多个配置文件的伪装文件
+    
+    Args:
+        sources: 配置目录或通配符列表
+        output_root: 输出根目录，每个配置生成到以配置文件名命名的子目录
+        workers: 工作进程数，0表示使用全部CPU核心，1表示在当前进程顺序执行
+        deterministic: 是否生成可复现的输出
+        cache_dir: 产物缓存目录，设置后启用缓存（并启用可复现模式）
+        cache_size: 产物缓存容量上限（字节）
+        fsync: 全部配置生成完成后将本批写入的产物及其目录同步到磁盘
+        
+    Returns:
+        可序列化为JSON的批量生成汇总字典
+    """
+    config_paths = _collect_config_paths(sources)
+    output_dirs = _assign_output_dirs(config_paths, output_root)
+    os.makedirs(output_root, exist_ok=True)
+    
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(config_paths)))
+    
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_run_batch_job(path, out, deterministic, cache_dir, cache_size)
+                   for path, out in zip(config_paths, output_dirs)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_batch_job, path, out, deterministic, cache_dir, cache_size)
+                       for path, out in zip(config_paths, output_dirs)]
+            results = []
+            for path, out, future in zip(config_paths, output_dirs, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({
+                        "config": path,
+                        "output_dir": out,
+                        "success": False,
+                        "time": 0.0,
+                        "failed_artifacts": [],
+                        "errors": [f"❌ 工作进程异常: {str(e)}"],
+                        "cache_hits": 0,
+                        "cache_misses": 0,
+                        "report": None
+                    })
+    
+    if fsync:
+        sync_artifacts([artifact["path"] for result in results if result["report"]
+                        for artifact in result["report"]["artifacts"].values()])
+    
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "version": VERSION,
+        "output_root": output_root,
+        "workers": workers,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "total_time": time.perf_counter() - start,
+        "cache": {
+            "cache_dir": cache_dir,
+            "hits": sum(result["cache_hits"] for result in results),
+            "misses": sum(result["cache_misses"] for result in results)
+        } if cache_dir else None,
+        "results": results
+    }
+
+def _regenerate(tool, config_path, output_dir, check=True):
+    """重新加载配置并增量生成，生成过程的输出只在失败时打印
+    
+    Returns:
+        是否成功
+    """
+    start = time.perf_counter()
+    log = io.StringIO()
+    with redirect_stdout(log):
+        generated = tool.load_config(config_path) and tool.generate_all(output_dir, incremental=True, check=check)
+    elapsed = (time.perf_counter() - start) * 1000
+    stamp = time.strftime("%H:%M:%S")
+    name = os.path.basename(config_path)
+    if not generated or not tool.last_report.success:
+        print(log.getvalue().rstrip())
+        print(f"[{stamp}] ❌ {name}: 重新生成失败，耗时 {elapsed:.0f} ms")
+        return False
+    updated = [os.path.basename(result.path) for result in tool.last_report if result.changed]
+    if updated:
+        print(f"[{stamp}] ✅ {name}: 更新了{len(updated)}个产物 ({', '.join(updated)})，耗时 {elapsed:.0f} ms")
+    else:
+        print(f"[{stamp}] ✅ {name}: 产物没有变化，耗时 {elapsed:.0f} ms")
+    return True
+
+def watch_configs(config_paths, output_dir, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE,
+                  use_watchdog=True, deterministic=False, check=True):
+    """监视配置文件，保存后增量重新生成输入发生变化的产物，直到按Ctrl+C
+    
+    每个配置文件使用常驻的工具实例，生成模块只导入和构造一次；
+    监视多个配置文件时，各配置的产物输出到output_dir下与配置文件同名的子目录，
+    不同目录中的同名配置依次加上_2、_3等后缀
+    
+    Args:
+        config_paths: 配置文件路径列表
+        output_dir: 输出目录
+        interval: 轮询间隔（秒）
+        debounce: 最后一次保存后等待的静默时间（秒）
+        use_watchdog: 安装了watchdog时使用文件系统通知
+        deterministic: 生成可复现的输出
+        check: 对重新生成的RTL进行结构检查
+    """
+    config_paths = list(dict.fromkeys(os.path.abspath(config_path) for config_path in config_paths))
+    if len(config_paths) > 1:
+        # 与批量生成相同，不同目录中的同名配置分配到不同的子目录
+        target_dirs = _assign_output_dirs(config_paths, output_dir)
+    else:
+        target_dirs = [output_dir]
+    targets = {}
+    for config_path, target_dir in zip(config_paths, target_dirs):
+        targets[config_path] = (PCIeSpoofTool(deterministic=deterministic), target_dir)
+    
+    # 启动时先完成一次增量生成
+    for config_path, (tool, target_dir) in targets.items():
+        _regenerate(tool, config_path, target_dir, check)
+    
+    from config_watcher import ConfigWatcher
+    
+    with ConfigWatcher(list(targets), interval=interval, debounce=debounce, use_watchdog=use_watchdog) as watcher:
+        mode = "文件系统通知" if watcher.mode == "watchdog" else f"每{interval * 1000:.0f} ms轮询"
+        print(f"正在监视{len(targets)}个配置文件 ({mode})，按Ctrl+C停止")
+        try:
+            while True:
+                for config_path in watcher.wait():
+                    tool, target_dir = targets[config_path]
+                    _regenerate(tool, config_path, target_dir, check)
+        except KeyboardInterrupt:
+            print("\n已停止监视")
+
+def _export_formats_argument(value):
+    """命令行参数中的寄存器定义导出格式"""
+    from register_exporter import parse_export_formats
+    
+    try:
+        return parse_export_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 def main():
     """主函数"""
@@ -323,6 +1370,136 @@ def main():
                            help="输出目录路径")
     gen_parser.add_argument("--preset", "-p", choices=PRESET_DEVICES.keys(),
                           help="使用预设设备")
+    gen_parser.add_argument("--jobs", "-j", type=int, default=1,
+                           help="并发生成的工作数 (1为顺序执行, 0为使用全部CPU核心)")
+    gen_parser.add_argument("--executor", choices=EXECUTOR_TYPES, default="process",
+                           help="并发执行器类型")
+    gen_parser.add_argument("--incremental", "-i", action="store_true",
+                           help="增量生成，跳过输入未变化的文件")
+    gen_parser.add_argument("--deterministic", "-d", action="store_true",
+                           help="生成可复现的输出，不嵌入当前时间")
+    gen_parser.add_argument("--cache-dir", help="产物缓存目录 (启用缓存并自动启用可复现输出)")
+    gen_parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                           help="产物缓存容量上限 (MB)")
+    gen_parser.add_argument("--bar-decode", choices=BAR_DECODE_STYLES,
+                           help="BAR控制器的寄存器地址译码结构，覆盖配置中的bar_decode "
+                                "(chain为优先级if/else链, case为并行case, banked为分组的两级case)")
+    gen_parser.add_argument("--bar-ro-storage", choices=BAR_RO_STORAGE_MODES,
+                           help="BAR控制器中只读常量寄存器的存放方式，覆盖配置中的bar_ro_storage "
+                                "(logic为译码逻辑中的常量, rom为bar_const_rom.coe初始化的ROM)")
+    gen_parser.add_argument("--register-exports", type=_export_formats_argument, metavar="FORMATS",
+                           help=f"导出的寄存器定义格式，逗号分隔 ({', '.join(REGISTER_EXPORT_FORMATS)}), all或none，"
+                                "覆盖配置中的register_exports (默认全部导出)")
+    gen_parser.add_argument("--report", "-r", help="将生成结果报告保存为JSON文件")
+    gen_parser.add_argument("--bundle", "-b",
+                           help=f"将所有产物直接写入归档而不是输出目录 ({', '.join(BUNDLE_FORMATS)})")
+    gen_parser.add_argument("--fsync", action="store_true",
+                           help="生成完成后将本次写入的产物及其目录同步到磁盘")
+    gen_parser.add_argument("--no-check", action="store_true",
+                           help="不对生成的RTL进行结构检查")
+    gen_parser.add_argument("--profile", help="剖析各阶段耗时和内存，并将结果保存到指定文件")
+    gen_parser.add_argument("--profile-format", choices=PROFILE_FORMATS,
+                            help="剖析报告格式 (默认根据扩展名判断，.folded/.txt为火焰图折叠栈格式)")
+    gen_parser.add_argument("--profile-no-memory", action="store_true",
+                            help="剖析时不记录峰值内存 (tracemalloc会明显拖慢生成)")
+    
+    # 批量生成命令
+    batch_parser = subparsers.add_parser("generate-batch", help="批量生成多个配置的伪装文件")
+    batch_parser.add_argument("sources", nargs="+", help="配置文件目录或通配符 (如 configs/*.json)")
+    batch_parser.add_argument("--output-root", "-o", default="./spoof_batch_output",
+                             help="输出根目录")
+    batch_parser.add_argument("--jobs", "-j", type=int, default=0,
+                             help="工作进程数 (0为使用全部CPU核心)")
+    batch_parser.add_argument("--summary", "-s",
+                             help="JSON汇总文件路径 (默认为输出根目录下的batch_summary.json)")
+    batch_parser.add_argument("--deterministic", "-d", action="store_true",
+                             help="生成可复现的输出，不嵌入当前时间")
+    batch_parser.add_argument("--cache-dir", help="产物缓存目录 (启用缓存并自动启用可复现输出)")
+    batch_parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                             help="产物缓存容量上限 (MB)")
+    batch_parser.add_argument("--fsync", action="store_true",
+                             help="全部配置生成完成后将本批写入的产物及其目录同步到磁盘")
+    
+    # 预览命令
+    preview_parser = subparsers.add_parser("preview", help="在内存中渲染产物并输出到标准输出，不写入文件")
+    preview_parser.add_argument("--config", "-c", help="配置文件路径")
+    preview_parser.add_argument("--preset", "-p", choices=PRESET_DEVICES.keys(),
+                               help="使用预设设备")
+    preview_parser.add_argument("--artifact", "-a", action="append", choices=ARTIFACT_KEYS,
+                               help="要预览的产物 (可重复指定，默认全部)")
+    preview_parser.add_argument("--deterministic", "-d", action="store_true",
+                               help="生成可复现的输出，不嵌入当前时间")
+    preview_parser.add_argument("--bar-decode", choices=BAR_DECODE_STYLES,
+                               help="BAR控制器的寄存器地址译码结构，覆盖配置中的bar_decode")
+    preview_parser.add_argument("--bar-ro-storage", choices=BAR_RO_STORAGE_MODES,
+                               help="BAR控制器中只读常量寄存器的存放方式，覆盖配置中的bar_ro_storage")
+    
+    # 结构检查命令
+    check_parser = subparsers.add_parser("check", help="检查SystemVerilog文件的结构 (块配对、声明、宏和标识符)")
+    check_parser.add_argument("paths", nargs="+",
+                              help="SystemVerilog文件或目录 (目录中的*.sv按包含文件的顺序作为同一编译单元检查)")
+    
+    # 资源估算命令
+    estimate_parser = subparsers.add_parser("estimate", help="估算生成的RTL占用的FPGA资源和时序，不运行综合")
+    estimate_parser.add_argument("--config", "-c", help="配置文件路径")
+    estimate_parser.add_argument("--preset", "-p", choices=PRESET_DEVICES.keys(),
+                                help="使用预设设备")
+    estimate_parser.add_argument("--bar-decode", choices=BAR_DECODE_STYLES,
+                                help="BAR控制器的寄存器地址译码结构，覆盖配置中的bar_decode")
+    estimate_parser.add_argument("--bar-ro-storage", choices=BAR_RO_STORAGE_MODES,
+                                help="BAR控制器中只读常量寄存器的存放方式，覆盖配置中的bar_ro_storage")
+    estimate_parser.add_argument("--dma", action="store_true",
+                                help="包含DMA控制器 (配置中已启用DMA时总是包含)")
+    estimate_parser.add_argument("--device", choices=FPGA_DEVICE_NAMES, default="xc7a35t",
+                                help="计算资源占用比例的FPGA器件 (默认xc7a35t)")
+    estimate_parser.add_argument("--clock", type=float, default=DEFAULT_CLOCK_MHZ,
+                                help=f"目标时钟频率MHz (默认{DEFAULT_CLOCK_MHZ:g})")
+    estimate_parser.add_argument("--json", help="将估算结果保存为JSON文件")
+    
+    # 寄存器地址分配命令
+    allocate_parser = subparsers.add_parser("allocate", help="为未指定地址的寄存器自动分配紧凑的BAR地址")
+    allocate_parser.add_argument("--config", "-c", help="配置文件路径")
+    allocate_parser.add_argument("--preset", "-p", choices=PRESET_DEVICES.keys(),
+                                help="使用预设设备")
+    allocate_parser.add_argument("--output", "-o", help="输出配置文件路径 (默认写回--config指定的文件)")
+    allocate_parser.add_argument("--relocate", action="store_true",
+                                help="重新排列所有未标记fixed的寄存器，使地址跨度和译码位数最小")
+    allocate_parser.add_argument("--no-reserve-base", action="store_true",
+                                help="允许使用基本寄存器(0x0000-0x000F)占用的地址")
+    allocate_parser.add_argument("--start", type=lambda value: int(value, 0), default=0,
+                                help="分配的起始地址 (默认0)")
+    allocate_parser.add_argument("--align", type=int, default=DEFAULT_ALIGNMENT,
+                                help=f"默认对齐字节数 (默认{DEFAULT_ALIGNMENT})")
+    
+    # 寄存器规格导入命令
+    import_parser = subparsers.add_parser("import", help="从CSV、IP-XACT或SystemRDL寄存器规格导入设备寄存器")
+    import_parser.add_argument("spec", help="寄存器规格文件路径")
+    import_parser.add_argument("--config", "-c", help="导入到的配置文件路径")
+    import_parser.add_argument("--preset", "-p", choices=PRESET_DEVICES.keys(),
+                              help="导入到预设设备")
+    import_parser.add_argument("--type", "-t", choices=DEVICE_TYPES.keys(), default="custom",
+                              help="未指定配置和预设时新建的设备类型")
+    import_parser.add_argument("--output", "-o", help="输出配置文件路径 (默认写回--config指定的文件)")
+    import_parser.add_argument("--format", "-f", choices=SPEC_FORMAT_NAMES,
+                              help="规格格式 (默认根据扩展名判断)")
+    import_parser.add_argument("--replace", action="store_true", help="替换现有的设备寄存器，而不是追加")
+    import_parser.add_argument("--allocate", action="store_true", help="导入后为没有地址的寄存器自动分配地址")
+    
+    # 监视配置文件命令
+    watch_parser = subparsers.add_parser("watch", help="监视配置文件，保存后增量重新生成变化的产物")
+    watch_parser.add_argument("config_files", nargs="+", help="配置文件路径 (可指定多个)")
+    watch_parser.add_argument("--output-dir", "-o", default="./spoof_output",
+                             help="输出目录 (多个配置文件时输出到与配置文件同名的子目录)")
+    watch_parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                             help=f"轮询间隔秒数 (默认{DEFAULT_POLL_INTERVAL:g})")
+    watch_parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                             help=f"最后一次保存后等待的秒数，合并连续的保存 (默认{DEFAULT_DEBOUNCE:g})")
+    watch_parser.add_argument("--polling", action="store_true",
+                             help="即使安装了watchdog也使用轮询")
+    watch_parser.add_argument("--deterministic", "-d", action="store_true",
+                             help="生成可复现的输出，不嵌入当前时间")
+    watch_parser.add_argument("--no-check", action="store_true",
+                             help="不对生成的RTL进行结构检查")
     
     # 列出预设设备命令
     list_parser = subparsers.add_parser("list", help="列出可用的预设设备")
@@ -330,8 +1507,35 @@ def main():
     # 解析命令行参数
     args = parser.parse_args()
     
+    # 批量生成在工作进程内创建各自的工具实例
+    if args.command == "generate-batch":
+        summary = generate_batch(args.sources, args.output_root, args.jobs, args.deterministic,
+                                 args.cache_dir, args.cache_size * 1024 * 1024, args.fsync)
+        if summary["total"] == 0:
+            print("错误: 未找到任何配置文件")
+            return 1
+        
+        summary_path = args.summary or os.path.join(args.output_root, "batch_summary.json")
+        with atomic_open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        
+        for result in summary["results"]:
+            status = '✅' if result["success"] else '❌'
+            print(f"{status} {result['config']} ({result['time'] * 1000:.1f} ms)")
+            for error in result["errors"]:
+                print(f"    {error}")
+        print(f"\n成功: {summary['succeeded']}/{summary['total']}, "
+              f"总耗时: {summary['total_time']:.2f} s, 工作进程数: {summary['workers']}")
+        if summary["cache"]:
+            print(f"缓存: 命中 {summary['cache']['hits']}, 未命中 {summary['cache']['misses']}")
+        print(f"汇总已保存到: {summary_path}")
+        return 0 if summary["failed"] == 0 else 1
+    
     # 创建工具实例
-    tool = PCIeSpoofTool()
+    tool = PCIeSpoofTool(deterministic=getattr(args, "deterministic", False))
+    
+    if getattr(args, "cache_dir", None):
+        tool.set_cache(ArtifactCache(args.cache_dir, args.cache_size * 1024 * 1024))
     
     # 根据命令执行相应操作
     if args.command == "create":
@@ -345,6 +1549,9 @@ def main():
             print(f"已加载设备: {tool.device_config.get('name', '未命名设备')}")
             
     elif args.command == "generate":
+        if args.profile:
+            PROFILER.enable(trace_memory=not args.profile_no_memory)
+        
         # 生成文件
         if args.config:
             # 从文件加载配置
@@ -357,9 +1564,170 @@ def main():
         else:
             print("错误: 需要提供配置文件(--config)或使用预设设备(--preset)")
             return 1
+        if args.bar_decode:
+            tool.device_config["bar_decode"] = args.bar_decode
+        if args.bar_ro_storage:
+            tool.device_config["bar_ro_storage"] = args.bar_ro_storage
+        if args.register_exports is not None:
+            tool.device_config["register_exports"] = list(args.register_exports)
             
         # 生成所有文件
-        tool.generate_all(args.output_dir)
+        if args.bundle:
+            generated = tool.export_bundle(args.bundle, fsync=args.fsync, check=not args.no_check)
+        else:
+            generated = tool.generate_all(args.output_dir, workers=args.jobs, executor=args.executor,
+                                          incremental=args.incremental, fsync=args.fsync,
+                                          check=not args.no_check)
+        if args.profile:
+            PROFILER.disable()
+            PROFILER.save(args.profile, args.profile_format)
+            print(f"剖析报告已保存到: {args.profile}")
+        if not generated:
+            return 1
+        if args.report:
+            tool.last_report.save(args.report)
+            print(f"生成报告已保存到: {args.report}")
+        if not tool.last_report.success:
+            return 1
+        
+    elif args.command == "preview":
+        # 状态信息输出到标准错误，标准输出只包含产物内容
+        with redirect_stdout(sys.stderr):
+            if args.config:
+                loaded = tool.load_config(args.config)
+            elif args.preset:
+                loaded = tool.create_new_config("custom", args.preset)
+            else:
+                print("错误: 需要提供配置文件(--config)或使用预设设备(--preset)")
+                return 1
+        if not loaded:
+            return 1
+        if args.bar_decode:
+            tool.device_config["bar_decode"] = args.bar_decode
+        if args.bar_ro_storage:
+            tool.device_config["bar_ro_storage"] = args.bar_ro_storage
+        try:
+            artifacts = tool.render_all(only=args.artifact)
+        except RuntimeError as e:
+            print(f"❌ {str(e)}", file=sys.stderr)
+            return 1
+        for filename, content in artifacts.items():
+            if len(artifacts) > 1:
+                print(f"// ===== {filename} =====")
+            print(content)
+        
+    elif args.command == "check":
+        # 每个目录是一个独立的编译单元，直接给出的文件共同组成一个编译单元
+        units = []
+        files = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                units.append(sorted(glob.glob(os.path.join(path, "*.sv")), key=_include_order))
+            else:
+                files.append(path)
+        units.append(files)
+        units = [paths for paths in units if paths]
+        if not units:
+            print("错误: 未找到任何SystemVerilog文件")
+            return 1
+        from sv_checker import check_sv_files
+        
+        results = {}
+        try:
+            for paths in units:
+                results.update(check_sv_files(paths))
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ 读取文件失败: {str(e)}")
+            return 1
+        total = 0
+        for path, issues in results.items():
+            print(f"{'✅' if not issues else '❌'} {path}")
+            for issue in issues:
+                print(f"    {issue.line}: {issue.message}")
+            total += len(issues)
+        print(f"\n检查了{len(results)}个文件，发现{total}个问题")
+        if total:
+            return 1
+        
+    elif args.command == "estimate":
+        if args.config:
+            loaded = tool.load_config(args.config)
+        elif args.preset:
+            loaded = tool.create_new_config("custom", args.preset)
+        else:
+            print("错误: 需要提供配置文件(--config)或使用预设设备(--preset)")
+            return 1
+        if not loaded:
+            return 1
+        if args.bar_decode:
+            tool.device_config["bar_decode"] = args.bar_decode
+        if args.bar_ro_storage:
+            tool.device_config["bar_ro_storage"] = args.bar_ro_storage
+        try:
+            estimate = tool.estimate_resources(include_dma=args.dma, clock_mhz=args.clock)
+        except RuntimeError as e:
+            print(f"❌ {str(e)}")
+            return 1
+        print("\n========= 资源估算 =========")
+        for line in estimate.summary_lines(args.device):
+            print(line)
+        print("============================\n")
+        if args.json:
+            estimate.save(args.json, args.device)
+            print(f"估算结果已保存到: {args.json}")
+        
+    elif args.command == "allocate":
+        if args.config:
+            loaded = tool.load_config(args.config)
+        elif args.preset:
+            loaded = tool.create_new_config("custom", args.preset)
+        else:
+            print("错误: 需要提供配置文件(--config)或使用预设设备(--preset)")
+            return 1
+        if not loaded:
+            return 1
+        try:
+            result = tool.allocate_addresses(relocate=args.relocate, reserve_base=not args.no_reserve_base,
+                                             start=args.start, alignment=args.align)
+        except ValueError as e:
+            print(f"❌ 分配寄存器地址失败: {str(e)}")
+            return 1
+        for line in result.summary_lines():
+            print(line)
+        if not tool.save_config(args.output or args.config):
+            return 1
+        
+    elif args.command == "import":
+        if args.config:
+            if not tool.load_config(args.config):
+                return 1
+        else:
+            tool.create_new_config(args.type, args.preset)
+        try:
+            start = time.perf_counter()
+            count = tool.import_register_spec(args.spec, args.format, replace=args.replace)
+            print(f"✅ 从{args.spec}导入了{count}个寄存器，耗时{time.perf_counter() - start:.2f}秒")
+            if args.allocate:
+                for line in tool.allocate_addresses().summary_lines():
+                    print(line)
+        except (OSError, ValueError) as e:
+            print(f"❌ 导入寄存器规格失败: {str(e)}")
+            return 1
+        try:
+            tool._check_register_conflicts(tool.device_config)
+        except ValueError as e:
+            # 仍然保存导入结果，便于在编辑器中修正
+            print(f"⚠️ {str(e)}")
+        if not tool.save_config(args.output or args.config):
+            return 1
+        
+    elif args.command == "watch":
+        missing = [path for path in args.config_files if not os.path.isfile(path)]
+        if missing:
+            print(f"错误: 配置文件不存在: {', '.join(missing)}")
+            return 1
+        watch_configs(args.config_files, args.output_dir, interval=args.interval, debounce=args.debounce,
+                      use_watchdog=not args.polling, deterministic=args.deterministic, check=not args.no_check)
         
     elif args.command == "list":
         # 列出预设设备
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能剖析模块
+记录生成流程各阶段（配置加载、模板渲染、文件写入等）的墙钟时间、CPU时间、
+峰值内存和写入字节数，输出为JSON报告或火焰图折叠栈格式
+
+剖析器默认关闭，关闭时各埋点只做一次属性判断，可以保留在正式版本中
+"""
+
+import json
+import time
+import threading
+import functools
+
+# 线程CPU时间（Python 3.7+），旧版本退化为进程CPU时间
+_thread_time = getattr(time, "thread_time", time.process_time)
+
+# 支持的报告格式
+PROFILE_FORMATS = ("json", "folded")
+
+class _NullPhase:
+    """剖析关闭时使用的空上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class _Frame:
+    """正在执行的阶段"""
+
+    __slots__ = ("path", "wall", "cpu", "mark_wall", "mark_cpu", "peak", "bytes", "child_wall")
+
+    def __init__(self, path):
+        self.path = path
+        self.wall = self.mark_wall = time.perf_counter()
+        self.cpu = self.mark_cpu = _thread_time()
+        self.peak = 0
+        self.bytes = 0
+        self.child_wall = 0.0
+
+class _Phase:
+    """剖析开启时的阶段上下文"""
+
+    __slots__ = ("profiler", "name", "parent")
+
+    def __init__(self, profiler, name, parent):
+        self.profiler = profiler
+        self.name = name
+        self.parent = parent
+
+    def __enter__(self):
+        self.profiler._push(self.name, self.parent)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._pop()
+        return False
+
+class Profiler:
+    """生成流程剖析器
+
+    阶段可以嵌套，路径以分号连接（例如generate_all;bar;render）。
+    每个线程维护独立的阶段栈，同一路径的多次调用在报告中合并
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self._started_tracemalloc = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._records = {}
+
+    def enable(self, trace_memory=True):
+        """开启剖析
+
+        Args:
+            trace_memory: 是否使用tracemalloc记录峰值内存（会明显降低执行速度）
+        """
+        self.reset()
+        # 以fork方式启动的工作进程会继承父进程的阶段栈，重新开启时一并清空
+        self._local = threading.local()
+        self.trace_memory = trace_memory
+        if trace_memory:
+            # tracemalloc只在记录峰值内存时需要，导入开销较大，不在模块加载时导入
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self):
+        """关闭剖析，保留已记录的数据"""
+        self.enabled = False
+        if self._started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self):
+        """清空已记录的数据"""
+        with self._lock:
+            self._records = {}
+
+    def phase(self, name, parent=None):
+        """返回阶段上下文管理器
+
+        Args:
+            name: 阶段名称
+            parent: 当前线程没有进行中的阶段时使用的父路径（用于工作线程）
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name, parent)
+
+    def current_path(self):
+        """当前线程正在执行的阶段路径，没有时返回None"""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1].path if stack else None
+
+    def checkpoint(self, name):
+        """将当前阶段自开始（或上一个检查点）以来的部分记录为子阶段
+
+        用于无法用with包裹的代码段，例如生成方法中写入文件之前的模板渲染
+        """
+        if not self.enabled:
+            return
+        stack = getattr(self._local, "stack", None)
+        if not stack:
+            return
+        frame = stack[-1]
+        now, cpu = time.perf_counter(), _thread_time()
+        peak = self._take_peak(frame)
+        wall = now - frame.mark_wall
+        self._record(f"{frame.path};{name}", wall, cpu - frame.mark_cpu, peak, 0)
+        frame.child_wall += wall
+        frame.mark_wall, frame.mark_cpu = now, cpu
+
+    def add_bytes(self, count):
+        """记录当前阶段写入的字节数"""
+        if not self.enabled:
+            return
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            stack[-1].bytes += count
+
+    def merge(self, records, parent=None):
+        """合并其他进程中记录的数据
+
+        Args:
+            records: 另一个剖析器的records()结果
+            parent: 附加在各路径前的父路径
+        """
+        with self._lock:
+            for path, record in records.items():
+                full_path = f"{parent};{path}" if parent else path
+                self._merge_record(full_path, record)
+
+    def records(self):
+        """返回按路径汇总的记录副本"""
+        with self._lock:
+            return {path: dict(record) for path, record in self._records.items()}
+
+    def _push(self, name, parent):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if stack:
+            parent = stack[-1].path
+            # 子阶段开始前记录父阶段到目前为止的峰值
+            self._take_peak(stack[-1])
+        path = f"{parent};{name}" if parent else name
+        stack.append(_Frame(path))
+
+    def _pop(self):
+        frame = self._local.stack.pop()
+        wall = time.perf_counter() - frame.wall
+        cpu = _thread_time() - frame.cpu
+        peak = self._take_peak(frame)
+        self._record(frame.path, wall, cpu, peak, frame.bytes, frame.child_wall)
+        stack = self._local.stack
+        if stack:
+            parent = stack[-1]
+            parent.bytes += frame.bytes
+            parent.peak = max(parent.peak, peak)
+            parent.child_wall += wall
+
+    def _take_peak(self, frame):
+        """读取并重置tracemalloc峰值，返回该阶段至今的峰值内存"""
+        if not self.trace_memory:
+            return 0
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return 0
+        peak = tracemalloc.get_traced_memory()[1]
+        frame.peak = max(frame.peak, peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        return frame.peak
+
+    def _record(self, path, wall, cpu, peak, bytes_written, child_wall=0.0):
+        self._merge_record(path, {
+            "calls": 1,
+            "wall": wall,
+            "cpu": cpu,
+            "self_wall": max(0.0, wall - child_wall),
+            "peak_memory": peak,
+            "bytes": bytes_written
+        })
+
+    def _merge_record(self, path, record):
+        existing = self._records.get(path)
+        if existing is None:
+            self._records[path] = dict(record)
+            return
+        existing["calls"] += record["calls"]
+        existing["wall"] += record["wall"]
+        existing["cpu"] += record["cpu"]
+        existing["self_wall"] += record["self_wall"]
+        existing["bytes"] += record["bytes"]
+        existing["peak_memory"] = max(existing["peak_memory"], record["peak_memory"])
+
+    def report(self):
+        """生成可序列化为JSON的剖析报告
+
+        phases按阶段名称（路径最后一段）汇总，便于查看配置加载、渲染、写入等阶段的总开销
+        """
+        records = self.records()
+        phases = {}
+        for path, record in records.items():
+            name = path.rsplit(";", 1)[-1]
+            summary = phases.setdefault(name, {"calls": 0, "wall": 0.0, "cpu": 0.0,
+                                               "self_wall": 0.0, "peak_memory": 0, "bytes": 0})
+            summary["calls"] += record["calls"]
+            summary["self_wall"] += record["self_wall"]
+            summary["peak_memory"] = max(summary["peak_memory"], record["peak_memory"])
+            # 同名阶段嵌套时只累计最外层，避免重复计算
+            if not any(part == name for part in path.split(";")[:-1]):
+                summary["wall"] += record["wall"]
+                summary["cpu"] += record["cpu"]
+                summary["bytes"] += record["bytes"]
+        return {
+            "trace_memory": self.trace_memory,
+            "phases": phases,
+            "records": [dict(record, path=path) for path, record in sorted(records.items())]
+        }
+
+    def folded(self):
+        """生成火焰图折叠栈格式（每行"路径 自身耗时微秒"），可直接交给flamegraph.pl"""
+        lines = []
+        for path, record in sorted(self.records().items()):
+            micros = int(round(record["self_wall"] * 1e6))
+            if micros > 0:
+                lines.append(f"{path} {micros}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, path, fmt=None):
+        """保存剖析报告
+
+        Args:
+            path: 输出文件路径
+            fmt: json或folded，为None时根据扩展名判断（.folded/.txt为折叠栈格式）
+        """
+        if fmt is None:
+            fmt = "folded" if path.endswith((".folded", ".txt")) else "json"
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"未知的剖析报告格式: {fmt}")
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "folded":
+                f.write(self.folded())
+            else:
+                json.dump(self.report(), f, indent=2, ensure_ascii=False)
+
+# 全局剖析器，各模块的埋点都记录到这里
+PROFILER = Profiler()
+
+def profile_phase(name, parent=None):
+    """全局剖析器的阶段上下文，剖析关闭时返回共享的空上下文"""
+    if not PROFILER.enabled:
+        return _NULL_PHASE
+    return _Phase(PROFILER, name, parent)
+
+def profiled(name):
+    """将函数或方法整体记录为一个剖析阶段的装饰器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with _Phase(PROFILER, name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -8,6 +8,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from register_index import RegisterIndex, format_conflicts
+from bitfield_validator import validate_register_configs
+from address_allocator import allocate_register_addresses
+
 class RegisterEditor(ttk.Frame):
     """寄存器编辑器组件"""
     
@@ -65,6 +69,7 @@ class RegisterEditor(ttk.Frame):
         ttk.Button(btn_frame, text="删除", command=self.delete_register).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="上移", command=lambda: self.move_register(-1)).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="下移", command=lambda: self.move_register(1)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="分配地址", command=self.allocate_addresses).pack(side=tk.LEFT, padx=5)
         
         # 右侧编辑区域
         self.right_frame = ttk.Frame(self.paned)
@@ -273,7 +278,7 @@ class RegisterEditor(ttk.Frame):
         """添加新寄存器"""
         self.current_register = {
             'name': '新寄存器',
-            'address': '0x0',
+            'address': 'auto',
             'width': 32,
             'access': 'RW',
             'default': '0x0',
@@ -295,6 +300,33 @@ class RegisterEditor(ttk.Frame):
         if self.update_callback:
             self.update_callback(self.registers)
     
+    def allocate_addresses(self):
+        """为地址为auto的寄存器自动分配地址，或重新紧凑排列全部寄存器"""
+        if not self.registers:
+            return
+        relocate = messagebox.askyesnocancel(
+            "分配地址", "是否重新排列全部寄存器的地址？\n选择“否”只为地址为auto的寄存器分配地址"
+        )
+        if relocate is None:
+            return
+        
+        try:
+            result = allocate_register_addresses({"key_registers": self.registers}, relocate=relocate)
+        except ValueError as e:
+            messagebox.showerror("错误", f"分配地址失败: {str(e)}")
+            return
+        
+        # 刷新寄存器列表和当前表单
+        self.refresh_register_list()
+        if self.current_register is not None:
+            self.load_register_data(self.current_register)
+        
+        # 触发回调
+        if self.update_callback:
+            self.update_callback(self.registers)
+        
+        messagebox.showinfo("成功", "\n".join(result.summary_lines()))
+    
     def delete_register(self):
         """删除选中的寄存器"""
         selection = self.register_listbox.curselection()
@@ -402,7 +434,16 @@ class RegisterEditor(ttk.Frame):
         if self.update_callback:
             self.update_callback(self.registers)
         
-        messagebox.showinfo("成功", "寄存器保存成功")
+        # 一次报告全部地址重叠、重名的寄存器和位域错误，当前寄存器还报告未定义的保留位
+        conflicts = RegisterIndex().add_config(self.registers, "key").conflicts()
+        conflicts.extend(conflict for conflict in validate_register_configs(self.registers)
+                         if conflict.severity != "info")
+        conflicts.extend(conflict for conflict in validate_register_configs([self.current_register])
+                         if conflict.severity == "info")
+        if conflicts:
+            messagebox.showwarning("警告", f"寄存器已保存，但存在以下冲突:\n{format_conflicts(conflicts)}")
+        else:
+            messagebox.showinfo("成功", "寄存器保存成功")
     
     def add_bitfield(self):
         """添加位域"""
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+寄存器定义导出模块
+将寄存器模型导出为SystemVerilog包、C头文件、Python模块和JSON描述
+
+各格式的导出器都是逐个寄存器输出文本的状态机：RegisterMapper遍历一次寄存器模型，
+每个寄存器依次交给所有导出器，增加导出格式不会增加解析、排序和宏名称分配的次数。
+各格式使用与register_map.sv相同的宏名称，驱动、测试和RTL中的名称一一对应
+"""
+
+import json
+
+from register_model import create_macro_name, parse_constant
+
+# 导出格式: 格式名 -> (输出文件名, 显示名称)
+EXPORT_FORMATS = {
+    "sv_package": ("register_pkg.sv", "寄存器定义包"),
+    "c": ("register_map.h", "C头文件"),
+    "python": ("register_map.py", "Python寄存器常量"),
+    "json": ("register_map.json", "JSON寄存器描述")
+}
+
+def parse_export_formats(text):
+    """解析逗号分隔的导出格式列表，all表示全部格式，none表示不导出
+
+    Raises:
+        ValueError: 未知的导出格式
+    """
+    if isinstance(text, str):
+        names = [name.strip().lower() for name in text.split(",") if name.strip()]
+    else:
+        names = [str(name).strip().lower() for name in text or ()]
+    if names == ["all"]:
+        return tuple(EXPORT_FORMATS)
+    if names == ["none"]:
+        return ()
+    unknown = [name for name in names if name not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"未知的寄存器导出格式: {', '.join(unknown)}（可选: {', '.join(EXPORT_FORMATS)}, all, none）")
+    # 按EXPORT_FORMATS的顺序去重
+    return tuple(name for name in EXPORT_FORMATS if name in names)
+
+def _comment(text):
+    """单行注释中的描述文本"""
+    return " ".join(str(text).split())
+
+def _identifier(name, default):
+    """设备名称对应的ASCII标识符"""
+    identifier = create_macro_name(name) or default
+    return f"_{identifier}" if identifier[0].isdigit() else identifier
+
+class RegisterExporter:
+    """导出器基类
+
+    begin()、register()和end()各返回一段文本，由调用方按顺序写入输出文件
+    """
+
+    def __init__(self, info):
+        """初始化导出器
+
+        Args:
+            info: 设备信息，包含device_name、vendor_id、device_id、device_type、
+                  timestamp和generator_version
+        """
+        self.info = info
+
+    def begin(self):
+        """文件开头"""
+        return ""
+
+    def register(self, reg, macro, fields):
+        """一个寄存器的定义
+
+        Args:
+            reg: Register
+            macro: 寄存器在本文件中的唯一宏名称
+            fields: [(BitField, 位域宏名称)]
+        """
+        raise NotImplementedError
+
+    def end(self):
+        """文件结尾"""
+        return ""
+
+class SVPackageExporter(RegisterExporter):
+    """SystemVerilog包，寄存器地址、复位值和位域以localparam定义"""
+
+    def begin(self):
+        info = self.info
+        return f"""
+// 寄存器定义包
+// 自动生成的设备寄存器定义: {_comment(info['device_name'])}
+// 生成时间: {info['timestamp']}
+
+package {_identifier(info['device_name'], 'DEVICE').lower()}_regs_pkg;
+
+  // 设备ID和供应商ID
+  localparam logic [15:0] DEV_VENDOR_ID = 16'h{info['vendor_id']};
+  localparam logic [15:0] DEV_DEVICE_ID = 16'h{info['device_id']};
+
+"""
+
+    def register(self, reg, macro, fields):
+        lines = []
+        description = _comment(reg.description or reg.name)
+        lines.append(f"  // {description}")
+        lines.append(f"  localparam logic [31:0] {macro}_REG = 32'h{reg.address:08X};")
+        reset = parse_constant(reg.value)
+        if reset is not None:
+            lines.append(f"  localparam logic [{reg.width - 1}:0] {macro}_RESET = "
+                         f"{reg.width}'h{reset:0{(reg.width + 3) // 4}X};")
+        for field, field_macro in fields:
+            if field.single_bit:
+                lines.append(f"  localparam int {field_macro}_BIT = {field.lsb};")
+            else:
+                lines.append(f"  localparam int {field_macro}_MSB = {field.msb};")
+                lines.append(f"  localparam int {field_macro}_LSB = {field.lsb};")
+                lines.append(f"  localparam logic [{reg.width - 1}:0] {field_macro}_MASK = "
+                             f"{reg.width}'h{field.mask:0{(reg.width + 3) // 4}X};")
+        lines.append("")
+        return "\n".join(lines) + "\n"
+
+    def end(self):
+        return "endpackage\n"
+
+class CHeaderExporter(RegisterExporter):
+    """C头文件，寄存器地址、复位值和位域以#define定义"""
+
+    def begin(self):
+        info = self.info
+        guard = f"{_identifier(info['device_name'], 'DEVICE')}_REGISTERS_H"
+        self._guard = guard
+        return f"""/*
+ * 寄存器定义头文件
+ * 自动生成的设备寄存器定义: {_comment(info['device_name']).replace('*/', '* /')}
+ * 生成时间: {info['timestamp']}
+ */
+
+#ifndef {guard}
+#define {guard}
+
+/* 设备ID和供应商ID */
+#define DEV_VENDOR_ID 0x{info['vendor_id']}u
+#define DEV_DEVICE_ID 0x{info['device_id']}u
+
+"""
+
+    @staticmethod
+    def _constant(value, width):
+        return f"0x{value:0{(width + 3) // 4}X}{'ull' if width > 32 else 'u'}"
+
+    def register(self, reg, macro, fields):
+        lines = [f"/* {_comment(reg.description or reg.name).replace('*/', '* /')} */",
+                 f"#define {macro}_REG 0x{reg.address:08X}u"]
+        reset = parse_constant(reg.value)
+        if reset is not None:
+            lines.append(f"#define {macro}_RESET {self._constant(reset, reg.width)}")
+        for field, field_macro in fields:
+            if field.single_bit:
+                lines.append(f"#define {field_macro}_BIT {field.lsb}u")
+            else:
+                lines.append(f"#define {field_macro}_MSB {field.msb}u")
+                lines.append(f"#define {field_macro}_LSB {field.lsb}u")
+                lines.append(f"#define {field_macro}_MASK {self._constant(field.mask, reg.width)}")
+        lines.append("")
+        return "\n".join(lines) + "\n"
+
+    def end(self):
+        return f"#endif /* {self._guard} */\n"
+
+class PythonExporter(RegisterExporter):
+    """Python模块，寄存器地址、复位值和位域以模块级常量定义"""
+
+    def begin(self):
+        info = self.info
+        return f"""# -*- coding: utf-8 -*-
+# 寄存器定义模块
+# 自动生成的设备寄存器定义: {_comment(info['device_name'])}
+# 生成时间: {info['timestamp']}
+
+# 设备ID和供应商ID
+DEV_VENDOR_ID = 0x{info['vendor_id']}
+DEV_DEVICE_ID = 0x{info['device_id']}
+
+"""
+
+    def register(self, reg, macro, fields):
+        lines = [f"# {_comment(reg.description or reg.name)}",
+                 f"{macro}_REG = 0x{reg.address:08X}"]
+        reset = parse_constant(reg.value)
+        if reset is not None:
+            lines.append(f"{macro}_RESET = 0x{reset:0{(reg.width + 3) // 4}X}")
+        for field, field_macro in fields:
+            if field.single_bit:
+                lines.append(f"{field_macro}_BIT = {field.lsb}")
+            else:
+                lines.append(f"{field_macro}_MSB = {field.msb}")
+                lines.append(f"{field_macro}_LSB = {field.lsb}")
+                lines.append(f"{field_macro}_MASK = 0x{field.mask:0{(reg.width + 3) // 4}X}")
+        lines.append("")
+        return "\n".join(lines) + "\n"
+
+class JSONExporter(RegisterExporter):
+    """JSON寄存器描述，每个寄存器一个对象，逐个写出，不在内存中构建完整的文档"""
+
+    def begin(self):
+        info = self.info
+        self._first = True
+        header = json.dumps({
+            "device": {
+                "name": info["device_name"],
+                "vendor_id": info["vendor_id"],
+                "device_id": info["device_id"],
+                "type": info["device_type"]
+            },
+            "generator_version": info["generator_version"],
+            "timestamp": info["timestamp"]
+        }, indent=2, ensure_ascii=False)
+        # 去掉结尾的大括号，后面接着写registers数组
+        return header[:-2] + ',\n  "registers": ['
+
+    def register(self, reg, macro, fields):
+        reset = parse_constant(reg.value)
+        entry = {
+            "name": reg.name,
+            "macro": macro,
+            "address": f"0x{reg.address:08X}",
+            "width": reg.width,
+            "access": reg.access,
+            "reset": None if reset is None else f"0x{reset:0{(reg.width + 3) // 4}X}",
+            "source": reg.source,
+            "description": reg.description,
+            "fields": [
+                {
+                    "name": field.name,
+                    "macro": field_macro,
+                    "msb": field.msb,
+                    "lsb": field.lsb,
+                    "access": field.access,
+                    "mask": f"0x{field.mask:0{(reg.width + 3) // 4}X}",
+                    "description": field.description
+                }
+                for field, field_macro in fields
+            ]
+        }
+        separator = "\n    " if self._first else ",\n    "
+        self._first = False
+        return separator + json.dumps(entry, ensure_ascii=False)
+
+    def end(self):
+        return ("]\n}\n" if self._first else "\n  ]\n}\n")
+
+EXPORTERS = {
+    "sv_package": SVPackageExporter,
+    "c": CHeaderExporter,
+    "python": PythonExporter,
+    "json": JSONExporter
+}
+
+def create_exporter(export_format, info):
+    """创建指定格式的导出器"""
+    return EXPORTERS[export_format](info)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+寄存器地址索引模块
+汇总设备寄存器、基本寄存器、DMA寄存器和中断寄存器的地址区间，
+一次排序扫描找出全部地址重叠和重名的寄存器
+
+所有来源的寄存器位于同一BAR地址空间，区间按起始地址排序后只需与
+此前结束地址最大的区间比较，总耗时为O(n log n)
+"""
+
+from register_model import AUTO_ADDRESSES, BASE_REGISTERS, Register, build_register_model
+
+# 寄存器来源的显示名称
+SOURCE_LABELS = {
+    "key": "设备寄存器",
+    "base": "基本寄存器",
+    "dma": "DMA寄存器",
+    "interrupt": "中断寄存器"
+}
+
+# 问题类型: 地址重叠、名称重复、地址无效，以及位域校验的位域重叠、超出宽度和未定义的保留位
+CONFLICT_KINDS = ("overlap", "name", "invalid", "field_overlap", "field_range", "field_reserved")
+
+def describe_register(register):
+    """寄存器的简短描述：来源、名称和地址区间"""
+    label = SOURCE_LABELS.get(register.source, register.source)
+    if register.size > 1:
+        return f"{label}{register.name}(0x{register.address:04X}-0x{register.end_address:04X})"
+    return f"{label}{register.name}(0x{register.address:04X})"
+
+class RegisterConflict:
+    """寄存器冲突"""
+
+    __slots__ = ("kind", "severity", "registers", "message")
+
+    def __init__(self, kind, severity, registers, message):
+        """初始化寄存器冲突
+
+        Args:
+            kind: 问题类型，CONFLICT_KINDS之一
+            severity: "error"、"warning"或"info"
+            registers: 涉及的Register
+            message: 问题描述
+        """
+        self.kind = kind
+        self.severity = severity
+        self.registers = tuple(registers)
+        self.message = message
+
+    @property
+    def is_error(self):
+        """是否为必须修正的错误"""
+        return self.severity == "error"
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"RegisterConflict({self.kind!r}, {self.severity!r}, {self.message!r})"
+
+    def to_dict(self):
+        """转换为可序列化为JSON的字典"""
+        return {
+            "kind": self.kind,
+            "severity": self.severity,
+            "message": self.message,
+            "registers": [
+                {"source": reg.source, "name": reg.name, "address": f"0x{reg.address:04X}", "size": reg.size}
+                for reg in self.registers
+            ]
+        }
+
+class RegisterIndex:
+    """多个来源的寄存器地址区间索引"""
+
+    def __init__(self):
+        self.registers = []
+        self.invalid = []
+
+    def add_model(self, register_model):
+        """添加寄存器模型（RegisterModel或Register序列）中的全部寄存器"""
+        self.registers.extend(register_model)
+        return self
+
+    def add_config(self, registers, source):
+        """添加寄存器配置字典列表，地址无法解析的寄存器记为无效
+
+        Args:
+            registers: 寄存器配置字典列表，兼容addr/address/offset
+            source: 寄存器来源，SOURCE_LABELS的键
+        """
+        label = SOURCE_LABELS.get(source, source)
+        field_cache = {}
+        for index, reg in enumerate(registers):
+            try:
+                self.registers.append(Register.from_dict(reg, index, source, field_cache))
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                name = reg.get("name", "") if isinstance(reg, dict) else ""
+                raw = next((reg[field] for field in ("addr", "address", "offset") if field in reg), None) \
+                    if isinstance(reg, dict) else None
+                if raw in AUTO_ADDRESSES:
+                    message = f"{label}第{index + 1}项{name}尚未分配地址，请先运行地址自动分配"
+                else:
+                    message = f"{label}第{index + 1}项{name}地址无效: {str(e) or type(e).__name__}"
+                self.invalid.append(RegisterConflict("invalid", "error", (), message))
+        return self
+
+    @classmethod
+    def from_config(cls, device_config, include_base=True):
+        """根据设备配置构建索引
+
+        包含key_registers、基本寄存器、已启用DMA的dma_config.registers
+        和interrupt_config.registers
+        """
+        index = cls()
+        try:
+            index.add_model(build_register_model(device_config))
+        except (KeyError, ValueError, TypeError, AttributeError):
+            # 逐项解析，记录所有地址无效的寄存器
+            index.add_config(device_config.get("key_registers", []), "key")
+        if include_base:
+            index.add_config(BASE_REGISTERS, "base")
+        dma_config = device_config.get("dma_config") or {}
+        if dma_config.get("enabled"):
+            index.add_config(dma_config.get("registers", []), "dma")
+        interrupt_config = device_config.get("interrupt_config") or {}
+        index.add_config(interrupt_config.get("registers", []), "interrupt")
+        return index
+
+    def conflicts(self):
+        """返回全部冲突，依次为地址无效、地址重叠（按地址顺序）和名称重复
+
+        基本寄存器是所有设备共有的默认定义，与其他来源重叠时由其他来源覆盖，
+        记为警告；名称重复不影响地址译码，也记为警告；其余地址重叠记为错误
+        """
+        # 各来源已按地址排序，Timsort合并有序片段接近线性
+        ordered = sorted(self.registers, key=lambda r: (r.address, r.end_address))
+        conflicts = list(self.invalid)
+
+        # 基本寄存器之间互不重叠，其他来源与基本寄存器分别记录结束地址最大的区间，
+        # 使被基本寄存器覆盖的位置仍能发现其他来源之间的重叠
+        reach = None
+        base_reach = None
+        for reg in ordered:
+            if reach is not None and reg.address <= reach.end_address:
+                if reg.source == "base":
+                    conflicts.append(self._shadow_conflict(reg, reach))
+                else:
+                    message = f"{describe_register(reg)}与{describe_register(reach)}地址重叠"
+                    conflicts.append(RegisterConflict("overlap", "error", (reach, reg), message))
+            if reg.source == "base":
+                if base_reach is None or reg.end_address > base_reach.end_address:
+                    base_reach = reg
+                continue
+            if base_reach is not None and reg.address <= base_reach.end_address:
+                conflicts.append(self._shadow_conflict(base_reach, reg))
+            if reach is None or reg.end_address > reach.end_address:
+                reach = reg
+
+        first_by_name = {}
+        for reg in ordered:
+            name = reg.name.strip().upper()
+            first = first_by_name.setdefault(name, reg)
+            if first is not reg:
+                message = f"{describe_register(reg)}与{describe_register(first)}名称重复"
+                conflicts.append(RegisterConflict("name", "warning", (first, reg), message))
+        return conflicts
+
+    @staticmethod
+    def _shadow_conflict(base, reg):
+        message = f"{describe_register(reg)}与{describe_register(base)}地址重叠，基本寄存器被覆盖"
+        return RegisterConflict("overlap", "warning", (base, reg), message)
+
+    def errors(self):
+        """返回必须修正的冲突"""
+        return [conflict for conflict in self.conflicts() if conflict.is_error]
+
+    def shadowed_base_registers(self):
+        """返回被其他来源覆盖的基本寄存器"""
+        return [conflict.registers[0] for conflict in self.conflicts()
+                if conflict.kind == "overlap" and conflict.registers[0].source == "base"]
+
+def find_register_conflicts(device_config):
+    """检查设备配置中全部来源的寄存器，返回冲突列表"""
+    return RegisterIndex.from_config(device_config).conflicts()
+
+def format_conflicts(conflicts, limit=10):
+    """将冲突列表格式化为多行文本，超过limit个时只列出前limit个"""
+    lines = [str(conflict) for conflict in conflicts[:limit]]
+    if len(conflicts) > limit:
+        lines.append(f"……共{len(conflicts)}个")
+    return "\n".join(lines)
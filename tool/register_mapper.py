@@ -5,15 +5,48 @@
 负责生成PCIe设备的寄存器映射代码
 """
 
+import io
 import os
-import re
+import time
+from heapq import merge
+from operator import attrgetter
+
+from generation_result import GenerationResult, write_streamed_artifact
+from artifact_writer import ChunkedArtifact
+from profiler import profiled
+from build_info import generation_timestamp
+from artifact_cache import generator_cache_key
+from template_engine import get_template, join_chunks
+from register_model import BASE_REGISTERS, RegisterModel, build_register_model, create_macro_name
+from register_index import RegisterIndex
+from register_exporter import EXPORT_FORMATS, create_exporter
+
+# 寄存器排序键
+_register_address = attrgetter("address")
 
 class RegisterMapper:
     """寄存器映射生成类"""
     
-    def __init__(self):
-        """初始化寄存器映射模块"""
-        self.template = self._load_register_map_template()
+    # 生成器版本，模板或生成逻辑变化时递增，使增量生成的指纹失效
+    GENERATOR_VERSION = "1.3.0"
+    
+    # 各生成方法实际使用的配置字段，用于计算增量生成指纹
+    INPUT_KEYS = {
+        "generate_register_map": ("name", "vendor_id", "device_id", "type", "key_registers"),
+        "generate_register_exports": ("name", "vendor_id", "device_id", "type", "key_registers")
+    }
+    
+    def __init__(self, deterministic=False, cache=None):
+        """初始化寄存器映射模块
+        
+        Args:
+            deterministic: 是否生成不含当前时间的可复现输出
+            cache: 产物缓存(ArtifactCache)，仅在可复现模式下使用
+        """
+        self.deterministic = deterministic
+        self.cache = cache
+        self.template = get_template("registers.map", self._load_register_map_template)
+        self._base_registers = None
         
     def _load_register_map_template(self):
         """加载寄存器映射模板"""
@@ -58,147 +91,305 @@ class RegisterMapper:
 `endif // {include_guard}
 """
     
-    def generate_register_map(self, device_config, output_file):
-        """生成寄存器映射代码"""
-        try:
-            device_name = device_config.get("name", "自定义设备")
-            include_guard = self._create_include_guard(device_name)
-            vendor_id = device_config.get("vendor_id", "FFFF")
-            device_id = device_config.get("device_id", "FFFF")
-            reg_base = "0000"  # 默认寄存器基地址，通常是BAR0
-            
-            # 生成寄存器定义
-            registers = device_config.get("key_registers", [])
-            register_definitions = []
-            bit_field_definitions = []
-            constant_definitions = []
-            
-            # 添加基本寄存器
-            base_registers = [
-                {"addr": "0x0000", "name": "状态寄存器", "description": "设备状态"},
-                {"addr": "0x0004", "name": "控制寄存器", "description": "设备控制"},
-                {"addr": "0x0008", "name": "中断状态", "description": "设备中断状态"},
-                {"addr": "0x000C", "name": "中断使能", "description": "设备中断使能"}
-            ]
-            
-            # 合并寄存器列表
-            all_registers = base_registers + registers
+    def render_register_map(self, device_config, register_model=None):
+        """在内存中渲染寄存器映射代码，不写入文件
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            # 对寄存器进行排序
-            all_registers.sort(key=lambda r: int(r["addr"].replace("0x", ""), 16))
+        Returns:
+            代码文本
+        """
+        return "".join(self.stream_register_map(device_config, register_model))
+    
+    def stream_register_map(self, device_config, register_model=None):
+        """流式渲染寄存器映射代码
+        
+        寄存器和位字段定义在迭代时逐行生成，内存中不保存完整的定义列表和输出文本
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            # 处理每个寄存器
-            for reg in all_registers:
-                addr = reg["addr"].replace("0x", "")
-                name = reg.get("name", f"寄存器_{addr}")
-                # 创建宏定义友好的名称
-                macro_name = self._create_macro_name(name)
-                
-                # 添加寄存器地址定义
-                register_definitions.append(f"`define {macro_name}_REG 32'h{addr}")
-                
-                # 添加寄存器描述（注释）
-                description = reg.get("description", "")
-                if description:
-                    register_definitions[-1] += f" // {description}"
+        Returns:
+            代码片段的迭代器
+        """
+        device_name = device_config.get("name", "自定义设备")
+        include_guard = self._create_include_guard(device_name)
+        vendor_id = device_config.get("vendor_id", "FFFF")
+        device_id = device_config.get("device_id", "FFFF")
+        reg_base = "0000"  # 默认寄存器基地址，通常是BAR0
+        
+        # 生成寄存器定义
+        if register_model is None:
+            register_model = build_register_model(device_config)
+        
+        # 添加设备类型特定的常量定义
+        constant_definitions = []
+        device_type = device_config.get("type", "custom")
+        if device_type == "nic" or device_type == "wifi":
+            # 网络设备特定常量
+            constant_definitions.extend([
+                "// 网络设备特定常量",
+                "`define MAX_PACKET_SIZE 1518",
+                "`define MIN_PACKET_SIZE 64",
+                "`define MAC_ADDR_SIZE 6",
+                "`define RX_BUFFER_SIZE 4096",
+                "`define TX_BUFFER_SIZE 4096",
+                "",
+                "// 网络设备命令代码",
+                "`define CMD_NIC_RESET 8'h00",
+                "`define CMD_NIC_INIT 8'h01",
+                "`define CMD_NIC_TX 8'h02",
+                "`define CMD_NIC_RX 8'h03",
+                "`define CMD_NIC_GET_STATS 8'h04",
+                "`define CMD_NIC_SET_MAC 8'h05",
+                "`define CMD_NIC_GET_MAC 8'h06"
+            ])
+        elif device_type == "storage":
+            # 存储设备特定常量
+            constant_definitions.extend([
+                "// 存储设备特定常量",
+                "`define SECTOR_SIZE 512",
+                "`define MAX_TRANSFER_SIZE 128",
+                "`define MAX_LBA_ADDRESS 48'hFFFFFFFFFFFF",
+                "",
+                "// 存储设备命令代码",
+                "`define CMD_READ_SECTORS 8'h20",
+                "`define CMD_WRITE_SECTORS 8'h30",
+                "`define CMD_READ_DMA 8'h25",
+                "`define CMD_WRITE_DMA 8'h35",
+                "`define CMD_IDENTIFY 8'hEC",
+                "`define CMD_SET_FEATURES 8'hEF",
+                "`define CMD_FLUSH_CACHE 8'hE7"
+            ])
+        
+        # 生成最终代码，寄存器和位字段定义在写出时才生成
+        return self.template.iter_render(
+            device_name=device_name,
+            timestamp=generation_timestamp(self.deterministic, self.GENERATOR_VERSION),
+            include_guard=include_guard,
+            vendor_id=vendor_id,
+            device_id=device_id,
+            reg_base=reg_base,
+            register_definitions=join_chunks("\n", self._iter_register_definitions(register_model)),
+            bit_field_definitions=join_chunks("\n", self._iter_bit_field_definitions(register_model)),
+            constant_definitions="\n".join(constant_definitions)
+        )
+    
+    def _iter_all_registers(self, register_model):
+        """按地址顺序依次产生基本寄存器和设备寄存器，地址相同时基本寄存器在前
+        
+        与设备寄存器地址重叠的基本寄存器由设备寄存器覆盖，不再生成定义
+        """
+        return merge(self._visible_base_registers(register_model), register_model, key=_register_address)
+    
+    def _visible_base_registers(self, register_model):
+        """未被设备寄存器覆盖的基本寄存器"""
+        base_model = self._base_register_model()
+        # 只有起始地址不超过基本寄存器末尾的设备寄存器可能与之重叠
+        nearby = register_model.in_range(0, base_model.registers[-1].end_address + 1)
+        if not nearby:
+            return base_model
+        index = RegisterIndex().add_model(base_model).add_model(nearby)
+        shadowed = set(map(id, index.shadowed_base_registers()))
+        return [reg for reg in base_model if id(reg) not in shadowed]
+    
+    def _iter_macro_names(self, register_model):
+        """按地址顺序产生(寄存器, 宏名称)
+        
+        宏名称在同一文件中不能重复，重名的寄存器依次添加_2、_3等后缀
+        """
+        used = set()
+        for reg in self._iter_all_registers(register_model):
+            macro = reg.macro_name
+            if macro in used:
+                suffix = 2
+                while f"{macro}_{suffix}" in used:
+                    suffix += 1
+                macro = f"{macro}_{suffix}"
+            used.add(macro)
+            yield reg, macro
+    
+    def _iter_register_definitions(self, register_model):
+        """寄存器地址定义，附带寄存器描述注释
+        
+        宏名称由地址区分时（名称含中文等非ASCII字符），注释中保留原始名称
+        """
+        for reg, macro in self._iter_macro_names(register_model):
+            description = reg.description
+            if macro.startswith(f"REG_{reg.address:04X}"):
+                description = f"{reg.name}: {description}" if description else reg.name
+            if description:
+                yield f"`define {macro}_REG 32'h{reg.address:08X} // {description}"
+            else:
+                yield f"`define {macro}_REG 32'h{reg.address:08X}"
+    
+    @staticmethod
+    def _iter_field_macros(reg, macro):
+        """产生寄存器的(位域, 宏名称)，同一寄存器中重名的位域以最低位区分"""
+        used = set()
+        for field in reg.bit_fields:
+            field_macro = f"{macro}_{field.macro_name}"
+            if field_macro in used:
+                field_macro = f"{field_macro}_{field.lsb}"
+            used.add(field_macro)
+            yield field, field_macro
+    
+    def _iter_bit_field_definitions(self, register_model):
+        """位字段定义，描述注释附加在每个位字段的最后一行"""
+        for reg, macro in self._iter_macro_names(register_model):
+            for field, field_macro in self._iter_field_macros(reg, macro):
+                comment = f" // {field.description}" if field.description else ""
                 
-                # 处理位字段（如果存在）
-                bit_fields = reg.get("bit_fields", [])
-                for field in bit_fields:
-                    field_name = field.get("name", "FIELD")
-                    field_macro = f"{macro_name}_{self._create_macro_name(field_name)}"
-                    
-                    # 位位置
-                    if "bit" in field:
-                        # 单个位
-                        bit_field_definitions.append(f"`define {field_macro}_BIT {field['bit']}")
-                    elif "msb" in field and "lsb" in field:
-                        # 位域
-                        bit_field_definitions.append(f"`define {field_macro}_MSB {field['msb']}")
-                        bit_field_definitions.append(f"`define {field_macro}_LSB {field['lsb']}")
-                        bit_field_definitions.append(f"`define {field_macro}_MASK ({(1 << (field['msb'] - field['lsb'] + 1)) - 1} << {field['lsb']})")
-                    
-                    # 添加描述
-                    field_desc = field.get("description", "")
-                    if field_desc and "BIT" in bit_field_definitions[-1]:
-                        bit_field_definitions[-1] += f" // {field_desc}"
-                    elif field_desc and "MASK" in bit_field_definitions[-1]:
-                        bit_field_definitions[-1] += f" // {field_desc}"
+                if field.single_bit:
+                    # 单个位
+                    yield f"`define {field_macro}_BIT {field.lsb}{comment}"
+                else:
+                    # 位域
+                    yield f"`define {field_macro}_MSB {field.msb}"
+                    yield f"`define {field_macro}_LSB {field.lsb}"
+                    yield f"`define {field_macro}_MASK ({(1 << field.width) - 1} << {field.lsb}){comment}"
+    
+    @profiled("RegisterMapper.generate_register_map")
+    def generate_register_map(self, device_config, output_file, register_model=None):
+        """生成寄存器映射代码
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            output_file: 输出文件路径
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            # 添加设备类型特定的常量定义
-            device_type = device_config.get("type", "custom")
-            if device_type == "nic" or device_type == "wifi":
-                # 网络设备特定常量
-                constant_definitions.extend([
-                    "// 网络设备特定常量",
-                    "`define MAX_PACKET_SIZE 1518",
-                    "`define MIN_PACKET_SIZE 64",
-                    "`define MAC_ADDR_SIZE 6",
-                    "`define RX_BUFFER_SIZE 4096",
-                    "`define TX_BUFFER_SIZE 4096",
-                    "",
-                    "// 网络设备命令代码",
-                    "`define CMD_NIC_RESET 8'h00",
-                    "`define CMD_NIC_INIT 8'h01",
-                    "`define CMD_NIC_TX 8'h02",
-                    "`define CMD_NIC_RX 8'h03",
-                    "`define CMD_NIC_GET_STATS 8'h04",
-                    "`define CMD_NIC_SET_MAC 8'h05",
-                    "`define CMD_NIC_GET_MAC 8'h06"
-                ])
-            elif device_type == "storage":
-                # 存储设备特定常量
-                constant_definitions.extend([
-                    "// 存储设备特定常量",
-                    "`define SECTOR_SIZE 512",
-                    "`define MAX_TRANSFER_SIZE 128",
-                    "`define MAX_LBA_ADDRESS 48'hFFFFFFFFFFFF",
-                    "",
-                    "// 存储设备命令代码",
-                    "`define CMD_READ_SECTORS 8'h20",
-                    "`define CMD_WRITE_SECTORS 8'h30",
-                    "`define CMD_READ_DMA 8'h25",
-                    "`define CMD_WRITE_DMA 8'h35",
-                    "`define CMD_IDENTIFY 8'hEC",
-                    "`define CMD_SET_FEATURES 8'hEF",
-                    "`define CMD_FLUSH_CACHE 8'hE7"
-                ])
+        Returns:
+            GenerationResult，真值表示是否生成成功
+        """
+        start = time.perf_counter()
+        try:
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_register_map")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ 寄存器映射代码已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 生成最终代码
-            code = self.template.format(
-                device_name=device_name,
-                timestamp=__import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                include_guard=include_guard,
-                vendor_id=vendor_id,
-                device_id=device_id,
-                reg_base=reg_base,
-                register_definitions="\n".join(register_definitions),
-                bit_field_definitions="\n".join(bit_field_definitions),
-                constant_definitions="\n".join(constant_definitions)
+            # 流式渲染并写入输出文件，峰值内存不随寄存器数量增长
+            result = write_streamed_artifact(
+                output_file, self.stream_register_map(device_config, register_model), start
             )
             
-            # 写入输出文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(code)
+            if cache_key:
+                self.cache.store(cache_key, output_file)
             
             print(f"✅ 寄存器映射代码已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成寄存器映射代码失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
+    
+    def write_register_exports(self, device_config, outputs, register_model=None):
+        """将寄存器定义同时导出为多种格式
+        
+        寄存器模型只遍历一次，每个寄存器的宏名称和位域名称只计算一次，依次交给各格式的导出器
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            outputs: {导出格式: 具有write(text)方法的输出对象}，格式见EXPORT_FORMATS
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
+        """
+        if register_model is None:
+            register_model = build_register_model(device_config)
+        info = {
+            "device_name": device_config.get("name", "自定义设备"),
+            "vendor_id": device_config.get("vendor_id", "FFFF"),
+            "device_id": device_config.get("device_id", "FFFF"),
+            "device_type": device_config.get("type", "custom"),
+            "timestamp": generation_timestamp(self.deterministic, self.GENERATOR_VERSION),
+            "generator_version": self.GENERATOR_VERSION
+        }
+        writers = [(create_exporter(export_format, info), output) for export_format, output in outputs.items()]
+        for exporter, output in writers:
+            output.write(exporter.begin())
+        for reg, macro in self._iter_macro_names(register_model):
+            fields = tuple(self._iter_field_macros(reg, macro))
+            for exporter, output in writers:
+                output.write(exporter.register(reg, macro, fields))
+        for exporter, output in writers:
+            output.write(exporter.end())
+    
+    def render_register_exports(self, device_config, formats=None, register_model=None):
+        """在内存中渲染寄存器定义的各种导出格式，不写入文件
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            formats: 导出格式序列，为None时导出全部格式
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
+        
+        Returns:
+            {输出文件名: 文本}
+        """
+        formats = tuple(EXPORT_FORMATS) if formats is None else formats
+        outputs = {export_format: io.StringIO() for export_format in formats}
+        self.write_register_exports(device_config, outputs, register_model)
+        return {EXPORT_FORMATS[export_format][0]: output.getvalue() for export_format, output in outputs.items()}
+    
+    @profiled("RegisterMapper.generate_register_exports")
+    def generate_register_exports(self, device_config, output_dir, formats=None, register_model=None):
+        """将寄存器定义导出为SystemVerilog包、C头文件、Python模块和JSON描述
+        
+        所有格式在一次遍历中流式写入各自的文件，任一格式失败时所有文件保持不变
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            output_dir: 输出目录
+            formats: 导出格式序列，为None时导出全部格式
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
+        
+        Returns:
+            {导出格式: GenerationResult}，遍历耗时按文件数平均计入各文件的渲染耗时
+        """
+        formats = tuple(EXPORT_FORMATS) if formats is None else formats
+        paths = {export_format: os.path.join(output_dir, EXPORT_FORMATS[export_format][0])
+                 for export_format in formats}
+        start = time.perf_counter()
+        artifacts = {}
+        try:
+            for export_format, path in paths.items():
+                artifacts[export_format] = ChunkedArtifact(path)
+            self.write_register_exports(device_config, artifacts, register_model)
+        except Exception as e:
+            for artifact in artifacts.values():
+                artifact.abort()
+            print(f"❌ 导出寄存器定义失败: {str(e)}")
+            elapsed = time.perf_counter() - start
+            return {export_format: GenerationResult.failure(path, e, elapsed)
+                    for export_format, path in paths.items()}
+        
+        results = {}
+        render_time = (time.perf_counter() - start - sum(artifact.write_time for artifact in artifacts.values()))
+        for export_format, artifact in artifacts.items():
+            path = paths[export_format]
+            try:
+                changed, size, sha256, write_time = artifact.commit()
+            except Exception as e:
+                print(f"❌ 写入{EXPORT_FORMATS[export_format][1]}失败: {str(e)}")
+                results[export_format] = GenerationResult.failure(path, e, time.perf_counter() - start)
+                continue
+            results[export_format] = GenerationResult(
+                path, bytes=size, sha256=sha256, render_time=render_time / len(artifacts),
+                write_time=write_time, changed=changed
+            )
+            print(f"✅ {EXPORT_FORMATS[export_format][1]}已生成: {path}")
+        return results
+    
+    def _base_register_model(self):
+        """所有设备共有的基本寄存器"""
+        if self._base_registers is None:
+            self._base_registers = RegisterModel.from_registers(BASE_REGISTERS, source="base")
+        return self._base_registers
     
     def _create_include_guard(self, name):
         """创建包含保护宏"""
-        # 创建全大写的宏名称
-        guard = re.sub(r'[^\w]', '_', name).upper()
+        # 创建全大写的宏名称，SV宏名称只能使用ASCII字符
+        guard = create_macro_name(name) or "DEVICE"
         return f"__{guard}_REGISTERS_H__"
-    
-    def _create_macro_name(self, name):
-        """将寄存器名称转换为宏定义友好的名称"""
-        # 移除非字母数字字符，转换为大写
-        name = re.sub(r'[^\w]', '_', name).upper()
-        # 替换多个连续下划线
-        name = re.sub(r'_+', '_', name)
-        # 移除开头和结尾的下划线
-        name = name.strip('_')
-        return name 
\ No newline at end of file
+
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+寄存器模型模块
+将设备配置中的寄存器统一解析为紧凑的中间表示，供各生成器和视图共享
+
+生成器使用的寄存器字段为addr/value/bit_fields(bit或msb/lsb)，
+图形界面编辑器使用的字段为address/default/bitfields(bits)，
+DMA和中断编辑器使用offset。模型在构建时一次性完成解析、规范化和排序
+"""
+
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from heapq import merge
+
+from config_snapshot import FrozenDict
+
+# 连续的非ASCII字母数字字符（含下划线和中文等非ASCII字符）统一替换为单个下划线
+_MACRO_SEPARATOR = re.compile(r'[\W_]+', re.ASCII)
+
+# 非ASCII字符
+_NON_ASCII = re.compile(r'[^\x00-\x7F]')
+
+# SystemVerilog数值字面量：[位宽]'[s]进制 数字
+_SV_LITERAL = re.compile(r"^(\d+)?\s*'[sS]?([hHdDbBoO])\s*([0-9a-fA-F_]+)$")
+
+# SV字面量进制字符
+_SV_RADIX = {"h": 16, "d": 10, "b": 2, "o": 8}
+
+# 所有设备共有的基本寄存器（状态、控制和中断）
+BASE_REGISTERS = (
+    {"addr": "0x0000", "name": "状态寄存器", "description": "设备状态"},
+    {"addr": "0x0004", "name": "控制寄存器", "description": "设备控制"},
+    {"addr": "0x0008", "name": "中断状态", "description": "设备中断状态"},
+    {"addr": "0x000C", "name": "中断使能", "description": "设备中断使能"}
+)
+
+# 表示由地址分配器自动分配的地址取值
+AUTO_ADDRESSES = ("", "auto", "AUTO", None)
+
+# 规范化后的访问类型
+ACCESS_TYPES = ("RW", "RO", "WO", "RC", "W1C", "W1S")
+
+# 访问类型别名
+ACCESS_ALIASES = {
+    "R/W": "RW",
+    "READ-WRITE": "RW",
+    "READ_WRITE": "RW",
+    "R": "RO",
+    "READ-ONLY": "RO",
+    "READ_ONLY": "RO",
+    "W": "WO",
+    "WRITE-ONLY": "WO",
+    "WRITE_ONLY": "WO",
+    "RW1C": "W1C",
+    "RW1S": "W1S",
+    "ROC": "RC",
+    "RCLR": "RC"
+}
+
+def normalize_access(access, default="RW"):
+    """将访问类型字符串规范化为ACCESS_TYPES之一"""
+    if access in ACCESS_TYPES:
+        return access
+    if not access:
+        return default
+    access = str(access).strip().upper()
+    access = ACCESS_ALIASES.get(access, access)
+    if access in ACCESS_TYPES:
+        return access
+
+    # 兼容旧配置中的组合写法（例如"RW/W1C"），按生成器原有的匹配优先级处理
+    for candidate in ("RO", "RC", "W1C", "W1S", "WO", "RW"):
+        if candidate in access:
+            return candidate
+    return default
+
+def parse_address(value):
+    """将地址解析为整数
+
+    支持整数、"0x4000"以及不带前缀的十六进制字符串"4000"
+
+    Raises:
+        ValueError: 地址无法解析
+    """
+    if isinstance(value, int):
+        return value
+    # int()在base=16时本身接受0x前缀和下划线分隔
+    return int(str(value).strip(), 16)
+
+def parse_bits(bits):
+    """将"7:4"或"15"形式的位范围解析为(msb, lsb)"""
+    if isinstance(bits, int):
+        return bits, bits
+    text = str(bits).strip().strip("[]")
+    if ":" in text:
+        high, low = text.split(":", 1)
+        msb, lsb = int(high), int(low)
+        return max(msb, lsb), min(msb, lsb)
+    bit = int(text)
+    return bit, bit
+
+def format_value(value, width=32):
+    """将寄存器值转换为SystemVerilog表达式
+
+    已是SV字面量或信号名的值原样保留，整数和0x形式的十六进制转换为字面量
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return f"{width}'h{value:0{(width + 3) // 4}X}"
+    text = str(value).strip()
+    if text[:2] in ("0x", "0X"):
+        try:
+            return f"{width}'h{int(text, 16):0{(width + 3) // 4}X}"
+        except ValueError:
+            return text
+    return text
+
+def parse_constant(value):
+    """将寄存器值解析为整数
+
+    支持32'h0001、'd10等SV数值字面量和不带进制的十进制数，
+    信号名、表达式以及含x/z位的字面量返回None
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    if text.isdigit():
+        return int(text)
+    match = _SV_LITERAL.match(text)
+    if match is None:
+        return None
+    width, radix, digits = match.groups()
+    try:
+        number = int(digits.replace("_", ""), _SV_RADIX[radix.lower()])
+    except ValueError:
+        return None
+    # 超出位宽的高位按SV规则截断
+    if width:
+        number &= (1 << int(width)) - 1
+    return number
+
+@lru_cache(maxsize=4096)
+def create_macro_name(name):
+    """将寄存器或位域名称转换为宏定义友好的名称
+
+    位域名称在寄存器之间大量重复，结果按名称缓存
+    """
+    # 非字母数字字符替换为下划线并合并，转换为大写，移除开头和结尾的下划线
+    return _MACRO_SEPARATOR.sub('_', name).upper().strip('_')
+
+def _positional_macro_name(name, prefix):
+    """名称无法完整转换为宏名称时（含中文等非ASCII字符或以数字开头），以位置前缀区分
+
+    SV宏名称只能使用ASCII字符，名称中可以转换的ASCII部分附加在前缀之后
+    """
+    macro = create_macro_name(name)
+    if macro and not macro[0].isdigit() and _NON_ASCII.search(name) is None:
+        return macro
+    return f"{prefix}_{macro}" if macro else prefix
+
+class BitField:
+    """位域"""
+
+    __slots__ = ("name", "msb", "lsb", "access", "description", "macro_name", "mask", "single_bit")
+
+    def __init__(self, name, msb, lsb, access="RW", description="", single_bit=False):
+        self.name = name
+        self.msb = msb
+        self.lsb = lsb
+        self.access = access
+        self.description = description
+        self.macro_name = _positional_macro_name(name, f"BIT{lsb}" if msb == lsb else f"BITS{msb}_{lsb}")
+        self.mask = ((1 << (msb - lsb + 1)) - 1) << lsb
+        self.single_bit = single_bit
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    @property
+    def width(self):
+        """位域宽度"""
+        return self.msb - self.lsb + 1
+
+    @classmethod
+    def from_dict(cls, field):
+        """从配置字典构建位域，兼容bit、msb/lsb和bits三种写法"""
+        name = field.get("name", "FIELD")
+        access = normalize_access(field.get("access"))
+        description = field.get("description", "")
+        if "bit" in field:
+            bit = int(field["bit"])
+            return cls(name, bit, bit, access, description, single_bit=True)
+        if "msb" in field and "lsb" in field:
+            return cls(name, int(field["msb"]), int(field["lsb"]), access, description)
+        msb, lsb = parse_bits(field.get("bits", "0"))
+        return cls(name, msb, lsb, access, description, single_bit=(msb == lsb))
+
+class Register:
+    """寄存器"""
+
+    __slots__ = ("address", "name", "access", "value", "reset_value", "var_name", "macro_name",
+                 "description", "width", "bit_fields", "no_auto_clear", "index", "source")
+
+    def __init__(self, address, name, access="RW", value=None, reset_value=None, var_name=None,
+                 description="", width=32, bit_fields=(), no_auto_clear=False, index=0,
+                 source="key"):
+        self.address = address
+        self.name = name
+        self.access = access
+        self.value = value
+        self.reset_value = reset_value
+        self.var_name = var_name or f"custom_reg_{index}"
+        self.macro_name = _positional_macro_name(name, f"REG_{address:04X}")
+        self.description = description
+        self.width = width
+        self.bit_fields = tuple(bit_fields)
+        self.no_auto_clear = no_auto_clear
+        self.index = index
+        self.source = source
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    @property
+    def size(self):
+        """寄存器占用的字节数"""
+        return max(1, (self.width + 7) // 8)
+
+    @property
+    def end_address(self):
+        """寄存器占用的最后一个字节地址"""
+        return self.address + self.size - 1
+
+    @property
+    def is_constant(self):
+        """只读且取值为常量（不引用其他寄存器变量）"""
+        return (self.access == "RO" and self.value is not None and
+                "reg" not in self.value.lower())
+
+    @property
+    def needs_storage(self):
+        """是否需要在BAR控制器中声明寄存器变量"""
+        return self.access != "RO" or self.value is None or "reg" in self.value.lower()
+
+    @classmethod
+    def from_dict(cls, reg, index=0, source="key", field_cache=None):
+        """从配置字典构建寄存器，兼容生成器和编辑器两种字段命名
+
+        Args:
+            reg: 寄存器配置字典
+            index: 寄存器在配置中的序号，用于生成默认变量名
+            source: 寄存器来源（key、base等）
+            field_cache: 位域缓存，内容相同的位域定义共享同一个BitField实例
+
+        Raises:
+            KeyError: 缺少地址字段
+            ValueError: 地址无法解析
+        """
+        if "addr" in reg:
+            raw_address = reg["addr"]
+        elif "address" in reg:
+            raw_address = reg["address"]
+        else:
+            raw_address = reg["offset"]
+        address = parse_address(raw_address)
+        width = int(reg.get("width", reg.get("size", 32)) or 32)
+
+        value = reg.get("value")
+        if value is None and "default" in reg:
+            value = reg["default"]
+
+        fields = reg.get("bit_fields")
+        if fields is None:
+            fields = reg.get("bitfields", ())
+
+        bit_fields = []
+        for field in fields:
+            try:
+                field_key = tuple(field.items())
+                bit_field = field_cache.get(field_key)
+            except (AttributeError, TypeError):
+                # 未启用缓存或位域内容不可哈希
+                bit_fields.append(BitField.from_dict(field))
+                continue
+            if bit_field is None:
+                bit_field = field_cache[field_key] = BitField.from_dict(field)
+            bit_fields.append(bit_field)
+
+        return cls(address, reg.get("name") or f"寄存器_{address:04X}",
+                   normalize_access(reg.get("access")), format_value(value, width),
+                   reg.get("reset_value"), reg.get("var_name"), reg.get("description", ""),
+                   width, bit_fields, bool(reg.get("no_auto_clear", False)), index, source)
+
+class RegisterModel:
+    """按地址排序并建立索引的寄存器集合"""
+
+    __slots__ = ("registers", "_addresses", "_by_address")
+
+    def __init__(self, registers):
+        """初始化寄存器模型
+
+        Args:
+            registers: Register列表，按地址稳定排序（地址相同的保持原有顺序）
+        """
+        self._set_registers(tuple(sorted(registers, key=lambda r: r.address)))
+
+    def _set_registers(self, registers):
+        """设置已排序的寄存器并重建地址索引"""
+        self.registers = registers
+        self._addresses = [reg.address for reg in registers]
+        self._by_address = {}
+        for reg in reversed(registers):
+            self._by_address[reg.address] = reg
+
+    def __getstate__(self):
+        # 索引可以从寄存器重建，序列化时只保存寄存器本身
+        return self.registers
+
+    def __setstate__(self, state):
+        self._set_registers(state)
+
+    @classmethod
+    def from_registers(cls, registers, source="key"):
+        """从寄存器配置字典列表构建模型"""
+        field_cache = {}
+        return cls([Register.from_dict(reg, index, source, field_cache)
+                    for index, reg in enumerate(registers)])
+
+    def merged(self, registers):
+        """返回合并了额外寄存器的新模型，已排序的部分不再重新排序"""
+        extra = sorted(registers, key=lambda r: r.address)
+        model = RegisterModel.__new__(RegisterModel)
+        model._set_registers(tuple(merge(self.registers, extra, key=lambda r: r.address)))
+        return model
+
+    def __len__(self):
+        return len(self.registers)
+
+    def __iter__(self):
+        return iter(self.registers)
+
+    def __bool__(self):
+        return bool(self.registers)
+
+    def get(self, address):
+        """按地址查找寄存器，不存在时返回None"""
+        return self._by_address.get(address)
+
+    def in_range(self, start, end):
+        """返回地址位于[start, end)区间内的寄存器"""
+        lo = bisect_left(self._addresses, start)
+        hi = bisect_left(self._addresses, end)
+        return self.registers[lo:hi]
+
+    @property
+    def span(self):
+        """寄存器占用的地址跨度（字节）"""
+        if not self.registers:
+            return 0
+        return max(reg.end_address for reg in self.registers) - self.registers[0].address + 1
+
+def build_register_model(device_config):
+    """根据设备配置的key_registers构建寄存器模型
+
+    配置为快照时模型缓存在快照上，同一快照的多个生成步骤只构建一次
+    """
+    if isinstance(device_config, FrozenDict):
+        return device_config.memoize(
+            "register_model",
+            lambda: RegisterModel.from_registers(device_config.get("key_registers", []))
+        )
+    return RegisterModel.from_registers(device_config.get("key_registers", []))
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资源和时序估算模块
+静态扫描生成的RTL，不运行综合即可估算各模块的触发器、LUT、BRAM用量和最深的译码路径
+
+估算基于7系列FPGA的LUT6结构，只用于比较不同配置的规模和发现明显超出器件容量的配置：
+- 触发器: 在时钟沿always块中以非阻塞赋值写入的寄存器位数
+- LUT(选择): 同一寄存器有多处赋值时的多路选择器，每个LUT6实现一级4选1，
+  单一赋值加复位由触发器的使能端和复位端实现，不占用LUT
+- LUT(译码): if条件和case分支中与常量的比较，每个LUT6比较6位
+- LUTRAM/BRAM: 存储器数组深度不超过64时使用分布式RAM，否则使用块RAM
+- 译码深度: 最长的if/else优先级链长度加上嵌套case的层数
+- 逻辑级数和fmax: 比较器级数加上多路选择器级数，按每级固定延迟换算
+"""
+
+import re
+import json
+import math
+import unicodedata
+
+from artifact_writer import atomic_open
+from sv_lexer import iter_tokens
+
+# 每级LUT（含布线）的估算延迟（ns）
+LEVEL_DELAY_NS = 0.6
+
+# 时钟到输出、建立时间和时钟偏斜的固定开销（ns）
+FIXED_DELAY_NS = 1.0
+
+# 默认目标时钟频率（MHz），PCILeech的PCIe用户时钟
+DEFAULT_CLOCK_MHZ = 62.5
+
+# 深度不超过该值的存储器数组综合为分布式RAM
+LUTRAM_MAX_DEPTH = 64
+
+# BRAM18支持的(深度, 位宽)配置
+BRAM18_SHAPES = ((512, 36), (1024, 18), (2048, 9), (4096, 4), (8192, 2), (16384, 1))
+
+# 常用PCILeech板卡的FPGA器件容量
+FPGA_DEVICES = {
+    "xc7a35t": {"luts": 20800, "flops": 41600, "bram18": 100},
+    "xc7a75t": {"luts": 47200, "flops": 94400, "bram18": 210},
+    "xc7a100t": {"luts": 63400, "flops": 126800, "bram18": 270}
+}
+
+_SIZED_LITERAL = re.compile(r"^(\d+)\s*'")
+
+# 结束端口声明中名称列表的关键字
+_DECLARATION_KEYWORDS = frozenset(("input", "output", "inout", "reg", "wire", "logic"))
+
+def _display_width(text):
+    """文本的显示宽度（中文字符占两列）"""
+    return sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+
+def _pad(text, width):
+    """按显示宽度左对齐"""
+    return text + " " * max(1, width - _display_width(text))
+
+def _ceil_log(value, base):
+    """不小于log_base(value)的最小整数，value不大于1时为0"""
+    levels = 0
+    capacity = 1
+    while capacity < value:
+        capacity *= base
+        levels += 1
+    return levels
+
+def compare_luts(width):
+    """width位与常量比较所需的LUT6数量"""
+    return max(1, math.ceil((width - 1) / 5))
+
+def compare_levels(width):
+    """width位与常量比较的逻辑级数"""
+    return max(1, _ceil_log(width, 6))
+
+def mux_luts(width, inputs):
+    """width位inputs选1多路选择器所需的LUT6数量"""
+    if inputs <= 1:
+        return 0
+    return width * math.ceil((inputs - 1) / 3)
+
+def bram18_count(width, depth):
+    """width位、depth深的存储器所需的BRAM18数量，选取最省的配置"""
+    return min(math.ceil(depth / shape_depth) * math.ceil(width / shape_width)
+               for shape_depth, shape_width in BRAM18_SHAPES)
+
+def fmax_mhz(levels):
+    """按逻辑级数估算的最高时钟频率（MHz）"""
+    return 1000.0 / (FIXED_DELAY_NS + levels * LEVEL_DELAY_NS)
+
+class ModuleEstimate:
+    """单个RTL模块的资源估算"""
+
+    __slots__ = ("name", "source", "flops", "mux_luts", "decode_luts", "lutram_luts", "bram18",
+                 "decode_depth", "logic_levels", "memories")
+
+    def __init__(self, name, source=""):
+        self.name = name
+        self.source = source
+        self.flops = 0
+        self.mux_luts = 0
+        self.decode_luts = 0
+        self.lutram_luts = 0
+        self.bram18 = 0
+        self.decode_depth = 0
+        self.logic_levels = 0
+        self.memories = []
+
+    @property
+    def luts(self):
+        """LUT总数（选择、译码和分布式RAM）"""
+        return self.mux_luts + self.decode_luts + self.lutram_luts
+
+    @property
+    def fmax(self):
+        """估算的最高时钟频率（MHz）"""
+        return fmax_mhz(self.logic_levels)
+
+    def add_memory(self, name, width, depth, block=None):
+        """添加存储器
+
+        Args:
+            name: 存储器名称
+            width: 位宽
+            depth: 深度
+            block: True为块RAM，False为分布式RAM，None时按深度判断
+        """
+        if block is None:
+            block = depth > LUTRAM_MAX_DEPTH
+        if block:
+            self.bram18 += bram18_count(width, depth)
+        else:
+            self.lutram_luts += width * math.ceil(depth / 64)
+        self.memories.append({"name": name, "width": width, "depth": depth,
+                              "type": "BRAM" if block else "LUTRAM"})
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "source": self.source,
+            "flops": self.flops,
+            "luts": self.luts,
+            "mux_luts": self.mux_luts,
+            "decode_luts": self.decode_luts,
+            "lutram_luts": self.lutram_luts,
+            "bram18": self.bram18,
+            "decode_depth": self.decode_depth,
+            "logic_levels": self.logic_levels,
+            "fmax_mhz": round(self.fmax, 1),
+            "memories": self.memories
+        }
+
+class _ModuleScanner:
+    """扫描单个模块的声明和always块"""
+
+    def __init__(self, tokens, name, source):
+        self.tokens = tokens
+        self.estimate = ModuleEstimate(name, source)
+        self.params = {}
+        self.widths = {}
+        self.arrays = {}
+        self.sites = {}
+        self.flop_targets = set()
+
+    # 词法辅助
+
+    def peek(self):
+        return self.tokens.peek()
+
+    def next(self):
+        return self.tokens.next()
+
+    def skip_group(self, open_token="(", close_token=")"):
+        """跳过从当前位置开始的括号组，返回组内的词"""
+        group = []
+        depth = 0
+        while True:
+            token = self.next()
+            if token is None:
+                return group
+            if token == open_token:
+                depth += 1
+                if depth == 1:
+                    continue
+            elif token == close_token:
+                depth -= 1
+                if depth == 0:
+                    return group
+            group.append(token)
+
+    def skip_until(self, stops):
+        """跳过到括号外的stops之一（不消耗该词），返回跳过的词"""
+        skipped = []
+        depth = 0
+        while True:
+            token = self.peek()
+            if token is None or (depth == 0 and token in stops):
+                return skipped
+            if token in ("(", "[", "{"):
+                depth += 1
+            elif token in (")", "]", "}"):
+                depth -= 1
+            skipped.append(self.next())
+
+    # 表达式
+
+    def evaluate(self, tokens, default=None):
+        """计算只包含整数、参数和四则运算的常量表达式"""
+        parts = []
+        for token in tokens:
+            if token.isdigit() or token in "+-*/()":
+                parts.append("//" if token == "/" else token)
+            elif token in self.params:
+                parts.append(str(self.params[token]))
+            else:
+                literal = _parse_literal(token)
+                if literal is None:
+                    return default
+                parts.append(str(literal))
+        try:
+            return int(eval("".join(parts), {"__builtins__": {}}, {})) if parts else default
+        except Exception:
+            return default
+
+    def range_width(self, tokens):
+        """[msb:lsb]范围的位数"""
+        if ":" not in tokens:
+            return 1
+        split = tokens.index(":")
+        msb = self.evaluate(tokens[:split])
+        lsb = self.evaluate(tokens[split + 1:])
+        if msb is None or lsb is None:
+            return None
+        return abs(msb - lsb) + 1
+
+    def expression_width(self, tokens):
+        """表达式中比较操作数的位宽：带位宽的字面量、位选择或已声明信号的最大位宽"""
+        width = 0
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            match = _SIZED_LITERAL.match(token)
+            if match:
+                width = max(width, int(match.group(1)))
+            elif token[0].isalpha() or token[0] == "_":
+                if index + 1 < len(tokens) and tokens[index + 1] == "[":
+                    end = tokens.index("]", index)
+                    selected = self.range_width(tokens[index + 2:end])
+                    width = max(width, selected or 1)
+                    index = end
+                elif token in self.widths:
+                    width = max(width, self.widths[token])
+                elif token not in self.params:
+                    # 未声明的信号（例如过程块中的临时变量）按32位计算
+                    width = max(width, 32)
+            index += 1
+        return max(width, 1)
+
+    # 声明
+
+    def parameter(self):
+        """parameter/localparam声明"""
+        while True:
+            if self.peek() == "[":
+                self.skip_group("[", "]")
+            name = self.next()
+            if self.peek() == "=":
+                self.next()
+                value = self.evaluate(self.skip_until((",", ";", ")")))
+                if value is not None:
+                    self.params[name] = value
+            if self.peek() != ",":
+                return
+            self.next()
+            if self.peek() in ("parameter", "localparam"):
+                self.next()
+
+    def reg_declaration(self):
+        """reg声明，包括端口列表中的output reg"""
+        width = 1
+        if self.peek() in ("signed", "unsigned"):
+            self.next()
+        if self.peek() == "[":
+            width = self.range_width(self.skip_group("[", "]")) or 32
+        while True:
+            name = self.next()
+            if name is None:
+                return
+            depth = None
+            while self.peek() == "[":
+                depth = self.range_width(self.skip_group("[", "]"))
+            if depth is not None:
+                self.arrays[name] = (width, depth)
+            else:
+                self.widths[name] = width
+            if self.peek() == "=":
+                self.skip_until((",", ";", ")"))
+            if self.peek() != ",":
+                return
+            self.next()
+            if self.peek() in _DECLARATION_KEYWORDS:
+                return
+
+    def wire_declaration(self):
+        """wire声明，只记录位宽"""
+        width = 1
+        if self.peek() == "[":
+            width = self.range_width(self.skip_group("[", "]")) or 32
+        while True:
+            name = self.next()
+            if name is None:
+                return
+            self.widths[name] = width
+            self.skip_until((",", ";", ")"))
+            if self.peek() != ",":
+                return
+            self.next()
+            if self.peek() in _DECLARATION_KEYWORDS:
+                return
+
+    # 过程块
+
+    def always_block(self):
+        """always块：时钟沿触发的块中非阻塞赋值的目标为触发器"""
+        clocked = False
+        if self.peek() == "@":
+            self.next()
+            if self.peek() == "(":
+                sensitivity = self.skip_group()
+                clocked = "posedge" in sensitivity or "negedge" in sensitivity
+            else:
+                self.next()
+        depth, levels = self.statement(clocked)
+        self.estimate.decode_depth = max(self.estimate.decode_depth, depth)
+        self.estimate.logic_levels = max(self.estimate.logic_levels, levels)
+
+    def statement(self, clocked):
+        """解析一条语句，返回(译码深度, 逻辑级数)"""
+        token = self.peek()
+        if token is None:
+            return 0, 0
+        if token == "begin":
+            self.next()
+            if self.peek() == ":":
+                self.next()
+                self.next()
+            depth = levels = 0
+            while self.peek() not in ("end", None):
+                child_depth, child_levels = self.statement(clocked)
+                depth = max(depth, child_depth)
+                levels = max(levels, child_levels)
+            self.next()
+            if self.peek() == ":":
+                self.next()
+                self.next()
+            return depth, levels
+        if token == "if":
+            return self.if_chain(clocked)
+        if token in ("case", "casez", "casex"):
+            return self.case_statement(clocked)
+        if token in ("for", "while", "repeat"):
+            self.next()
+            self.skip_group()
+            return self.statement(clocked)
+        if token == "forever":
+            self.next()
+            return self.statement(clocked)
+        self.simple_statement(clocked)
+        return 0, 0
+
+    def if_chain(self, clocked):
+        """if/else if/else优先级链，链中的每个条件增加一级译码深度"""
+        conditions = 0
+        condition_levels = 0
+        depth = levels = 0
+        while True:
+            self.next()
+            condition = self.skip_group()
+            conditions += 1
+            if any(op in condition for op in ("==", "!=")):
+                width = self.expression_width(condition)
+                self.estimate.decode_luts += compare_luts(width)
+                condition_levels = max(condition_levels, compare_levels(width))
+            else:
+                condition_levels = max(condition_levels, 1)
+            child_depth, child_levels = self.statement(clocked)
+            depth = max(depth, child_depth)
+            levels = max(levels, child_levels)
+            if self.peek() != "else":
+                break
+            self.next()
+            if self.peek() == "if":
+                continue
+            child_depth, child_levels = self.statement(clocked)
+            depth = max(depth, child_depth)
+            levels = max(levels, child_levels)
+            break
+        # 每个LUT6可以实现两级串联的2选1优先级选择
+        return conditions + depth, condition_levels + math.ceil(conditions / 2) + levels
+
+    def case_statement(self, clocked):
+        """case语句，分支并行比较，选择器为4选1树"""
+        self.next()
+        width = self.expression_width(self.skip_group())
+        branches = 0
+        depth = levels = 0
+        while self.peek() not in ("endcase", None):
+            if self.peek() == "default":
+                self.next()
+                if self.peek() == ":":
+                    self.next()
+            else:
+                labels = self.skip_until((":",))
+                self.next()
+                self.estimate.decode_luts += compare_luts(width) * (labels.count(",") + 1)
+            branches += 1
+            child_depth, child_levels = self.statement(clocked)
+            depth = max(depth, child_depth)
+            levels = max(levels, child_levels)
+        self.next()
+        return 1 + depth, compare_levels(width) + max(1, _ceil_log(branches, 4)) + levels
+
+    def simple_statement(self, clocked):
+        """赋值或其他以分号结束的语句"""
+        tokens = self.skip_until((";",))
+        self.next()
+        if len(tokens) < 2:
+            return
+        target = tokens[0]
+        index = 1
+        if tokens[1] == "[":
+            index = tokens.index("]") + 1 if "]" in tokens else len(tokens)
+        if index >= len(tokens) or tokens[index] not in ("<=", "="):
+            return
+        self.sites[target] = self.sites.get(target, 0) + 1
+        if clocked and tokens[index] == "<=":
+            self.flop_targets.add(target)
+
+    # 模块
+
+    def scan(self):
+        """扫描到endmodule，返回ModuleEstimate"""
+        while True:
+            token = self.next()
+            if token is None or token == "endmodule":
+                break
+            if token in ("parameter", "localparam"):
+                self.parameter()
+            elif token == "reg":
+                self.reg_declaration()
+            elif token == "wire":
+                self.wire_declaration()
+            elif token == "always":
+                self.always_block()
+            elif token == "initial":
+                self.statement(False)
+            elif token == "assign":
+                self.skip_until((";",))
+
+        estimate = self.estimate
+        for name in self.flop_targets:
+            if name in self.widths:
+                estimate.flops += self.widths[name]
+        for name, sites in self.sites.items():
+            if name in self.widths:
+                # 触发器的复位赋值由FDRE的同步复位端实现，不占用选择器输入
+                if name in self.flop_targets:
+                    sites -= 1
+                estimate.mux_luts += mux_luts(self.widths[name], sites)
+        for name, (width, depth) in self.arrays.items():
+            if width and depth:
+                estimate.add_memory(name, width, depth)
+        return estimate
+
+def _parse_literal(token):
+    """将SV数值字面量解析为整数，无法解析时返回None"""
+    match = re.match(r"^(\d*)\s*'[sS]?([bBoOdDhH])\s*([0-9a-fA-F_]+)$", token)
+    if match is None:
+        return None
+    radix = {"b": 2, "o": 8, "d": 10, "h": 16}[match.group(2).lower()]
+    try:
+        return int(match.group(3).replace("_", ""), radix)
+    except ValueError:
+        return None
+
+class _TokenStream:
+    """从文本片段流中逐个取词，支持向前看一个词"""
+
+    def __init__(self, chunks):
+        self._tokens = (token for _, token in iter_tokens(chunks))
+        self._lookahead = next(self._tokens, None)
+
+    def peek(self):
+        return self._lookahead
+
+    def next(self):
+        token = self._lookahead
+        self._lookahead = next(self._tokens, None)
+        return token
+
+def scan_rtl(chunks, source=""):
+    """扫描RTL文本，估算其中每个模块的资源
+
+    Args:
+        chunks: 文本或文本片段的可迭代对象（例如生成器的流式渲染结果）
+        source: 来源文件名，记录在结果中
+
+    Returns:
+        ModuleEstimate列表，不含模块的文件（例如宏定义头文件）返回空列表
+    """
+    tokens = _TokenStream(chunks)
+    modules = []
+    while tokens.peek() is not None:
+        if tokens.next() == "module":
+            modules.append(_ModuleScanner(tokens, tokens.next(), source).scan())
+    return modules
+
+class ResourceEstimate:
+    """一个配置的所有RTL模块的资源估算"""
+
+    def __init__(self, device_name="", clock_mhz=DEFAULT_CLOCK_MHZ):
+        self.device_name = device_name
+        self.clock_mhz = clock_mhz
+        self.modules = []
+
+    def __iter__(self):
+        return iter(self.modules)
+
+    def add(self, modules):
+        """添加scan_rtl()返回的模块估算"""
+        self.modules.extend(modules)
+
+    def total(self, field):
+        """各模块某项资源的合计"""
+        return sum(getattr(module, field) for module in self.modules)
+
+    @property
+    def worst(self):
+        """逻辑级数最多的模块，没有模块时为None"""
+        return max(self.modules, key=lambda module: module.logic_levels, default=None)
+
+    def utilization(self, part):
+        """相对器件容量的占用比例 {"luts": 比例, "flops": 比例, "bram18": 比例}"""
+        capacity = FPGA_DEVICES[part]
+        return {field: self.total(field) / capacity[field] for field in capacity}
+
+    def to_dict(self, part=None):
+        data = {
+            "device": self.device_name,
+            "clock_mhz": self.clock_mhz,
+            "modules": [module.to_dict() for module in self.modules],
+            "total": {field: self.total(field) for field in
+                      ("flops", "luts", "mux_luts", "decode_luts", "lutram_luts", "bram18")}
+        }
+        if part:
+            data["part"] = part
+            data["utilization"] = self.utilization(part)
+        return data
+
+    def save(self, path, part=None):
+        """保存为JSON文件"""
+        with atomic_open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(part), f, indent=2, ensure_ascii=False)
+
+    def summary_lines(self, part=None):
+        """估算结果的文本表格，命令行和图形界面共用"""
+        name_width = max([_display_width(module.name) for module in self.modules] + [8]) + 2
+        lines = [_pad("模块", name_width) + f"{'触发器':>7}{'LUT':>9}{'BRAM18':>9}{'译码深度':>8}"
+                 f"{'逻辑级数':>8}{'fmax(MHz)':>11}"]
+        for module in self.modules:
+            warning = " ⚠️" if module.fmax < self.clock_mhz else ""
+            lines.append(_pad(module.name, name_width) + f"{module.flops:>10}{module.luts:>9}{module.bram18:>9}"
+                         f"{module.decode_depth:>12}{module.logic_levels:>12}{module.fmax:>11.1f}{warning}")
+        lines.append(_pad("合计", name_width) + f"{self.total('flops'):>10}{self.total('luts'):>9}"
+                     f"{self.total('bram18'):>9}")
+        lines.append(f"LUT明细: 选择 {self.total('mux_luts')}, 译码 {self.total('decode_luts')}, "
+                     f"分布式RAM {self.total('lutram_luts')}")
+
+        worst = self.worst
+        if worst is not None:
+            status = "✅" if worst.fmax >= self.clock_mhz else "⚠️"
+            lines.append(f"{status} 最长路径: {worst.name} ({worst.logic_levels}级, 约 {worst.fmax:.1f} MHz, "
+                         f"目标 {self.clock_mhz:g} MHz)")
+        if part:
+            utilization = self.utilization(part)
+            status = "✅" if max(utilization.values()) <= 1 else "❌"
+            lines.append(f"{status} {part}占用: LUT {utilization['luts'] * 100:.1f}%, "
+                         f"触发器 {utilization['flops'] * 100:.1f}%, BRAM {utilization['bram18'] * 100:.1f}%")
+        return lines
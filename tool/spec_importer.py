@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+寄存器规格导入模块
+将厂商寄存器规格（CSV表格、IP-XACT XML和SystemRDL子集）转换为
+设备配置的key_registers/bit_fields格式
+
+三种解析器都是流式的：逐行或逐个元素读取输入，每解析完一个寄存器就产生一次，
+已处理的XML元素随即释放，几MB的规格文件解析时内存占用不随文件大小增长
+"""
+
+import csv
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+
+from register_model import parse_constant, normalize_access
+from sv_lexer import Tokenizer
+
+# 支持的规格格式及其扩展名
+SPEC_FORMATS = {
+    "csv": (".csv", ".tsv"),
+    "ipxact": (".xml", ".ipxact", ".spirit"),
+    "rdl": (".rdl",)
+}
+
+# 读取规格文件时每次读取的字符数
+READ_CHUNK_SIZE = 1 << 16
+
+class SpecImportError(ValueError):
+    """规格文件格式错误"""
+
+def parse_number(text):
+    """解析规格中的数值：0x10、16'h10、'b101和十进制数
+
+    Raises:
+        ValueError: 无法解析
+    """
+    if isinstance(text, int):
+        return text
+    text = str(text).strip()
+    if not text:
+        raise ValueError("数值为空")
+    if "'" in text:
+        value = parse_constant(text)
+        if value is None:
+            raise ValueError(f"无法解析的数值: {text}")
+        return value
+    text = text.replace("_", "")
+    # 十进制数允许前导零
+    return int(text, 0) if text[:2].lower() in ("0x", "0b", "0o") else int(text)
+
+def _format_address(address):
+    return f"0x{address:04X}"
+
+def _format_reset(value, width):
+    """将复位值转换为寄存器配置使用的SV字面量，无法解析时原样保留"""
+    if value in (None, ""):
+        return None
+    try:
+        number = parse_number(value)
+    except ValueError:
+        return str(value).strip()
+    return f"{width}'h{number & ((1 << width) - 1):0{(width + 3) // 4}X}"
+
+def make_bit_field(name, msb, lsb, access=None, description=""):
+    """构建bit_fields中的一项，单个位使用bit写法"""
+    if msb == lsb:
+        field = {"name": name, "bit": lsb}
+    else:
+        field = {"name": name, "msb": msb, "lsb": lsb}
+    if access:
+        field["access"] = normalize_access(access)
+    if description:
+        field["description"] = description
+    return field
+
+def make_register(name, address, width=32, access=None, reset=None, description="", bit_fields=()):
+    """构建key_registers中的一项"""
+    register = {"addr": _format_address(address) if isinstance(address, int) else address, "name": name}
+    if width != 32:
+        register["width"] = width
+    register["access"] = normalize_access(access)
+    value = _format_reset(reset, width)
+    if value is not None:
+        register["value"] = value
+    if description:
+        register["description"] = description
+    if bit_fields:
+        # 数组展开的寄存器共用同一组位域定义，各自保存副本以便单独编辑
+        register["bit_fields"] = [dict(field) for field in bit_fields]
+    return register
+
+def _open_text(source):
+    """以文本方式打开规格文件，已打开的文件对象原样返回"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "r", encoding="utf-8-sig", newline="")
+    return source
+
+# ==========================================================================
+# CSV
+# ==========================================================================
+
+# CSV列名别名（比较时忽略大小写、空格和连字符）
+CSV_REGISTER_COLUMNS = {
+    "name": ("register", "register_name", "reg_name", "reg", "寄存器", "寄存器名称", "name"),
+    "address": ("address", "addr", "offset", "address_offset", "地址", "偏移"),
+    "width": ("width", "size", "register_width", "reg_width", "宽度"),
+    "access": ("access", "register_access", "reg_access", "访问", "访问类型"),
+    "reset": ("reset", "reset_value", "value", "default", "复位值", "默认值"),
+    "description": ("description", "desc", "register_description", "描述", "说明")
+}
+
+CSV_FIELD_COLUMNS = {
+    "name": ("field", "field_name", "bitfield", "bit_field", "位域", "位域名称"),
+    "bits": ("bits", "bit_range", "field_bits", "位", "位范围"),
+    "msb": ("msb", "bit_msb"),
+    "lsb": ("lsb", "bit_lsb", "bit_offset"),
+    "width": ("field_width", "bit_width"),
+    "access": ("field_access",),
+    "description": ("field_description", "field_desc", "位域描述")
+}
+
+def _column_key(name):
+    return re.sub(r"[\s\-]+", "_", name.strip().lower())
+
+def _map_columns(header, aliases, taken):
+    """按别名顺序为每个字段选择列序号，已被占用的列不再使用"""
+    positions = {_column_key(name): index for index, name in enumerate(header)}
+    mapping = {}
+    for key, names in aliases.items():
+        for name in names:
+            index = positions.get(name)
+            if index is not None and index not in taken:
+                mapping[key] = index
+                taken.add(index)
+                break
+    return mapping
+
+def _parse_bit_range(text):
+    """解析"7:4"、"[7:4]"或"3"形式的位范围"""
+    text = text.strip().strip("[]")
+    if ":" in text:
+        high, low = (parse_number(part) for part in text.split(":", 1))
+        return max(high, low), min(high, low)
+    bit = parse_number(text)
+    return bit, bit
+
+def iter_csv_registers(source, delimiter=None):
+    """流式解析CSV寄存器表
+
+    每行描述一个寄存器或一个位域：寄存器名称或地址与上一行不同的行开始一个新寄存器，
+    其余行属于前一个寄存器，因此每行重复寄存器列或只填位域列的表格都可以导入。
+    没有地址列的寄存器按宽度顺序排列，地址为auto的寄存器留待地址自动分配
+
+    Args:
+        source: 文件路径或文本文件对象
+        delimiter: 分隔符，为None时.tsv使用制表符，其余使用逗号
+
+    Yields:
+        key_registers格式的寄存器字典
+    """
+    if delimiter is None:
+        delimiter = "\t" if str(source).lower().endswith(".tsv") else ","
+    handle = _open_text(source)
+    try:
+        reader = csv.reader(handle, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        taken = set()
+        # 位域列先匹配，通用的name/description列留给寄存器
+        fields = _map_columns(header, CSV_FIELD_COLUMNS, taken)
+        columns = _map_columns(header, CSV_REGISTER_COLUMNS, taken)
+        if "address" not in columns and "name" not in columns:
+            raise SpecImportError("CSV缺少寄存器名称或地址列")
+
+        def cell(row, mapping, key):
+            index = mapping.get(key)
+            if index is None or index >= len(row):
+                return ""
+            return row[index].strip()
+
+        current = None
+        current_key = None
+        next_address = 0
+        for line, row in enumerate(reader, 2):
+            if not any(value.strip() for value in row):
+                continue
+            try:
+                name = cell(row, columns, "name")
+                address = cell(row, columns, "address")
+                key = (name or current_key[0], address or current_key[1]) if current_key else (name, address)
+                if current is None or key != current_key:
+                    current_key = key
+                    if current is not None:
+                        yield make_register(**current)
+                    width = parse_number(cell(row, columns, "width") or 32)
+                    if address.lower() == "auto":
+                        start = "auto"
+                    else:
+                        start = parse_number(address) if address else next_address
+                        next_address = start + max(1, width // 8)
+                    current = {
+                        "name": name or (f"REG_{start:04X}" if isinstance(start, int) else f"REG_LINE{line}"),
+                        "address": start,
+                        "width": width,
+                        "access": cell(row, columns, "access") or None,
+                        "reset": cell(row, columns, "reset") or None,
+                        "description": cell(row, columns, "description"),
+                        "bit_fields": []
+                    }
+                field_name = cell(row, fields, "name")
+                if not field_name:
+                    continue
+                bits = cell(row, fields, "bits")
+                if bits:
+                    msb, lsb = _parse_bit_range(bits)
+                else:
+                    lsb = parse_number(cell(row, fields, "lsb") or 0)
+                    msb_text = cell(row, fields, "msb")
+                    if msb_text:
+                        msb = parse_number(msb_text)
+                    else:
+                        msb = lsb + parse_number(cell(row, fields, "width") or 1) - 1
+                current["bit_fields"].append(make_bit_field(
+                    field_name, msb, lsb, cell(row, fields, "access") or None, cell(row, fields, "description")
+                ))
+            except (ValueError, KeyError) as e:
+                raise SpecImportError(f"CSV第{line}行: {str(e)}") from e
+        if current is not None:
+            yield make_register(**current)
+    finally:
+        if handle is not source:
+            handle.close()
+
+# ==========================================================================
+# IP-XACT
+# ==========================================================================
+
+# IP-XACT访问类型（modifiedWriteValue/readAction优先）
+_IPXACT_ACCESS = {
+    "read-write": "RW",
+    "read-only": "RO",
+    "write-only": "WO",
+    "read-writeonce": "RW",
+    "writeonce": "WO"
+}
+
+_IPXACT_WRITE_ACTIONS = {"oneToClear": "W1C", "oneToSet": "W1S"}
+
+def _local_name(tag):
+    """去掉XML命名空间（spirit、ipxact等版本通用）"""
+    return tag.rsplit("}", 1)[-1]
+
+def _child_text(element, name, default=""):
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or "").strip()
+    return default
+
+def _ipxact_access(element, default=None):
+    write_action = _child_text(element, "modifiedWriteValue")
+    if write_action in _IPXACT_WRITE_ACTIONS:
+        return _IPXACT_WRITE_ACTIONS[write_action]
+    if _child_text(element, "readAction") == "clear":
+        return "RC"
+    access = _child_text(element, "access")
+    return _IPXACT_ACCESS.get(access.lower(), default) if access else default
+
+def _ipxact_reset(element):
+    """IP-XACT 1685-2009的reset/value和1685-2014的resets/reset/value"""
+    for child in element:
+        tag = _local_name(child.tag)
+        if tag == "reset":
+            return _child_text(child, "value") or None
+        if tag == "resets":
+            for reset in child:
+                if _local_name(reset.tag) == "reset":
+                    return _child_text(reset, "value") or None
+    return None
+
+def iter_ipxact_registers(source):
+    """流式解析IP-XACT（IEEE 1685-2009/2014）中的寄存器
+
+    寄存器地址为所在addressBlock的baseAddress加各级registerFile的addressOffset
+    再加寄存器的addressOffset，registerFile中的寄存器名称加上registerFile名称前缀。
+    dim声明的寄存器数组按addressIncrement或寄存器宽度展开，
+    registerFile数组按addressIncrement或range展开
+
+    Args:
+        source: 文件路径或二进制文件对象
+
+    Yields:
+        key_registers格式的寄存器字典
+    """
+    stack = []
+    register_files = []
+    block_base = 0
+    try:
+        for event, element in ElementTree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if _local_name(element.tag) == "registerFile":
+                    register_files.append({"name": "", "offset": 0, "dims": [], "increment": None, "range": None})
+                stack.append(element)
+                continue
+            stack.pop()
+            tag = _local_name(element.tag)
+            parent = _local_name(stack[-1].tag) if stack else None
+            if tag == "baseAddress" and parent == "addressBlock":
+                block_base = parse_number(element.text or "0")
+            elif tag == "addressBlock":
+                block_base = 0
+            elif parent == "registerFile" and tag in _IPXACT_REGISTER_FILE_KEYS:
+                _set_register_file_key(register_files[-1], tag, element.text)
+            elif tag == "registerFile":
+                register_files.pop()
+                if parent in ("addressBlock", "registerFile"):
+                    stack[-1].remove(element)
+            elif tag == "register" and parent in ("addressBlock", "registerFile"):
+                yield from _ipxact_register(element, _register_file_bases(register_files, block_base))
+                # 释放已处理的寄存器，父元素不再保留对它的引用
+                stack[-1].remove(element)
+    except ElementTree.ParseError as e:
+        raise SpecImportError(f"IP-XACT解析失败: {str(e)}") from e
+
+# registerFile中决定其中寄存器地址和名称的子元素
+_IPXACT_REGISTER_FILE_KEYS = ("name", "addressOffset", "dim", "addressIncrement", "range")
+
+def _set_register_file_key(register_file, tag, text):
+    text = (text or "").strip()
+    if tag == "name":
+        register_file["name"] = text
+    elif tag == "addressOffset":
+        register_file["offset"] = parse_number(text or "0")
+    elif tag == "dim":
+        register_file["dims"].append(parse_number(text))
+    elif tag == "addressIncrement":
+        register_file["increment"] = parse_number(text)
+    else:
+        register_file["range"] = parse_number(text)
+
+def _register_file_bases(register_files, block_base):
+    """展开各级registerFile（含dim数组），返回[(基地址, 名称前缀)]"""
+    bases = [(block_base, "")]
+    for register_file in register_files:
+        count = 1
+        for dim in register_file["dims"]:
+            count *= dim
+        stride = register_file["increment"] or register_file["range"]
+        name = register_file["name"]
+        if count > 1 and not stride:
+            raise SpecImportError(f"registerFile {name}声明了dim但没有addressIncrement或range")
+        bases = [
+            (base + register_file["offset"] + index * (stride or 0),
+             prefix + (f"{name}{index}_" if count > 1 else f"{name}_"))
+            for base, prefix in bases
+            for index in range(count)
+        ]
+    return bases
+
+def _ipxact_register(element, bases):
+    name = _child_text(element, "name")
+    width = parse_number(_child_text(element, "size", "32"))
+    offset = parse_number(_child_text(element, "addressOffset", "0"))
+    access = _ipxact_access(element)
+    reset = _ipxact_reset(element)
+    description = _child_text(element, "description")
+
+    bit_fields = []
+    for child in element:
+        if _local_name(child.tag) != "field":
+            continue
+        lsb = parse_number(_child_text(child, "bitOffset", "0"))
+        msb = lsb + parse_number(_child_text(child, "bitWidth", "1")) - 1
+        bit_fields.append(make_bit_field(
+            _child_text(child, "name"), msb, lsb, _ipxact_access(child, access), _child_text(child, "description")
+        ))
+
+    dim = _child_text(element, "dim")
+    count = parse_number(dim) if dim else 1
+    increment = parse_number(_child_text(element, "addressIncrement") or max(1, width // 8))
+    for base, prefix in bases:
+        for index in range(count):
+            yield make_register(
+                f"{prefix}{name}{index}" if count > 1 else prefix + name, base + offset + index * increment,
+                width, access, reset, description, bit_fields
+            )
+
+# ==========================================================================
+# SystemRDL子集
+# ==========================================================================
+
+# SystemRDL的sw属性和onread/onwrite属性对应的访问类型
+_RDL_SW_ACCESS = {"rw": "RW", "wr": "RW", "r": "RO", "w": "WO", "na": "RO"}
+_RDL_ACTION_ACCESS = {"woclr": "W1C", "woset": "W1S", "rclr": "RC"}
+
+class _RdlParser:
+    """SystemRDL子集的递归下降解析器
+
+    支持addrmap/regfile/reg/field的匿名和具名定义及实例化（@地址、+=地址增量、
+    %=对齐、[N]数组）、字段位置（[msb:lsb]、[宽度]或按顺序排列）和字段复位值，
+    以及desc/name/sw/onread/onwrite/regwidth/fieldwidth/reset属性。
+    其余属性、default、enum、property等语句会被跳过
+
+    没有被其他组件实例化的顶层addrmap定义为根，地址从0开始。
+    regfile和嵌套addrmap中的寄存器名称加上实例名前缀
+    """
+
+    COMPONENTS = ("addrmap", "regfile", "reg", "field")
+    SKIPPED_STATEMENTS = ("default", "property", "enum", "signal", "mem", "constraint", "alias")
+    MODIFIERS = ("external", "internal")
+
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+        self._lookahead = []
+        self.line = 0
+        self._types = {}
+        self._used = set()
+
+    # 词流
+
+    def _next(self):
+        if self._lookahead:
+            return self._lookahead.pop()
+        item = next(self._tokens, None)
+        if item is None:
+            return None
+        self.line, token = item
+        return token
+
+    def _peek(self):
+        lookahead = self._lookahead
+        if not lookahead:
+            lookahead.append(self._next())
+        return lookahead[-1]
+
+    def _error(self, message):
+        return SpecImportError(f"SystemRDL第{self.line}行: {message}")
+
+    def _expect(self, expected):
+        token = self._next()
+        if token != expected:
+            raise self._error(f"应为{expected}，实际为{token}")
+
+    def _skip_statement(self):
+        """跳过到分号为止的语句（含大括号中的内容）"""
+        depth = 0
+        while True:
+            token = self._next()
+            if token is None:
+                return
+            if token == "{":
+                depth += 1
+            elif token == "}":
+                depth -= 1
+            elif token == ";" and depth <= 0:
+                return
+
+    def _value(self):
+        """属性值：数值、字符串或标识符（含true/false和rw等枚举值）"""
+        token = self._next()
+        if token is None:
+            raise self._error("文件意外结束")
+        if token[0] == '"':
+            return token[1:-1].replace('\\"', '"')
+        if token[0].isdigit() or token[0] == "'":
+            try:
+                return parse_number(token)
+            except ValueError as e:
+                raise self._error(str(e)) from e
+        return token
+
+    # 语法
+
+    def parse(self):
+        """解析整个文件，依次产生(绝对地址, 寄存器名称, 寄存器属性)"""
+        roots = []
+        while self._peek() is not None:
+            token = self._next()
+            if token in self.MODIFIERS:
+                continue
+            if token in self.COMPONENTS:
+                kind, name, body, instances = self._component(token)
+                if instances:
+                    yield from self._expand([(kind, body, instances)], 0, [0], "")
+                elif kind == "addrmap" and name:
+                    roots.append(name)
+            elif token in self._types:
+                self._used.add(token)
+                kind, body = self._types[token]
+                yield from self._expand([(kind, body, self._instance_list(kind))], 0, [0], "")
+            else:
+                self._skip_statement()
+        for name in roots:
+            if name not in self._used:
+                # 根addrmap的寄存器名称不加前缀
+                _, (_, children) = self._types[name]
+                yield from self._expand(children, 0, [0], "")
+
+    def _component(self, kind):
+        """解析组件定义及其后的实例列表，具名定义没有实例时记录为类型"""
+        name = None
+        if self._peek() != "{":
+            name = self._next()
+        body = self._body(kind)
+        if self._peek() == ";":
+            self._next()
+            if name is not None:
+                self._types[name] = (kind, body)
+            return kind, name, body, None
+        return kind, name, body, self._instance_list(kind)
+
+    def _body(self, kind):
+        """解析组件体，返回(属性字典, [(子组件类型, 定义体, 实例列表)])"""
+        self._expect("{")
+        properties = {}
+        children = []
+        while True:
+            token = self._next()
+            if token is None:
+                raise self._error(f"{kind}缺少右大括号")
+            if token == "}":
+                return properties, children
+            if token in self.MODIFIERS:
+                continue
+            if token in self.COMPONENTS:
+                child_kind, _, body, instances = self._component(token)
+                if instances:
+                    children.append((child_kind, body, instances))
+            elif token in self._types:
+                self._used.add(token)
+                child_kind, body = self._types[token]
+                children.append((child_kind, body, self._instance_list(child_kind)))
+            elif token in self.SKIPPED_STATEMENTS:
+                self._skip_statement()
+            elif self._peek() == "=":
+                self._next()
+                properties[token] = self._value()
+                self._skip_statement()
+            elif self._peek() == ";":
+                self._next()
+                properties[token] = True
+            else:
+                # 动态属性赋值（inst->prop = value）等不支持的语句
+                self._skip_statement()
+
+    @staticmethod
+    def _instance(name):
+        return {"name": name, "count": 1, "address": None, "stride": None, "align": None,
+                "msb": None, "lsb": None, "width": None, "reset": None}
+
+    def _instance_list(self, kind):
+        """解析实例列表: name[N] @addr +=stride %=align, ...;"""
+        instances = []
+        while True:
+            instance = self._instance(self._next())
+            while True:
+                token = self._next()
+                if token == "[":
+                    first = self._value()
+                    if self._peek() == ":":
+                        self._next()
+                        second = self._value()
+                        instance["msb"], instance["lsb"] = max(first, second), min(first, second)
+                    elif kind == "field":
+                        instance["width"] = first
+                    else:
+                        instance["count"] = first
+                    self._expect("]")
+                elif token == "@":
+                    instance["address"] = self._value()
+                elif token in ("+", "%"):
+                    self._expect("=")
+                    instance["stride" if token == "+" else "align"] = self._value()
+                elif token == "=":
+                    instance["reset"] = self._value()
+                elif token == ";":
+                    instances.append(instance)
+                    return instances
+                elif token == ",":
+                    instances.append(instance)
+                    break
+                else:
+                    raise self._error(f"实例{instance['name']}的声明中出现了无法识别的{token}")
+
+    def _expand(self, children, base, cursor, prefix):
+        """展开子组件实例，产生(绝对地址, 寄存器名称, 寄存器属性)
+
+        Args:
+            children: [(组件类型, 定义体, 实例列表)]
+            base: 所在组件的绝对基地址
+            cursor: [所在组件内下一个可用的相对地址]，展开后更新
+            prefix: 寄存器名称前缀
+        """
+        for kind, (properties, grandchildren), instances in children:
+            if kind == "field":
+                continue
+            for instance in instances:
+                address = instance["address"]
+                if address is None:
+                    address = cursor[0]
+                    align = instance["align"]
+                    if align:
+                        address = (address + align - 1) // align * align
+                count = instance["count"]
+                stride = instance["stride"]
+                name = prefix + instance["name"]
+                if kind == "reg":
+                    register = self._register(properties, grandchildren)
+                    size = max(1, register["width"] // 8)
+                    stride = stride or size
+                    for index in range(count):
+                        yield (base + address + index * stride, f"{name}{index}" if count > 1 else name,
+                               register)
+                    cursor[0] = max(cursor[0], address + (count - 1) * stride + size)
+                    continue
+                end = address
+                for index in range(count):
+                    inner = [0]
+                    start = address + index * (stride or 0)
+                    yield from self._expand(grandchildren, base + start, inner,
+                                            f"{name}{index}_" if count > 1 else f"{name}_")
+                    # 未指定增量的数组按单个实例占用的大小排列
+                    stride = stride or max(1, inner[0])
+                    end = start + inner[0]
+                cursor[0] = max(cursor[0], end)
+
+    def _register(self, properties, children):
+        """根据寄存器定义体生成寄存器属性：宽度、访问类型、复位值、描述和位域"""
+        width = int(properties.get("regwidth", 32))
+        reset = 0
+        has_reset = False
+        fields = []
+        next_bit = 0
+        for kind, (field_properties, _), instances in children:
+            if kind != "field":
+                continue
+            access = _RDL_SW_ACCESS.get(str(field_properties.get("sw", "rw")).lower(), "RW")
+            for action in ("onwrite", "onread"):
+                access = _RDL_ACTION_ACCESS.get(str(field_properties.get(action, "")).lower(), access)
+            description = field_properties.get("desc") or field_properties.get("name") or ""
+            for instance in instances:
+                if instance["lsb"] is not None:
+                    msb, lsb = instance["msb"], instance["lsb"]
+                else:
+                    lsb = next_bit
+                    msb = lsb + int(instance["width"] or field_properties.get("fieldwidth", 1)) - 1
+                next_bit = msb + 1
+                field_reset = instance["reset"]
+                if field_reset is None:
+                    field_reset = field_properties.get("reset")
+                if isinstance(field_reset, int) and not isinstance(field_reset, bool):
+                    reset |= (field_reset & ((1 << (msb - lsb + 1)) - 1)) << lsb
+                    has_reset = True
+                fields.append(make_bit_field(instance["name"], msb, lsb, access, description))
+        accesses = {field.get("access") for field in fields}
+        return {
+            "width": width,
+            "access": accesses.pop() if len(accesses) == 1 else None,
+            "reset": reset if has_reset else None,
+            "description": properties.get("desc") or properties.get("name") or "",
+            "bit_fields": fields
+        }
+
+def _iter_file_tokens(source):
+    """逐块读取文件并分词，产生(行号, 词)"""
+    handle = _open_text(source)
+    try:
+        tokenizer = Tokenizer()
+        while True:
+            chunk = handle.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield from tokenizer.feed(chunk)
+        yield from tokenizer.close()
+    finally:
+        if handle is not source:
+            handle.close()
+
+def iter_rdl_registers(source):
+    """流式解析SystemRDL子集中的寄存器
+
+    根addrmap之外实例化的寄存器解析完成后立即产生；具名类型定义保留到文件结束，
+    根addrmap在文件结束时展开
+
+    Args:
+        source: 文件路径或文本文件对象
+
+    Yields:
+        key_registers格式的寄存器字典
+    """
+    for address, name, register in _RdlParser(_iter_file_tokens(source)).parse():
+        yield make_register(name, address, **register)
+
+# ==========================================================================
+# 入口
+# ==========================================================================
+
+_PARSERS = {
+    "csv": iter_csv_registers,
+    "ipxact": iter_ipxact_registers,
+    "rdl": iter_rdl_registers
+}
+
+def detect_format(path):
+    """根据扩展名判断规格格式"""
+    lower = str(path).lower()
+    for spec_format, extensions in SPEC_FORMATS.items():
+        if lower.endswith(extensions):
+            return spec_format
+    raise SpecImportError(f"无法根据扩展名判断规格格式: {path}（支持{', '.join(SPEC_FORMATS)}）")
+
+def iter_spec_registers(path, spec_format=None):
+    """流式解析寄存器规格文件，依次产生key_registers格式的寄存器字典
+
+    Args:
+        path: 规格文件路径
+        spec_format: "csv"、"ipxact"或"rdl"，为None时根据扩展名判断
+    """
+    spec_format = spec_format or detect_format(path)
+    if spec_format not in _PARSERS:
+        raise SpecImportError(f"不支持的规格格式: {spec_format}")
+    return _PARSERS[spec_format](path)
+
+def import_registers(device_config, path, spec_format=None, replace=False):
+    """将规格文件中的寄存器导入设备配置的key_registers
+
+    Args:
+        device_config: 可修改的设备配置
+        path: 规格文件路径
+        spec_format: 规格格式，为None时根据扩展名判断
+        replace: 为True时替换已有寄存器，否则追加
+
+    Returns:
+        导入的寄存器数
+
+    Raises:
+        SpecImportError: 规格文件格式错误
+        OSError: 无法读取文件
+    """
+    registers = [] if replace else list(device_config.get("key_registers", []))
+    count = len(registers)
+    registers.extend(iter_spec_registers(path, spec_format))
+    # 全部解析成功后才写回，解析失败时配置保持不变
+    device_config["key_registers"] = registers
+    return len(registers) - count
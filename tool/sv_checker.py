@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SystemVerilog结构检查模块
+在生成过程中快速检查生成的RTL，不需要调用仿真器或综合工具
+
+检查内容：
+- begin/end、case/endcase、module/endmodule等块结构以及括号是否配对
+- `ifdef/`ifndef/`endif是否配对
+- 标识符是否先声明后使用（模块内的信号、参数、函数和实例）
+- 同一编译单元中的宏和模块是否重复定义
+- 模块名、宏名和信号名是否为合法的ASCII标识符
+
+检查器只处理生成代码中使用的语法子集，不替代综合工具的完整语法检查
+"""
+
+from sv_lexer import Tokenizer, is_identifier
+
+# 单个文件最多记录的问题数，超过后不再记录
+MAX_ISSUES = 50
+
+# 块结束词 -> 可配对的块开始词
+_BLOCK_CLOSERS = {
+    "end": ("begin",),
+    "endcase": ("case", "casez", "casex"),
+    "endmodule": ("module",),
+    "endpackage": ("package",),
+    "endfunction": ("function",),
+    "endtask": ("task",),
+    "endgenerate": ("generate",),
+    "join": ("fork",),
+    "join_any": ("fork",),
+    "join_none": ("fork",),
+    ")": ("(",),
+    "]": ("[",),
+    "}": ("{",)
+}
+
+_BLOCK_OPENERS = frozenset(("begin", "case", "casez", "casex", "module", "package", "function", "task",
+                            "generate", "fork", "(", "[", "{"))
+
+# 开始声明的关键字，其后（方括号和初始值之外）的标识符为新声明的名称
+_DECLARATION_KEYWORDS = frozenset((
+    "input", "output", "inout", "reg", "wire", "logic", "integer", "genvar", "parameter", "localparam",
+    "real", "time", "bit", "byte", "int", "shortint", "longint", "event", "function", "task", "typedef"
+))
+
+# 作用域（模块和包），其中的标识符须先声明后使用
+_SCOPE_KEYWORDS = frozenset(("module", "package"))
+
+# 其后直到行尾都属于指令参数的编译指令
+_LINE_DIRECTIVES = frozenset(("`include", "`timescale", "`default_nettype", "`resetall", "`celldefine",
+                              "`endcelldefine", "`line", "`pragma"))
+
+# 条件编译指令
+_CONDITIONAL_DIRECTIVES = frozenset(("`ifdef", "`ifndef", "`elsif", "`else", "`endif"))
+
+# IEEE 1800保留字（不能用作标识符，也不是信号引用）
+SV_KEYWORDS = frozenset((
+    "alias", "always", "always_comb", "always_ff", "always_latch", "and", "assert", "assign", "assume",
+    "automatic", "before", "begin", "bind", "bins", "binsof", "bit", "break", "buf", "bufif0", "bufif1",
+    "byte", "case", "casex", "casez", "cell", "chandle", "checker", "class", "clocking", "cmos", "config",
+    "const", "constraint", "context", "continue", "cover", "covergroup", "coverpoint", "cross", "deassign",
+    "default", "defparam", "design", "disable", "dist", "do", "edge", "else", "end", "endcase",
+    "endchecker", "endclass", "endclocking", "endconfig", "endfunction", "endgenerate", "endgroup",
+    "endinterface", "endmodule", "endpackage", "endprimitive", "endprogram", "endproperty",
+    "endspecify", "endsequence", "endtable", "endtask", "enum", "event", "eventually", "expect",
+    "export", "extends", "extern", "final", "first_match", "for", "force", "foreach", "forever", "fork",
+    "forkjoin", "function", "generate", "genvar", "global", "highz0", "highz1", "if", "iff", "ifnone",
+    "ignore_bins", "illegal_bins", "implements", "implies", "import", "incdir", "include", "initial",
+    "inout", "input", "inside", "instance", "int", "integer", "interconnect", "interface", "intersect",
+    "join", "join_any", "join_none", "large", "let", "liblist", "library", "local", "localparam",
+    "logic", "longint", "macromodule", "matches", "medium", "modport", "module", "nand", "negedge",
+    "nettype", "new", "nexttime", "nmos", "nor", "noshowcancelled", "not", "notif0", "notif1", "null",
+    "or", "output", "package", "packed", "parameter", "pmos", "posedge", "primitive", "priority",
+    "program", "property", "protected", "pull0", "pull1", "pulldown", "pullup", "pulsestyle_ondetect",
+    "pulsestyle_onevent", "pure", "rand", "randc", "randcase", "randsequence", "rcmos", "real",
+    "realtime", "ref", "reg", "reject_on", "release", "repeat", "restrict", "return", "rnmos", "rpmos",
+    "rtran", "rtranif0", "rtranif1", "s_always", "s_eventually", "s_nexttime", "s_until",
+    "s_until_with", "scalared", "sequence", "shortint", "shortreal", "showcancelled", "signed",
+    "small", "soft", "solve", "specify", "specparam", "static", "string", "strong", "strong0",
+    "strong1", "struct", "super", "supply0", "supply1", "sync_accept_on", "sync_reject_on", "table",
+    "tagged", "task", "this", "throughout", "time", "timeprecision", "timeunit", "tran", "tranif0",
+    "tranif1", "tri", "tri0", "tri1", "triand", "trior", "trireg", "type", "typedef", "union", "unique",
+    "unique0", "unsigned", "until", "until_with", "untyped", "use", "uwire", "var", "vectored",
+    "virtual", "void", "wait", "wait_order", "wand", "weak", "weak0", "weak1", "while", "wildcard",
+    "wire", "with", "within", "wor", "xnor", "xor"
+))
+
+class SVIssue:
+    """结构检查发现的问题"""
+
+    __slots__ = ("source", "line", "message")
+
+    def __init__(self, source, line, message):
+        self.source = source
+        self.line = line
+        self.message = message
+
+    def __str__(self):
+        return f"{self.source or '<input>'}:{self.line}: {self.message}"
+
+    def __repr__(self):
+        return f"SVIssue({str(self)!r})"
+
+    def to_dict(self):
+        return {"source": self.source, "line": self.line, "message": self.message}
+
+class CompilationUnit:
+    """同一编译单元中共享的宏和模块定义
+
+    生成的.sv文件由包含文件一起包含到PCILeech工程中，宏和模块名在各文件之间不能重复
+    """
+
+    def __init__(self):
+        self.defines = {}
+        self.modules = {}
+
+class SVChecker:
+    """SystemVerilog结构检查器
+
+    逐个接收词法分析结果，可以在产物流式写入的同时进行检查（见tee()），
+    不需要保存整个文件
+    """
+
+    def __init__(self, source="", unit=None, max_issues=MAX_ISSUES):
+        """初始化检查器
+
+        Args:
+            source: 来源文件名，用于问题定位
+            unit: 共享宏和模块定义的CompilationUnit，为None时只在本文件内检查重复
+            max_issues: 最多记录的问题数
+        """
+        self.source = source
+        self.unit = unit if unit is not None else CompilationUnit()
+        self.max_issues = max_issues
+        self.issues = []
+        self._stack = []
+        self._conditionals = []
+        self._scope = None
+        self._declared = set()
+        self._reported = set()
+        self._header_depth = None
+        self._declaring = None
+        self._initializer = False
+        self._pending = None
+        self._expect = None
+        self._instance_params = None
+        self._skip_line = None
+        self._attribute = False
+        self._prev = None
+        self._prev2 = None
+
+    # 问题记录
+
+    def _issue(self, line, message):
+        if len(self.issues) < self.max_issues:
+            self.issues.append(SVIssue(self.source, line, message))
+
+    def _check_name(self, line, name, kind):
+        """检查新定义的名称是否为合法标识符"""
+        if not is_identifier(name) or name in SV_KEYWORDS:
+            self._issue(line, f"非法的{kind}名称: {name}（只能使用ASCII字母、数字和下划线，且不能以数字开头）")
+            return False
+        return True
+
+    # 输入
+
+    def feed(self, chunks):
+        """检查文本或文本片段"""
+        if isinstance(chunks, str):
+            chunks = (chunks,)
+        tokenizer = Tokenizer()
+        token = self._token
+        for chunk in chunks:
+            for line, text in tokenizer.feed(chunk):
+                token(line, text)
+        for line, text in tokenizer.close():
+            token(line, text)
+        return self
+
+    def tee(self, chunks):
+        """原样产生文本片段，同时对其进行检查，片段全部产生后结束检查"""
+        tokenizer = Tokenizer()
+        token = self._token
+        for chunk in chunks:
+            for line, text in tokenizer.feed(chunk):
+                token(line, text)
+            yield chunk
+        for line, text in tokenizer.close():
+            token(line, text)
+        self.finish()
+
+    def finish(self):
+        """输入结束，检查未闭合的结构，返回问题列表"""
+        self._flush_pending(None)
+        for opener, line in reversed(self._stack):
+            self._issue(line, f"{opener}未闭合")
+        self._stack = []
+        for directive, line in reversed(self._conditionals):
+            self._issue(line, f"{directive}缺少对应的`endif")
+        self._conditionals = []
+        return self.issues
+
+    # 词处理
+
+    def _token(self, line, token):
+        # 宏定义体和行指令参数
+        if self._skip_line is not None:
+            if line == self._skip_line or self._prev == "\\":
+                self._skip_line = line
+                self._prev = token
+                return
+            self._skip_line = None
+
+        if self._attribute:
+            # (* 属性 *)
+            if token == ")" and self._prev == "*":
+                self._attribute = False
+                self._stack.pop()
+            self._prev = token
+            return
+        if self._prev == "*" and self._prev2 == "(" and token != ")" and self._pending is None:
+            self._attribute = True
+            self._prev = token
+            return
+
+        # 先根据当前词确定上一个标识符的含义，它可能使当前词成为实例名称
+        if self._pending is not None:
+            self._flush_pending(token)
+
+        expect = self._expect
+        if expect is not None:
+            self._expect = None
+            if self._expected(line, token, expect):
+                self._prev2 = self._prev
+                self._prev = token
+                return
+
+        first = token[0]
+        if first == "`":
+            self._directive(line, token)
+        elif first == "$" or first == '"' or first.isdigit():
+            pass
+        elif token in SV_KEYWORDS:
+            self._keyword(line, token)
+        elif first.isalpha() or first == "_" or ord(first) > 127:
+            self._identifier(line, token)
+        else:
+            self._operator(line, token)
+        self._prev2 = self._prev
+        self._prev = token
+
+    def _expected(self, line, token, expect):
+        """处理紧跟在module、`define等之后的名称，返回是否已处理"""
+        if expect == "define":
+            if self._check_name(line, token, "宏"):
+                first = self.unit.defines.get(token)
+                if first is not None:
+                    self._issue(line, f"宏重复定义: {token}（首次定义于{first[0] or '<input>'}:{first[1]}）")
+                else:
+                    self.unit.defines[token] = (self.source, line)
+            self._skip_line = line
+            return True
+        if expect == "macro":
+            if self._prev == "`undef":
+                self.unit.defines.pop(token, None)
+            return True
+        if expect in _SCOPE_KEYWORDS:
+            if token in ("automatic", "static"):
+                self._expect = expect
+                return True
+            kind = "模块" if expect == "module" else "包"
+            if self._check_name(line, token, kind):
+                first = self.unit.modules.get(token)
+                if first is not None:
+                    self._issue(line, f"{kind}重复定义: {token}（首次定义于{first[0] or '<input>'}:{first[1]}）")
+                else:
+                    self.unit.modules[token] = (self.source, line)
+            self._scope = token
+            self._declared = set()
+            self._reported = set()
+            self._header_depth = len(self._stack)
+            return True
+        if expect == "instance":
+            if token == "#":
+                # 参数化实例，名称在参数列表之后
+                self._instance_params = len(self._stack)
+                return False
+            if token == "(" or token == "[":
+                return False
+            self._declare(line, token)
+            return True
+        return False
+
+    def _directive(self, line, token):
+        if token == "`define":
+            self._expect = "define"
+        elif token == "`undef":
+            self._expect = "macro"
+        elif token in _CONDITIONAL_DIRECTIVES:
+            if token in ("`ifdef", "`ifndef"):
+                self._conditionals.append((token, line))
+                self._expect = "macro"
+            elif not self._conditionals:
+                self._issue(line, f"多余的{token}")
+            elif token == "`endif":
+                self._conditionals.pop()
+            elif token == "`elsif":
+                self._expect = "macro"
+        elif token in _LINE_DIRECTIVES:
+            self._skip_line = line
+
+    def _keyword(self, line, token):
+        if token in _BLOCK_OPENERS:
+            if token == "fork" and self._prev in ("wait", "disable"):
+                return
+            self._stack.append((token, line))
+            if token in _SCOPE_KEYWORDS:
+                self._expect = token
+            if token == "function" or token == "task":
+                self._start_declaration()
+            return
+        if token in _BLOCK_CLOSERS:
+            self._close(line, token)
+            if token == "endmodule" or token == "endpackage":
+                self._scope = None
+                self._header_depth = None
+                self._declaring = None
+            return
+        if token in _DECLARATION_KEYWORDS:
+            self._start_declaration()
+        elif token == "import" or token == "export":
+            self._skip_line = line if self._scope is None else None
+
+    def _start_declaration(self):
+        self._declaring = len(self._stack)
+        self._initializer = False
+
+    def _identifier(self, line, token):
+        prev = self._prev
+        if prev == "." or prev == "::":
+            # 端口连接、结构成员或包内名称
+            return
+        if prev == ":" and self._prev2 in ("begin", "end", "fork", "join", "endmodule", "endfunction",
+                                           "endtask", "endpackage"):
+            # 块名称
+            return
+        if self._scope is None:
+            # 模块外（例如只包含宏定义的文件）不检查引用
+            if not is_identifier(token):
+                self._report_once(line, token, f"非法标识符: {token}")
+            return
+
+        depth = len(self._stack)
+        if self._declaring is not None and not self._initializer and self._is_declaration_context(depth):
+            self._declare(line, token)
+            return
+        if self._header_depth is not None and self._declaring is None and depth == self._header_depth + 2:
+            # 非ANSI端口列表: module m(a, b);
+            if self._stack[-1][0] == "(":
+                self._declare(line, token)
+                return
+        # 是否为引用要看下一个词：其后紧跟标识符或#时是类型名或模块名
+        self._pending = (line, token)
+
+    def _is_declaration_context(self, depth):
+        """当前位置是否在声明的名称列表中（不在位宽方括号内）"""
+        if depth < self._declaring:
+            return False
+        for opener, _ in self._stack[self._declaring:]:
+            if opener == "[" or opener == "(":
+                return False
+        return True
+
+    def _flush_pending(self, next_token):
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        line, name = pending
+        if next_token is not None and (next_token == "#" or next_token == "::" or (
+                next_token not in SV_KEYWORDS and (next_token[0].isalpha() or next_token[0] == "_" or
+                                                    ord(next_token[0]) > 127))):
+            # 模块实例化或自定义类型的声明，类型名不在本模块中声明
+            if next_token != "::":
+                self._expect = "instance"
+            return
+        self._use(line, name)
+
+    def _use(self, line, name):
+        if name in self._declared:
+            return
+        if not is_identifier(name):
+            self._report_once(line, name, f"非法标识符: {name}（只能使用ASCII字母、数字和下划线）")
+        else:
+            self._report_once(line, name, f"使用了未声明的标识符: {name}")
+
+    def _declare(self, line, name):
+        if name in self._declared:
+            return
+        self._declared.add(name)
+        if not is_identifier(name) or name in SV_KEYWORDS:
+            self._report_once(line, name, f"非法的信号名称: {name}（只能使用ASCII字母、数字和下划线，且不能以数字开头）")
+
+    def _report_once(self, line, name, message):
+        """同一作用域中每个名称只报告一次"""
+        if name in self._reported:
+            return
+        self._reported.add(name)
+        self._issue(line, message)
+
+    def _operator(self, line, token):
+        if token in _BLOCK_OPENERS:
+            self._stack.append((token, line))
+            return
+        if token in _BLOCK_CLOSERS:
+            self._close(line, token)
+            if token == ")" and self._instance_params == len(self._stack):
+                self._instance_params = None
+                self._expect = "instance"
+            if self._declaring is not None and len(self._stack) < self._declaring:
+                # ANSI端口列表结束
+                self._declaring = None
+            return
+        if token == ";":
+            depth = len(self._stack)
+            if self._declaring is not None and depth <= self._declaring:
+                self._declaring = None
+            if self._header_depth is not None and depth == self._header_depth + 1:
+                # 模块头结束，进入模块体
+                self._header_depth = None
+            self._initializer = False
+        elif token == "=":
+            if self._declaring is not None and len(self._stack) == self._declaring:
+                self._initializer = True
+        elif token == ",":
+            if self._declaring is not None and len(self._stack) == self._declaring:
+                self._initializer = False
+
+    def _close(self, line, token):
+        openers = _BLOCK_CLOSERS[token]
+        stack = self._stack
+        if stack and stack[-1][0] in openers:
+            stack.pop()
+            return
+        # 在栈中向下查找可配对的开始词，其间未闭合的结构逐个报告
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index][0] in openers:
+                for opener, opener_line in stack[index + 1:]:
+                    self._issue(opener_line, f"{opener}未闭合（第{line}行遇到{token}）")
+                del stack[index:]
+                return
+        self._issue(line, f"多余的{token}")
+
+def check_sv(chunks, source="", unit=None):
+    """检查SystemVerilog文本
+
+    Args:
+        chunks: 文本或文本片段的可迭代对象
+        source: 来源文件名
+        unit: 共享宏和模块定义的CompilationUnit
+
+    Returns:
+        SVIssue列表，没有问题时为空列表
+    """
+    checker = SVChecker(source, unit)
+    checker.feed(chunks)
+    return checker.finish()
+
+def _read_chunks(path, size=1 << 16):
+    with open(path, "r", encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(size), ""):
+            yield chunk
+
+def check_sv_files(paths, unit=None):
+    """按顺序检查属于同一编译单元的多个文件
+
+    Args:
+        paths: 文件路径列表，顺序与包含顺序一致
+        unit: 共享的CompilationUnit，为None时新建
+
+    Returns:
+        {路径: SVIssue列表}
+    """
+    unit = unit if unit is not None else CompilationUnit()
+    return {path: check_sv(_read_chunks(path), path, unit) for path in paths}
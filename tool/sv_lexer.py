@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SystemVerilog词法分析模块
+将生成的RTL文本流切分为词，资源估算和结构检查共用
+
+只识别生成代码中出现的词法结构：注释、字符串、带位宽的数值字面量、
+标识符（含中文等非ASCII字符，便于检查器报告非法标识符）、编译指令、系统任务和运算符
+"""
+
+import re
+
+# 出现频率高的词排在前面，减少每个位置尝试的分支数；换行单独成词，用于计算行号
+TOKEN_PATTERN = re.compile(
+    r"\d\w*(?:\s*'[sS]?[bBoOdDhH]\s*[0-9a-fA-FxXzZ?_]+)?"  # 数值字面量（含位宽）
+    r"|[`$]?\w+"                          # 标识符、关键字、编译指令和系统任务
+    r"|//[^\n]*|/\*.*?\*/"                # 注释（丢弃）
+    r"|'[sS]?[bBoOdDhH]\s*[0-9a-fA-FxXzZ?_]+"  # 不带位宽的数值字面量
+    r'|"(?:\\.|[^"\\])*"'                 # 字符串
+    r"|\n|::|<=|>=|==|!=|&&|\|\||<<|>>|\S",
+    re.S
+)
+
+# 合法的SystemVerilog简单标识符（IEEE 1800只允许ASCII字母、数字、下划线和$）
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*\Z")
+
+def _complete_end(text):
+    """text中可以安全分词的前缀长度：最后一个换行之前，且不截断块注释"""
+    end = text.rfind("\n")
+    if end < 0:
+        return 0
+    comment = text.rfind("/*", 0, end)
+    if comment >= 0 and text.find("*/", comment + 2) < 0:
+        return comment
+    return end
+
+class Tokenizer:
+    """增量分词器，逐块接收文本并返回已完整的词
+
+    片段按行切分后再分词，整个文件不需要同时保存在内存中
+    """
+
+    def __init__(self):
+        self.line = 1
+        self._pending = ""
+
+    def feed(self, chunk):
+        """接收一个文本片段，返回可以确定的(行号, 词)列表"""
+        pending = self._pending + chunk
+        end = _complete_end(pending)
+        if end <= 0:
+            self._pending = pending
+            return []
+        self._pending = pending[end:]
+        return self._scan(pending, end)
+
+    def close(self):
+        """输入结束，返回剩余的(行号, 词)列表"""
+        pending = self._pending
+        self._pending = ""
+        return self._scan(pending, len(pending))
+
+    def _scan(self, text, end):
+        tokens = []
+        append = tokens.append
+        line = self.line
+        for token in TOKEN_PATTERN.findall(text, 0, end):
+            if token == "\n":
+                line += 1
+            elif token[0] == "/" and token[1:2] in ("/", "*"):
+                line += token.count("\n")
+            else:
+                append((line, token))
+        self.line = line
+        return tokens
+
+def iter_tokens(chunks):
+    """从文本片段流中依次产生(行号, 词)
+
+    Args:
+        chunks: 文本或文本片段的可迭代对象
+    """
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+    tokenizer = Tokenizer()
+    for chunk in chunks:
+        yield from tokenizer.feed(chunk)
+    yield from tokenizer.close()
+
+def is_identifier(token):
+    """是否为合法的简单标识符"""
+    return IDENTIFIER_PATTERN.match(token) is not None
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模板引擎模块
+将str.format风格的模板预编译为静态片段和插槽，渲染时只需拼接
+"""
+
+import string
+
+# 模块级的已编译模板缓存，按模板名称索引，所有生成器实例共享
+_compiled_templates = {}
+
+class CompiledTemplate:
+    """预编译模板
+    
+    模板语法与str.format一致：{name}为插槽，{{和}}为转义的花括号。
+    编译时一次性解析出静态片段，渲染时按插槽位置填入值后拼接
+    """
+    
+    __slots__ = ("parts", "slots", "fields")
+    
+    def __init__(self, text):
+        """编译模板
+        
+        Args:
+            text: 模板文本
+            
+        Raises:
+            ValueError: 模板包含不支持的格式说明或转换标记
+        """
+        parts = []
+        slots = []
+        literal = []
+        for literal_text, field_name, format_spec, conversion in string.Formatter().parse(text):
+            literal.append(literal_text)
+            if field_name is None:
+                continue
+            if format_spec or conversion:
+                raise ValueError(f"模板插槽不支持格式说明或转换: {{{field_name}}}")
+            if not field_name or not field_name.isidentifier():
+                raise ValueError(f"无效的模板插槽名称: {{{field_name}}}")
+            
+            # 相邻的静态文本合并为一个片段
+            parts.append("".join(literal))
+            literal = []
+            slots.append((len(parts), field_name))
+            parts.append(None)
+        parts.append("".join(literal))
+        
+        self.parts = parts
+        self.slots = tuple(slots)
+        self.fields = frozenset(name for _, name in slots)
+    
+    def render(self, **values):
+        """渲染模板
+        
+        Args:
+            values: 插槽名称到值的映射，多余的值被忽略
+            
+        Returns:
+            渲染后的文本
+            
+        Raises:
+            KeyError: 缺少插槽对应的值
+        """
+        parts = self.parts[:]
+        for index, name in self.slots:
+            value = values[name]
+            parts[index] = value if type(value) is str else str(value)
+        return "".join(parts)
+
+    def iter_render(self, **values):
+        """流式渲染模板，依次产生输出片段而不拼接整个结果
+        
+        值为迭代器（例如生成器）的插槽逐个产生迭代器中的片段，
+        因此插槽内容也可以按需生成；其余值与render()相同转换为字符串
+        
+        Args:
+            values: 插槽名称到值的映射，多余的值被忽略
+            
+        Returns:
+            文本片段的迭代器
+            
+        Raises:
+            KeyError: 缺少插槽对应的值（在开始产生片段之前检查）
+        """
+        for name in self.fields:
+            if name not in values:
+                raise KeyError(name)
+        return self._iter_parts(values)
+    
+    def _iter_parts(self, values):
+        """按顺序产生静态片段和插槽值"""
+        slots = iter(self.slots)
+        for part in self.parts:
+            if part is not None:
+                if part:
+                    yield part
+                continue
+            value = values[next(slots)[1]]
+            if type(value) is str:
+                yield value
+            elif hasattr(value, "__next__"):
+                yield from value
+            else:
+                yield str(value)
+
+def join_chunks(separator, chunks):
+    """与separator.join(chunks)结果相同，但逐个产生片段，不在内存中拼接"""
+    first = True
+    for chunk in chunks:
+        if first:
+            first = False
+        else:
+            yield separator
+        yield chunk
+
+def compile_template(text):
+    """编译模板文本（不缓存）"""
+    return CompiledTemplate(text)
+
+def get_template(name, loader):
+    """获取已编译的模板
+    
+    每个模板在进程内只加载和编译一次，之后的生成器实例直接复用
+    
+    Args:
+        name: 模板的全局唯一名称
+        loader: 返回模板文本的可调用对象，仅在首次使用时调用
+        
+    Returns:
+        CompiledTemplate实例
+    """
+    template = _compiled_templates.get(name)
+    if template is None:
+        template = CompiledTemplate(loader())
+        _compiled_templates[name] = template
+    return template
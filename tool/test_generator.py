@@ -7,13 +7,36 @@
 
 import os
 import re
+import time
+
+from generation_result import GenerationResult, write_generated_artifact
+from profiler import profiled
+from build_info import generation_timestamp
+from artifact_cache import generator_cache_key
+from template_engine import get_template
+from register_model import build_register_model
 
 class TestGenerator:
     """测试脚本生成类"""
     
-    def __init__(self):
-        """初始化测试生成模块"""
-        self.template = self._load_test_template()
+    # 生成器版本，模板或生成逻辑变化时递增，使增量生成的指纹失效
+    GENERATOR_VERSION = "1.1.1"
+    
+    # 各生成方法实际使用的配置字段，用于计算增量生成指纹
+    INPUT_KEYS = {
+        "generate_test_script": ("name", "vendor_id", "device_id", "class_code", "type", "key_registers")
+    }
+    
+    def __init__(self, deterministic=False, cache=None):
+        """初始化测试生成模块
+        
+        Args:
+            deterministic: 是否生成不含当前时间的可复现输出
+            cache: 产物缓存(ArtifactCache)，仅在可复现模式下使用
+        """
+        self.deterministic = deterministic
+        self.cache = cache
+        self.template = get_template("test.script", self._load_test_template)
         
     def _load_test_template(self):
         """加载测试脚本模板"""
@@ -93,10 +116,12 @@ class DeviceTester:
             
             # 在Windows系统上使用PowerShell查找设备
             elif os.name == "nt":
-                cmd = f"Get-PnpDevice | Where-Object {{ $_.HardwareID -like '*VEN_{{VENDOR_ID.replace('0x', '')}}*&DEV_{{DEVICE_ID.replace('0x', '')}}*' }}"
+                vendor = VENDOR_ID.replace("0x", "")
+                device = DEVICE_ID.replace("0x", "")
+                cmd = f"Get-PnpDevice | Where-Object {{{{ $_.HardwareID -like '*VEN_{{vendor}}*&DEV_{{device}}*' }}}}"
                 result = subprocess.run(["powershell", "-Command", cmd], capture_output=True, text=True)
                 
-                if f"VEN_{{VENDOR_ID.replace('0x', '')}}" in result.stdout:
+                if f"VEN_{{vendor}}" in result.stdout:
                     # 设备找到
                     self.device_found = True
                     print(f"✅ 设备已找到（Windows）")
@@ -282,14 +307,14 @@ class DeviceTester:
         
         # 汇总结果
         print("=== 测试结果汇总 ===")
-        print(f"配置空间测试: {'✅ 通过' if config_result else '❌ 失败'}")
-        print(f"BAR空间测试: {'✅ 通过' if bar_result else '❌ 失败'}")
-        print(f"中断功能测试: {'✅ 通过' if interrupt_result else '❌ 失败'}")
-        print(f"设备功能测试: {'✅ 通过' if functionality_result else '❌ 失败'}")
+        print(f"配置空间测试: {{'✅ 通过' if config_result else '❌ 失败'}}")
+        print(f"BAR空间测试: {{'✅ 通过' if bar_result else '❌ 失败'}}")
+        print(f"中断功能测试: {{'✅ 通过' if interrupt_result else '❌ 失败'}}")
+        print(f"设备功能测试: {{'✅ 通过' if functionality_result else '❌ 失败'}}")
         print("")
         
         overall_result = config_result and bar_result and interrupt_result and functionality_result
-        print(f"总体结果: {'✅ 通过' if overall_result else '❌ 失败'}")
+        print(f"总体结果: {{'✅ 通过' if overall_result else '❌ 失败'}}")
         
         return overall_result
 
@@ -313,50 +338,85 @@ if __name__ == "__main__":
     sys.exit(main())
 """
     
-    def generate_test_script(self, device_config, output_file):
-        """生成测试脚本"""
-        try:
-            device_name = device_config.get("name", "自定义设备")
-            vendor_id = device_config.get("vendor_id", "FFFF")
-            device_id = device_config.get("device_id", "FFFF")
-            class_code = device_config.get("class_code", "000000")
-            device_type = device_config.get("type", "custom")
+    def render_test_script(self, device_config, register_model=None):
+        """在内存中渲染测试脚本，不写入文件
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            # 生成BAR访问测试代码
-            bar_access_tests = self._generate_bar_access_tests(device_config)
+        Returns:
+            代码文本
+        """
+        device_name = device_config.get("name", "自定义设备")
+        vendor_id = device_config.get("vendor_id", "FFFF")
+        device_id = device_config.get("device_id", "FFFF")
+        class_code = device_config.get("class_code", "000000")
+        device_type = device_config.get("type", "custom")
+        
+        # 生成BAR访问测试代码
+        if register_model is None:
+            register_model = build_register_model(device_config)
+        bar_access_tests = self._generate_bar_access_tests(register_model)
+        
+        # 生成设备特定测试代码
+        device_specific_tests = self._generate_device_specific_tests(device_type, device_config)
+        
+        # 生成最终代码
+        return self.template.render(
+            device_name=device_name,
+            timestamp=generation_timestamp(self.deterministic, self.GENERATOR_VERSION),
+            vendor_id=vendor_id,
+            device_id=device_id,
+            class_code=class_code,
+            bar_access_tests=bar_access_tests,
+            device_specific_tests=device_specific_tests
+        )
+    
+    @profiled("TestGenerator.generate_test_script")
+    def generate_test_script(self, device_config, output_file, register_model=None):
+        """生成测试脚本
+        
+        Args:
+            device_config: 设备配置（只读，不会被修改）
+            output_file: 输出文件路径
+            register_model: 预先构建的寄存器模型，为None时根据配置构建
             
-            # 生成设备特定测试代码
-            device_specific_tests = self._generate_device_specific_tests(device_type, device_config)
+        Returns:
+            GenerationResult，真值表示是否生成成功
+        """
+        start = time.perf_counter()
+        try:
+            # 优先从产物缓存获取
+            cache_key = generator_cache_key(self, device_config, "generate_test_script")
+            if cache_key and self.cache.fetch(cache_key, output_file):
+                print(f"✅ 测试脚本已从缓存获取: {output_file}")
+                return GenerationResult.from_file(output_file, time.perf_counter() - start, cached=True)
             
-            # 生成最终代码
-            code = self.template.format(
-                device_name=device_name,
-                timestamp=__import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                vendor_id=vendor_id,
-                device_id=device_id,
-                class_code=class_code,
-                bar_access_tests=bar_access_tests,
-                device_specific_tests=device_specific_tests
-            )
+            code = self.render_test_script(device_config, register_model)
             
             # 写入输出文件
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(code)
+            result = write_generated_artifact(output_file, code, start)
             
             # 设置执行权限（Linux）
             if os.name == "posix":
                 os.chmod(output_file, 0o755)
             
+            if cache_key:
+                self.cache.store(cache_key, output_file)
+            
             print(f"✅ 测试脚本已生成: {output_file}")
-            return True
+            return result
         except Exception as e:
             print(f"❌ 生成测试脚本失败: {str(e)}")
-            return False
+            return GenerationResult.failure(output_file, e, time.perf_counter() - start)
     
-    def _generate_bar_access_tests(self, device_config):
-        """生成BAR访问测试代码"""
-        registers = device_config.get("key_registers", [])
+    def _generate_bar_access_tests(self, registers):
+        """生成BAR访问测试代码
         
+        Args:
+            registers: 寄存器模型，地址已解析为整数
+        """
         # 生成每个关键寄存器的读取代码
         test_code = []
         
@@ -372,22 +432,13 @@ if __name__ == "__main__":
         
         # 为每个寄存器添加读取测试
         for reg in registers:
-            addr = reg["addr"].replace("0x", "")
-            name = reg.get("name", f"寄存器_{addr}")
-            
-            # 将16进制地址字符串转换为整数
-            try:
-                offset = int(addr, 16)
-                test_code.append(f"""
-                    # 读取{name}
-                    f.seek(0x{addr})
+            test_code.append(f"""
+                    # 读取{reg.name}
+                    f.seek(0x{reg.address:04X})
                     reg_data = f.read(4)
                     reg_value = struct.unpack("<I", reg_data)[0]
-                    print(f"✅ {name}值: 0x{{reg_value:08x}}")""")
-            except ValueError:
-                # 如果地址无法解析，跳过
-                continue
-                
+                    print(f"✅ {reg.name}值: 0x{{reg_value:08x}}")""")
+        
         return "\n".join(test_code)
     
     def _generate_device_specific_tests(self, device_type, device_config):
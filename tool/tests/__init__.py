@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+回归测试包
+在tool目录下以 python -m pytest tests 的方式运行
+"""
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+产物缓存回归测试
+缓存命中不能让输出文件与缓存对象互相影响，缓存键必须区分SOURCE_DATE_EPOCH
+"""
+
+import os
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from artifact_cache import ArtifactCache
+from pcie_spoof_tool import PCIeSpoofTool
+
+@pytest.fixture(autouse=True)
+def no_source_date_epoch(monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(str(tmp_path / "cache"))
+
+def generate(cache, output_dir, preset="intel_i350"):
+    """使用缓存生成全部产物，返回工具实例"""
+    tool = PCIeSpoofTool(cache=cache)
+    with redirect_stdout(io.StringIO()):
+        tool.create_new_config("custom", preset)
+        assert tool.generate_all(str(output_dir)), tool.last_error
+    return tool
+
+def result(tool, name):
+    """返回生成报告中指定产物的结果"""
+    return next(result for result in tool.last_report if result.name == name)
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_editing_output_does_not_change_cache(cache, tmp_path):
+    generate(cache, tmp_path / "first")
+    generate(cache, tmp_path / "second")
+    assert cache.hits
+    edited = tmp_path / "second" / "bar_controller.sv"
+    original = read(edited)
+    with open(edited, "ab") as f:
+        f.write(b"// edited\n")
+
+    tool = generate(cache, tmp_path / "third")
+    assert result(tool, "bar").cached
+    assert read(tmp_path / "third" / "bar_controller.sv") == original
+
+def test_hit_does_not_touch_earlier_outputs(cache, tmp_path):
+    generate(cache, tmp_path / "first")
+    generate(cache, tmp_path / "second")
+    earlier = tmp_path / "second" / "register_map.sv"
+    os.utime(earlier, (1000000000, 1000000000))
+
+    generate(cache, tmp_path / "third")
+    assert os.stat(earlier).st_mtime == 1000000000
+
+def test_hit_keeps_identical_output_untouched(cache, tmp_path):
+    generate(cache, tmp_path)
+    output = tmp_path / "bar_controller.sv"
+    os.utime(output, (1000000000, 1000000000))
+
+    tool = generate(cache, tmp_path)
+    assert result(tool, "bar").cached
+    assert os.stat(output).st_mtime == 1000000000
+
+def test_corrupt_object_is_a_miss(cache, tmp_path):
+    generate(cache, tmp_path / "first")
+    for root, _, files in os.walk(cache.objects_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            os.chmod(path, 0o644)
+            with open(path, "ab") as f:
+                f.write(b"corrupt")
+
+    tool = generate(cache, tmp_path / "second")
+    assert not any(result.cached for result in tool.last_report)
+    assert read(tmp_path / "second" / "bar_controller.sv") == read(tmp_path / "first" / "bar_controller.sv")
+
+def test_source_date_epoch_is_part_of_key(cache, monkeypatch, tmp_path):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1000000000")
+    generate(cache, tmp_path / "first")
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    tool = generate(cache, tmp_path / "second")
+    assert not any(result.cached for result in tool.last_report)
+    for name in os.listdir(tmp_path / "second"):
+        assert b"2001-09-09" not in read(tmp_path / "second" / name), name
+
+def test_eviction_keeps_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=1 << 30)
+    generate(cache, tmp_path / "first", "intel_i350")
+    generate(cache, tmp_path / "second", "nvme_ssd")
+    size = cache._current_size()
+    cache.max_bytes = size - 1
+    cache._evict()
+    assert cache.evictions
+    assert cache._current_size() < size
+
+def test_store_without_index_counts_object_once(cache, tmp_path):
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"x" * 100)
+    cache.store("k" * 64, str(source))
+    size = cache._current_size()
+    os.unlink(cache._index_path("k" * 64))
+    cache.store("k" * 64, str(source))
+    assert cache._current_size() == size
+    source.write_bytes(b"y" * 40)
+    os.unlink(cache._index_path("k" * 64))
+    cache.store("k" * 64, str(source))
+    assert cache._current_size() == size - 60 == sum(size for _, size, _ in cache._scan())
+    assert cache.fetch("k" * 64, str(tmp_path / "output.txt"))
+    assert read(tmp_path / "output.txt") == b"y" * 40
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常量寄存器ROM测试
+bar_const_rom.coe只在bar_ro_storage为rom时生成，ROM选择信号在复位时清零
+"""
+
+import io
+import os
+from contextlib import redirect_stdout
+
+import pytest
+
+from pcie_spoof_tool import PCIeSpoofTool
+
+@pytest.fixture
+def tool():
+    tool = PCIeSpoofTool()
+    with redirect_stdout(io.StringIO()):
+        tool.create_new_config("custom", "intel_i350")
+    return tool
+
+def generate(tool, output_dir):
+    with redirect_stdout(io.StringIO()):
+        assert tool.generate_all(str(output_dir)), tool.last_error
+    return {result.name for result in tool.last_report}
+
+def test_logic_storage_does_not_write_rom(tool, tmp_path):
+    names = generate(tool, tmp_path)
+    assert "bar_rom" not in names
+    assert not os.path.exists(tmp_path / "bar_const_rom.coe")
+    assert "bar_const_rom.coe" not in tool.render_all()
+
+def test_rom_storage_writes_rom(tool, tmp_path):
+    tool.device_config["bar_ro_storage"] = "rom"
+    names = generate(tool, tmp_path)
+    assert "bar_rom" in names
+    assert os.path.exists(tmp_path / "bar_const_rom.coe")
+
+def test_rom_select_cleared_on_reset(tool):
+    tool.device_config["bar_ro_storage"] = "rom"
+    code = tool.render_all(only=["bar"])["bar_controller.sv"]
+    read_block = code[code.index("// 读操作处理\n"):]
+    reset_branch = read_block[read_block.index("if (rst) begin"):read_block.index("end else")]
+    assert "rd_rom_sel <= 1'b0;" in reset_branch
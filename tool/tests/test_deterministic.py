@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可复现输出回归测试
+同一配置在可复现模式下两次生成的产物必须逐字节相同，
+SOURCE_DATE_EPOCH只改变文件中的时间戳，并使增量生成重新生成受影响的产物
+"""
+
+import os
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from pcie_spoof_tool import PCIeSpoofTool, PRESET_DEVICES
+
+EPOCH = 1700000000        # 2023-11-14 22:13:20 UTC
+OTHER_EPOCH = 1000000000  # 2001-09-09 01:46:40 UTC
+
+def make_tool(preset):
+    """创建加载了预设设备的可复现模式工具实例"""
+    tool = PCIeSpoofTool(deterministic=True)
+    with redirect_stdout(io.StringIO()):
+        tool.create_new_config("custom", preset)
+    return tool
+
+def generate(tool, output_dir, incremental=False):
+    """生成全部产物，返回{文件名: 字节内容}"""
+    with redirect_stdout(io.StringIO()):
+        assert tool.generate_all(str(output_dir), incremental=incremental), tool.last_error
+    assert all(tool.last_report), [result.name for result in tool.last_report if not result]
+    contents = {}
+    for name in sorted(os.listdir(output_dir)):
+        with open(os.path.join(output_dir, name), "rb") as f:
+            contents[name] = f.read()
+    return contents
+
+@pytest.fixture(autouse=True)
+def no_source_date_epoch(monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+
+@pytest.mark.parametrize("preset", sorted(PRESET_DEVICES))
+def test_render_all_is_reproducible(preset):
+    first = make_tool(preset).render_all()
+    second = make_tool(preset).render_all()
+    assert list(first) == list(second)
+    for name, text in first.items():
+        assert text.encode("utf-8") == second[name].encode("utf-8"), name
+
+@pytest.mark.parametrize("preset", sorted(PRESET_DEVICES))
+def test_generate_all_is_reproducible(preset, tmp_path):
+    first = generate(make_tool(preset), tmp_path / "first")
+    second = generate(make_tool(preset), tmp_path / "second")
+    assert first == second
+
+def test_generate_all_matches_render_all(tmp_path):
+    tool = make_tool("intel_i350")
+    files = generate(tool, tmp_path)
+    for name, text in tool.render_all().items():
+        assert files[name] == text.encode("utf-8"), name
+
+def test_source_date_epoch_sets_timestamp(monkeypatch, tmp_path):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", str(EPOCH))
+    first = generate(make_tool("nvme_ssd"), tmp_path / "first")
+    second = generate(make_tool("nvme_ssd"), tmp_path / "second")
+    assert first == second
+    assert b"2023-11-14 22:13:20 UTC" in first["README.md"]
+    assert b"2023-11-14 22:13:20 UTC" in first["bar_controller.sv"]
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", str(OTHER_EPOCH))
+    third = generate(make_tool("nvme_ssd"), tmp_path / "third")
+    assert third["README.md"] != first["README.md"]
+    assert b"2001-09-09 01:46:40 UTC" in third["README.md"]
+
+def test_incremental_regenerates_when_source_date_epoch_changes(monkeypatch, tmp_path):
+    tool = make_tool("ar9287")
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", str(EPOCH))
+    generate(tool, tmp_path, incremental=True)
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", str(OTHER_EPOCH))
+    files = generate(tool, tmp_path, incremental=True)
+    assert not any(result.skipped for result in tool.last_report)
+    for name, content in files.items():
+        assert b"2023-11-14" not in content, name
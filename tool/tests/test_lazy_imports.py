@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟导入回归测试
+导入pcie_spoof_tool时不加载生成模块和各功能模块，
+为此在pcie_spoof_tool中重复定义的常量必须与功能模块一致
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import pcie_spoof_tool
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入pcie_spoof_tool时不应加载的模块
+LAZY_MODULES = (
+    "bar_generator", "register_mapper", "register_model", "register_index", "bitfield_validator",
+    "address_allocator", "resource_estimator", "sv_checker", "sv_lexer", "spec_importer",
+    "register_exporter", "config_watcher", "xml.etree.ElementTree", "csv", "tarfile", "zipfile",
+    "gzip", "tracemalloc", "concurrent.futures"
+)
+
+def test_import_does_not_load_feature_modules():
+    code = "import sys, json, pcie_spoof_tool; print(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=TOOL_DIR, check=True,
+                            stdout=subprocess.PIPE).stdout
+    loaded = set(json.loads(output))
+    assert [name for name in LAZY_MODULES if name in loaded] == []
+
+def test_duplicated_constants_match_feature_modules():
+    from register_exporter import EXPORT_FORMATS
+    from spec_importer import SPEC_FORMATS
+    from resource_estimator import FPGA_DEVICES, DEFAULT_CLOCK_MHZ
+    from address_allocator import DEFAULT_ALIGNMENT
+    from config_watcher import DEFAULT_POLL_INTERVAL, DEFAULT_DEBOUNCE
+    from bar_generator import BARGenerator
+
+    assert pcie_spoof_tool.REGISTER_EXPORT_FORMATS == tuple(EXPORT_FORMATS)
+    assert pcie_spoof_tool.SPEC_FORMAT_NAMES == tuple(SPEC_FORMATS)
+    assert pcie_spoof_tool.FPGA_DEVICE_NAMES == tuple(FPGA_DEVICES)
+    assert pcie_spoof_tool.DEFAULT_CLOCK_MHZ == DEFAULT_CLOCK_MHZ
+    assert pcie_spoof_tool.DEFAULT_ALIGNMENT == DEFAULT_ALIGNMENT
+    assert pcie_spoof_tool.DEFAULT_POLL_INTERVAL == DEFAULT_POLL_INTERVAL
+    assert pcie_spoof_tool.DEFAULT_DEBOUNCE == DEFAULT_DEBOUNCE
+    assert pcie_spoof_tool.BAR_DECODE_STYLES == tuple(BARGenerator.DECODE_STYLES)
+    assert pcie_spoof_tool.BAR_RO_STORAGE_MODES == tuple(BARGenerator.RO_STORAGE_MODES)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+寄存器规格导入测试
+CSV列别名和续行、IP-XACT 2009/2014的复位值/访问类型/dim/registerFile、
+SystemRDL子集的@/+=/%=/数组/regfile
+"""
+
+import io
+
+import pytest
+
+from spec_importer import (
+    SpecImportError, detect_format, import_registers, iter_csv_registers, iter_ipxact_registers,
+    iter_rdl_registers
+)
+
+def by_name(registers):
+    return {register["name"]: register for register in registers}
+
+def ipxact(text):
+    return list(iter_ipxact_registers(io.BytesIO(text.encode("utf-8"))))
+
+# ==========================================================================
+# CSV
+# ==========================================================================
+
+def test_csv_column_aliases_and_continuation_rows():
+    registers = list(iter_csv_registers(io.StringIO(
+        "Reg Name,Offset,Reset Value,Access,Field,Bits,Field Access\n"
+        "CTRL,0x10,0x5,RW,EN,0,\n"
+        ",,,,MODE,7:4,RO\n"
+        "STATUS,0x14,,RO,DONE,[1],W1C\n"
+    )))
+    assert [register["name"] for register in registers] == ["CTRL", "STATUS"]
+    ctrl, status = registers
+    assert ctrl["addr"] == "0x0010"
+    assert ctrl["value"] == "32'h00000005"
+    assert ctrl["bit_fields"] == [
+        {"name": "EN", "bit": 0},
+        {"name": "MODE", "msb": 7, "lsb": 4, "access": "RO"}
+    ]
+    assert status["access"] == "RO"
+    assert status["bit_fields"] == [{"name": "DONE", "bit": 1, "access": "W1C"}]
+
+def test_csv_without_address_column_is_sequential():
+    registers = list(iter_csv_registers(io.StringIO("寄存器,宽度\nA,32\nB,16\nC,32\n")))
+    assert [register["addr"] for register in registers] == ["0x0000", "0x0004", "0x0006"]
+    assert registers[1]["width"] == 16
+
+def test_csv_reports_line_number():
+    with pytest.raises(SpecImportError, match="第3行"):
+        list(iter_csv_registers(io.StringIO("name,address\nA,0x0\nB,zz\n")))
+
+# ==========================================================================
+# IP-XACT
+# ==========================================================================
+
+IPXACT_2009 = """<?xml version="1.0"?>
+<spirit:component xmlns:spirit="http://www.spiritconsortium.org/XMLSchema/SPIRIT/1.5">
+  <spirit:memoryMaps><spirit:memoryMap><spirit:addressBlock>
+    <spirit:name>regs</spirit:name>
+    <spirit:baseAddress>0x1000</spirit:baseAddress>
+    <spirit:register>
+      <spirit:name>CTRL</spirit:name>
+      <spirit:addressOffset>0x0</spirit:addressOffset>
+      <spirit:size>32</spirit:size>
+      <spirit:access>read-write</spirit:access>
+      <spirit:reset><spirit:value>0x12</spirit:value></spirit:reset>
+      <spirit:field>
+        <spirit:name>IRQ</spirit:name>
+        <spirit:bitOffset>3</spirit:bitOffset>
+        <spirit:bitWidth>1</spirit:bitWidth>
+        <spirit:modifiedWriteValue>oneToClear</spirit:modifiedWriteValue>
+      </spirit:field>
+    </spirit:register>
+    <spirit:register>
+      <spirit:name>DATA</spirit:name>
+      <spirit:dim>3</spirit:dim>
+      <spirit:addressOffset>0x10</spirit:addressOffset>
+      <spirit:size>32</spirit:size>
+      <spirit:access>read-only</spirit:access>
+    </spirit:register>
+  </spirit:addressBlock></spirit:memoryMap></spirit:memoryMaps>
+</spirit:component>
+"""
+
+def test_ipxact_2009_reset_access_and_dim():
+    registers = by_name(ipxact(IPXACT_2009))
+    assert registers["CTRL"]["addr"] == "0x1000"
+    assert registers["CTRL"]["access"] == "RW"
+    assert registers["CTRL"]["value"] == "32'h00000012"
+    assert registers["CTRL"]["bit_fields"] == [{"name": "IRQ", "bit": 3, "access": "W1C"}]
+    assert [registers[f"DATA{index}"]["addr"] for index in range(3)] == ["0x1010", "0x1014", "0x1018"]
+    assert registers["DATA0"]["access"] == "RO"
+
+IPXACT_2014 = """<?xml version="1.0"?>
+<ipxact:component xmlns:ipxact="http://www.accellera.org/XMLSchema/IPXACT/1685-2014">
+  <ipxact:memoryMaps><ipxact:memoryMap><ipxact:addressBlock>
+    <ipxact:name>regs</ipxact:name>
+    <ipxact:baseAddress>0x1000</ipxact:baseAddress>
+    <ipxact:register>
+      <ipxact:name>CTRL</ipxact:name>
+      <ipxact:addressOffset>0x0</ipxact:addressOffset>
+      <ipxact:size>32</ipxact:size>
+    </ipxact:register>
+    <ipxact:registerFile>
+      <ipxact:name>RF</ipxact:name>
+      <ipxact:addressOffset>0x100</ipxact:addressOffset>
+      <ipxact:range>0x20</ipxact:range>
+      <ipxact:register>
+        <ipxact:name>CTRL</ipxact:name>
+        <ipxact:addressOffset>0x0</ipxact:addressOffset>
+        <ipxact:size>32</ipxact:size>
+        <ipxact:access>read-only</ipxact:access>
+        <ipxact:resets><ipxact:reset><ipxact:value>0xA5</ipxact:value></ipxact:reset></ipxact:resets>
+      </ipxact:register>
+    </ipxact:registerFile>
+    <ipxact:registerFile>
+      <ipxact:name>CH</ipxact:name>
+      <ipxact:dim>2</ipxact:dim>
+      <ipxact:addressOffset>0x200</ipxact:addressOffset>
+      <ipxact:range>0x40</ipxact:range>
+      <ipxact:registerFile>
+        <ipxact:name>Q</ipxact:name>
+        <ipxact:addressOffset>0x10</ipxact:addressOffset>
+        <ipxact:range>0x10</ipxact:range>
+        <ipxact:register>
+          <ipxact:name>HEAD</ipxact:name>
+          <ipxact:addressOffset>0x4</ipxact:addressOffset>
+          <ipxact:size>32</ipxact:size>
+        </ipxact:register>
+      </ipxact:registerFile>
+    </ipxact:registerFile>
+    <ipxact:register>
+      <ipxact:name>TAIL</ipxact:name>
+      <ipxact:addressOffset>0x300</ipxact:addressOffset>
+      <ipxact:size>32</ipxact:size>
+    </ipxact:register>
+  </ipxact:addressBlock></ipxact:memoryMap></ipxact:memoryMaps>
+</ipxact:component>
+"""
+
+def test_ipxact_2014_register_file_offset_and_prefix():
+    registers = ipxact(IPXACT_2014)
+    addresses = {register["name"]: register["addr"] for register in registers}
+    assert addresses == {
+        "CTRL": "0x1000",
+        "RF_CTRL": "0x1100",
+        "CH0_Q_HEAD": "0x1214",
+        "CH1_Q_HEAD": "0x1254",
+        "TAIL": "0x1300"
+    }
+    rf_ctrl = by_name(registers)["RF_CTRL"]
+    assert rf_ctrl["access"] == "RO"
+    assert rf_ctrl["value"] == "32'h000000A5"
+
+def test_ipxact_register_file_dim_requires_stride():
+    text = IPXACT_2014.replace("<ipxact:range>0x40</ipxact:range>", "")
+    with pytest.raises(SpecImportError, match="CH"):
+        ipxact(text)
+
+def test_ipxact_parse_error():
+    with pytest.raises(SpecImportError):
+        ipxact("<ipxact:component>")
+
+# ==========================================================================
+# SystemRDL
+# ==========================================================================
+
+RDL = """
+reg ctrl_t {
+    regwidth = 32;
+    field { sw = rw; } EN[0:0] = 1;
+    field { sw = r; desc = "Mode"; } MODE[7:4] = 0x3;
+};
+
+regfile queue_t {
+    reg { field { sw = rw; onwrite = woclr; } PEND[0:0]; } STATUS;
+    reg { field { sw = rw; } VAL[15:0] = 0; } HEAD @ 0x8;
+};
+
+addrmap top {
+    ctrl_t CTRL @ 0x0;
+    ctrl_t ARR[2] @ 0x10 += 0x8;
+    reg { field { sw = rw; } X[31:0]; } ALIGNED %= 0x40;
+    queue_t Q[2] @ 0x100;
+    reg { field { sw = rw; } Y[31:0]; } NEXT;
+};
+"""
+
+def test_rdl_addressing_arrays_and_regfiles():
+    registers = list(iter_rdl_registers(io.StringIO(RDL)))
+    addresses = {register["name"]: register["addr"] for register in registers}
+    assert addresses == {
+        "CTRL": "0x0000",
+        "ARR0": "0x0010",
+        "ARR1": "0x0018",
+        "ALIGNED": "0x0040",
+        "Q0_STATUS": "0x0100",
+        "Q0_HEAD": "0x0108",
+        "Q1_STATUS": "0x010C",
+        "Q1_HEAD": "0x0114",
+        "NEXT": "0x0118"
+    }
+    registers = by_name(registers)
+    assert registers["CTRL"]["value"] == "32'h00000031"
+    assert registers["CTRL"]["bit_fields"] == [
+        {"name": "EN", "bit": 0, "access": "RW"},
+        {"name": "MODE", "msb": 7, "lsb": 4, "access": "RO", "description": "Mode"}
+    ]
+    assert registers["Q1_STATUS"]["access"] == "W1C"
+
+def test_rdl_syntax_error_reports_line():
+    text = "addrmap top {\n    reg { field { sw = rw; } A[0:0]; } R @ 0x0 junk;\n};\n"
+    with pytest.raises(SpecImportError, match="第2行.*junk"):
+        list(iter_rdl_registers(io.StringIO(text)))
+
+# ==========================================================================
+# 入口
+# ==========================================================================
+
+def test_detect_format():
+    assert detect_format("regs.TSV") == "csv"
+    assert detect_format("regs.xml") == "ipxact"
+    assert detect_format("regs.rdl") == "rdl"
+    with pytest.raises(SpecImportError):
+        detect_format("regs.txt")
+
+def test_import_registers_keeps_config_on_error(tmp_path):
+    path = tmp_path / "regs.csv"
+    path.write_text("name,address\nA,0x0\nB,zz\n", encoding="utf-8")
+    config = {"key_registers": [{"addr": "0x0000", "name": "OLD"}]}
+    with pytest.raises(SpecImportError):
+        import_registers(config, str(path))
+    assert config["key_registers"] == [{"addr": "0x0000", "name": "OLD"}]
+
+    path.write_text("name,address\nA,0x0\nB,0x4\n", encoding="utf-8")
+    assert import_registers(config, str(path)) == 2
+    assert [register["name"] for register in config["key_registers"]] == ["OLD", "A", "B"]
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试脚本生成测试
+各预设设备和设备类型渲染出的test_device.py必须是合法的Python代码
+"""
+
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from pcie_spoof_tool import PCIeSpoofTool, PRESET_DEVICES, DEVICE_TYPES
+
+def render_test_script(device_type, preset=None):
+    tool = PCIeSpoofTool()
+    with redirect_stdout(io.StringIO()):
+        tool.create_new_config(device_type, preset)
+    return tool.render_all(only=["test"])["test_device.py"]
+
+@pytest.mark.parametrize("preset", sorted(PRESET_DEVICES))
+def test_preset_test_script_compiles(preset):
+    compile(render_test_script("custom", preset), "test_device.py", "exec")
+
+@pytest.mark.parametrize("device_type", sorted(DEVICE_TYPES))
+def test_device_type_test_script_compiles(device_type):
+    compile(render_test_script(device_type), "test_device.py", "exec")
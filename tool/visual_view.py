@@ -9,6 +9,8 @@ import tkinter as tk
 from tkinter import ttk
 import random
 
+from register_model import RegisterModel
+
 class VisualView(ttk.Frame):
     """可视化视图组件"""
     
@@ -154,13 +156,26 @@ class VisualView(ttk.Frame):
         """更新寄存器映射视图
         
         Args:
-            registers: 寄存器数据列表
+            registers: 寄存器数据列表或已构建的寄存器模型(RegisterModel)
         """
         self.registers = registers
         
         # 清空画布
         self.reg_canvas.delete("all")
         
+        # 解析为按地址排序的寄存器模型
+        try:
+            if not isinstance(registers, RegisterModel):
+                registers = RegisterModel.from_registers(registers or [])
+        except (KeyError, ValueError) as e:
+            self.reg_canvas.create_text(
+                300, 200,
+                text=f"寄存器地址无效: {str(e)}",
+                font=("Arial", 14),
+                fill="red"
+            )
+            return
+        
         if not registers:
             self.reg_canvas.create_text(
                 300, 200, 
@@ -191,16 +206,13 @@ class VisualView(ttk.Frame):
             width=2
         )
         
-        # 排序寄存器（按地址）
-        sorted_regs = sorted(registers, key=lambda r: int(r.get('address', '0x0').replace('0x', ''), 16))
-        
-        # 绘制每个寄存器
-        for i, reg in enumerate(sorted_regs):
+        # 绘制每个寄存器（模型已按地址排序）
+        for i, reg in enumerate(registers):
             y = start_y + i * (reg_height + spacing)
-            name = reg.get('name', '未命名')
-            addr = reg.get('address', '0x0')
-            width_bits = reg.get('width', 32)
-            access = reg.get('access', 'RW')
+            name = reg.name
+            addr = f"0x{reg.address:04X}"
+            width_bits = reg.width
+            access = reg.access
             
             # 为不同访问类型选择不同颜色
             if access == 'RO':
@@ -233,24 +245,12 @@ class VisualView(ttk.Frame):
             )
             
             # 如果有位域数据，绘制位域
-            bitfields = reg.get('bitfields', [])
-            if bitfields:
+            if reg.bit_fields:
                 bit_width = width / width_bits
-                for bf in bitfields:
-                    name = bf.get('name', '')
-                    bits_str = bf.get('bits', '0')
-                    
-                    # 解析位范围
-                    if ':' in bits_str:
-                        high, low = map(int, bits_str.split(':'))
-                        start_bit = low
-                        end_bit = high
-                    else:
-                        start_bit = end_bit = int(bits_str)
-                    
+                for bf in reg.bit_fields:
                     # 计算位域在寄存器中的位置
-                    bit_x1 = start_x + start_bit * bit_width
-                    bit_x2 = start_x + (end_bit + 1) * bit_width
+                    bit_x1 = start_x + bf.lsb * bit_width
+                    bit_x2 = start_x + (bf.msb + 1) * bit_width
                     
                     # 绘制位域分隔线
                     self.reg_canvas.create_line(